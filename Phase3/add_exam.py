@@ -1,29 +1,33 @@
 import json
 import argparse
 import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import datetime, date
-from pathlib import Path
-from typing import Dict, Any, Optional
+from itertools import islice
+from typing import Dict, Any, DefaultDict, List, Optional, Tuple
 
-DATA_FILE = Path(__file__).with_name("data.json")
+import data_store
+from courses import CourseIndex, normalize_name
+from data_store import DATA_FILE
 
 
 def load_json() -> Dict[str, Any]:
+    # gleiche Lese-/Schreibwege wie das Dashboard (Komprimierung, Shards)
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return data_store.load_json()
     except FileNotFoundError:
         print(f"Fehler: Datei {DATA_FILE} nicht gefunden!")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, OSError, EOFError) as e:
         print(f"Fehler beim Lesen der JSON-Datei: {e}")
         sys.exit(1)
 
 
-def save_json(data: Dict[str, Any]) -> None:
+def save_exam(exam: Dict[str, Any]) -> None:
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # mit Shards wird nur die Datei des Semesters neu geschrieben
+        data_store.append_exam(exam)
         print("[OK] Exam erfolgreich hinzugefügt!")
     except Exception as e:
         print(f"Fehler beim Speichern: {e}")
@@ -60,21 +64,31 @@ def validate_ects(ects_str: str) -> int:
         raise argparse.ArgumentTypeError(f"Ungültige ECTS: {e}")
 
 
+def validate_count(count_str: str) -> int:
+    try:
+        count = int(count_str)
+        if count < 0:
+            raise ValueError("Wert darf nicht negativ sein")
+        return count
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Ungültige Anzahl: {e}")
+
+
 def add_exam(
     semester: int,
     name: str,
     ects: int,
     date: str,
     grade: Optional[float] = None,
-    versuch: int = 1
+    versuch: int = 1,
+    modul_id: Optional[str] = None,
+    suggest: bool = True
 ) -> None:
     
-    # Lade aktuelle Daten
-    data = load_json()
-    
-    # Stelle sicher, dass 'exams' Array existiert
-    if "exams" not in data:
-        data["exams"] = []
+    # Gleiches Modul anders geschrieben? Vorhandene Schreibweise übernehmen bzw. vorschlagen
+    if suggest and not modul_id:
+        data = load_json()
+        name = resolve_course_name(name, CourseIndex(_exam_name(e) for e in data.get("exams", [])))
     
     # Erstelle neues Exam-Objekt
     new_exam = {
@@ -88,12 +102,11 @@ def add_exam(
     # Füge Note hinzu, falls vorhanden
     if grade is not None:
         new_exam["note"] = grade
+    if modul_id:
+        new_exam["modul_id"] = modul_id
     
-    # Füge Exam hinzu
-    data["exams"].append(new_exam)
-    
-    # Speichere Daten
-    save_json(data)
+    # Füge Exam hinzu und speichere
+    save_exam(new_exam)
     
     # Zeige Zusammenfassung
     print(f"\n[+] Neues Exam hinzugefügt:")
@@ -102,33 +115,189 @@ def add_exam(
     print(f"   ECTS: {ects}")
     print(f"   Datum: {date}")
     print(f"   Versuch: {versuch}")
+    if modul_id:
+        print(f"   Modul-ID: {modul_id}")
     if grade is not None:
         print(f"   Note: {grade}")
     else:
         print(f"   Note: (noch nicht geschrieben)")
 
 
-def list_exams() -> None:
+def resolve_course_name(name: str, index: CourseIndex) -> str:
+    existing = index.lookup(name)
+    if existing is not None:
+        if existing != name:
+            print(f"[i] Vorhandene Schreibweise wird verwendet: '{existing}'")
+        return existing
+
+    suggestions = index.suggest(name, limit=3)
+    if not suggestions:
+        return name
+    print(f"[?] '{name}' ist neu. Ähnliche vorhandene Module:")
+    for score, other in suggestions:
+        print(f"   - {other} (Ähnlichkeit {score:.2f})")
+    # Nur interaktiv nachfragen, Skripte laufen unverändert durch
+    if sys.stdin.isatty():
+        best = suggestions[0][1]
+        answer = input(f"Stattdessen '{best}' verwenden? [j/N] ").strip().lower()
+        if answer in {"j", "ja", "y", "yes"}:
+            return best
+    return name
+
+
+class ExamIndex:
+    def __init__(self, exams: List[Dict[str, Any]]) -> None:
+        self.exams = exams
+        self.by_semester: DefaultDict[int, List[int]] = defaultdict(list)
+        self.by_attempt: DefaultDict[int, List[int]] = defaultdict(list)
+        self.graded: List[int] = []
+        self.ungraded: List[int] = []
+        dated: List[Tuple[str, int]] = []
+
+        # Ein einziger Durchlauf über alle Exams baut sämtliche Indizes auf
+        for i, exam in enumerate(exams):
+            self.by_semester[int(exam.get("semester", 0))].append(i)
+            self.by_attempt[int(exam.get("versuch", 1))].append(i)
+            (self.graded if exam.get("note") is not None else self.ungraded).append(i)
+            if exam.get("datum"):
+                dated.append((exam["datum"], i))
+
+        dated.sort()
+        self._dates = [d for d, _ in dated]
+        self._date_rows = [i for _, i in dated]
+
+    def date_range(self, start: Optional[str], end: Optional[str]) -> List[int]:
+        lo = bisect_left(self._dates, start) if start else 0
+        hi = bisect_right(self._dates, end) if end else len(self._dates)
+        return self._date_rows[lo:hi]
+
+    def query(
+        self,
+        semester: Optional[int] = None,
+        name: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        graded: Optional[bool] = None,
+        versuch: Optional[int] = None,
+    ) -> List[int]:
+        candidates: List[List[int]] = []
+        if semester is not None:
+            candidates.append(self.by_semester.get(semester, []))
+        if versuch is not None:
+            candidates.append(self.by_attempt.get(versuch, []))
+        if graded is not None:
+            candidates.append(self.graded if graded else self.ungraded)
+        if date_from or date_to:
+            candidates.append(self.date_range(date_from, date_to))
+
+        if candidates:
+            # Mit der kleinsten Kandidatenliste beginnen, die übrigen nur noch schneiden
+            candidates.sort(key=len)
+            rows = set(candidates[0])
+            for other in candidates[1:]:
+                rows.intersection_update(other)
+                if not rows:
+                    break
+            result = sorted(rows)
+        else:
+            result = list(range(len(self.exams)))
+
+        if name:
+            # Vergleich auf normalisierten Namen: Groß-/Kleinschreibung, Umlaute, Satzzeichen egal
+            needle = normalize_name(name)
+            result = [i for i in result if needle in normalize_name(_exam_name(self.exams[i]))]
+        return result
+
+
+SORT_KEYS = {
+    "index": lambda exam: 0,
+    "semester": lambda exam: int(exam.get("semester", 0)),
+    "name": lambda exam: _exam_name(exam).casefold(),
+    "ects": lambda exam: int(exam.get("ects", 0)),
+    "datum": lambda exam: exam.get("datum") or "",
+    "versuch": lambda exam: int(exam.get("versuch", 1)),
+    # Exams ohne Note ans Ende sortieren
+    "note": lambda exam: (exam.get("note") is None, exam.get("note") or 0.0),
+}
+
+
+def _exam_name(exam: Dict[str, Any]) -> str:
+    return exam.get("prüfungsname") or exam.get("name", "Unbekannt")
+
+
+def _format_exam(i: int, exam: Dict[str, Any]) -> str:
+    semester = exam.get("semester", "?")
+    name = _exam_name(exam)
+    ects = exam.get("ects", "?")
+    date = exam.get("datum", "?")
+    versuch = exam.get("versuch", 1)
+    note = exam.get("note")
+
+    note_str = f"Note: {note}" if note is not None else "Noch nicht geschrieben"
+    return f"{i:2d}. S{semester} | {name} | {ects} ECTS | {date} | V{versuch} | {note_str}"
+
+
+def list_exams(
+    semester: Optional[int] = None,
+    name: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    graded: Optional[bool] = None,
+    versuch: Optional[int] = None,
+    sort: str = "index",
+    descending: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    fmt: str = "text",
+) -> None:
     data = load_json()
     exams = data.get("exams", [])
-    
+    index = ExamIndex(exams)
+    rows = index.query(semester, name, date_from, date_to, graded, versuch)
+
+    if sort == "index":
+        if descending:
+            rows.reverse()
+    else:
+        key = SORT_KEYS[sort]
+        # stabile Sortierung: bei Gleichstand bleibt die Dateireihenfolge erhalten
+        rows.sort(key=lambda i: key(exams[i]), reverse=descending)
+        if sort == "note" and descending:
+            # Exams ohne Note auch absteigend ans Ende
+            rows.sort(key=lambda i: exams[i].get("note") is None)
+
+    total = len(rows)
+    page = islice(rows, offset, None if limit is None else offset + limit)
+
+    if fmt == "json":
+        # Zeilenweise als JSON-Array streamen, damit auch große Ausgaben sofort fließen
+        out = sys.stdout
+        out.write("[")
+        for n, i in enumerate(page):
+            out.write(",\n " if n else "\n ")
+            out.write(json.dumps({"index": i + 1, **exams[i]}, ensure_ascii=False))
+        out.write("\n]\n")
+        return
+
     if not exams:
         print("Keine Exams vorhanden.")
         return
-    
-    print(f"\n[LISTE] Vorhandene Exams ({len(exams)}):")
+    if total == 0:
+        print("Keine passenden Exams gefunden.")
+        return
+    if offset >= total:
+        print(f"Keine Exams ab Position {offset + 1} ({total} Treffer).")
+        return
+
+    shown = min(total - offset, limit if limit is not None else total)
+    if shown < total:
+        print(f"\n[LISTE] Exams {offset + 1}-{offset + shown} von {total} Treffern (gesamt {len(exams)}):")
+    else:
+        print(f"\n[LISTE] Vorhandene Exams ({total}):")
     print("-" * 80)
-    
-    for i, exam in enumerate(exams, 1):
-        semester = exam.get("semester", "?")
-        name = exam.get("prüfungsname", "Unbekannt")
-        ects = exam.get("ects", "?")
-        date = exam.get("datum", "?")
-        versuch = exam.get("versuch", 1)
-        note = exam.get("note")
-        
-        note_str = f"Note: {note}" if note is not None else "Noch nicht geschrieben"
-        print(f"{i:2d}. S{semester} | {name} | {ects} ECTS | {date} | V{versuch} | {note_str}")
+
+    for i in page:
+        print(_format_exam(i + 1, exams[i]))
 
 
 def main():
@@ -148,6 +317,12 @@ Beispiele:
   
   # Alle Exams anzeigen
   python add_exam.py --list
+
+  # Alle ungeschriebenen Exams aus Semester 3
+  python add_exam.py --list -s 3 --ungraded
+
+  # Die 10 besten Noten als JSON
+  python add_exam.py --list --graded --sort note --limit 10 --format json
         """
     )
     
@@ -183,21 +358,102 @@ Beispiele:
     parser.add_argument(
         "-v", "--versuch",
         type=int,
-        default=1,
         help="Versuch (Standard: 1)"
     )
     
+    parser.add_argument(
+        "--id",
+        dest="modul_id",
+        help="Stabile Modul-ID (optional, z.B. aus dem Modulhandbuch); hat Vorrang vor dem Namen"
+    )
+    
+    parser.add_argument(
+        "--no-suggest",
+        dest="suggest",
+        action="store_false",
+        help="Keine Vorschläge für ähnliche Modulnamen"
+    )
+    
     parser.add_argument(
         "--list",
         action="store_true",
-        help="Zeigt alle vorhandenen Exams an"
+        help="Zeigt alle vorhandenen Exams an (mit -s, -n, -v als Filter)"
+    )
+
+    list_group = parser.add_argument_group("Filter und Ausgabe für --list")
+    list_group.add_argument(
+        "--from",
+        dest="date_from",
+        type=validate_date,
+        help="Nur Exams ab diesem Datum (YYYY-MM-DD)"
+    )
+    list_group.add_argument(
+        "--to",
+        dest="date_to",
+        type=validate_date,
+        help="Nur Exams bis zu diesem Datum (YYYY-MM-DD)"
+    )
+    graded_group = list_group.add_mutually_exclusive_group()
+    graded_group.add_argument(
+        "--graded",
+        dest="graded",
+        action="store_const",
+        const=True,
+        help="Nur benotete Exams"
+    )
+    graded_group.add_argument(
+        "--ungraded",
+        dest="graded",
+        action="store_const",
+        const=False,
+        help="Nur noch nicht geschriebene Exams"
+    )
+    list_group.add_argument(
+        "--sort",
+        choices=sorted(SORT_KEYS),
+        default="index",
+        help="Sortierung (Standard: Reihenfolge in der Datei)"
+    )
+    list_group.add_argument(
+        "--desc",
+        action="store_true",
+        help="Absteigend sortieren"
+    )
+    list_group.add_argument(
+        "--limit",
+        type=validate_count,
+        help="Maximale Anzahl ausgegebener Exams"
+    )
+    list_group.add_argument(
+        "--offset",
+        type=validate_count,
+        default=0,
+        help="Anzahl zu überspringender Exams (Standard: 0)"
+    )
+    list_group.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Ausgabeformat (Standard: text)"
     )
     
     args = parser.parse_args()
     
     # Wenn --list angegeben, zeige Exams und beende
     if args.list:
-        list_exams()
+        list_exams(
+            semester=args.semester,
+            name=args.name,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            graded=args.graded,
+            versuch=args.versuch,
+            sort=args.sort,
+            descending=args.desc,
+            limit=args.limit,
+            offset=args.offset,
+            fmt=args.format,
+        )
         return
     
     # Validiere, dass alle erforderlichen Argumente vorhanden sind
@@ -215,6 +471,8 @@ Beispiele:
         sys.exit(1)
     
     # Validiere Versuch
+    if args.versuch is None:
+        args.versuch = 1
     if args.versuch < 1:
         print("Fehler: Versuch muss mindestens 1 sein.")
         sys.exit(1)
@@ -226,7 +484,9 @@ Beispiele:
         ects=args.ects,
         date=args.date,
         grade=args.grade,
-        versuch=args.versuch
+        versuch=args.versuch,
+        modul_id=args.modul_id,
+        suggest=args.suggest
     )
 
 
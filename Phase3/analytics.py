@@ -2,9 +2,18 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from typing import Dict, Iterable, List, Optional, Tuple
 
+from courses import course_key
 from data_store import SemesterGrades, Course, get_general
 
 
+# fixed status bounds; in adaptive mode (thresholds.py) quantiles of the history replace them
+HOURS_BOUNDS = (25.0, 30.0)
+GRADE_BOUNDS = (1.8, 2.0, 2.5)
+SEMESTER_ECTS_BOUNDS = (25, 30)
+MONTH_ECTS_BOUNDS = (5, 10)
+BACKLOG_BOUNDS = (0, 1)
+
+
 @dataclass
 class KPIStatus:
 	value: float
@@ -16,25 +25,33 @@ def _latest_course_map(semesters: Iterable[SemesterGrades]):
 	latest: Dict[str, Tuple[Course, int]] = {}
 	for s in semesters:
 		for c in s.courses:
-			key = c.name
-			if key not in latest:
-				latest[key] = (c, s.semester)
-				continue
-			cur, cur_sem = latest[key]
-			if c.attempt > cur.attempt:
-				latest[key] = (c, s.semester)
-			elif c.attempt == cur.attempt:
-				if (c.date or date.min) > (cur.date or date.min):
-					latest[key] = (c, s.semester)
+			_add_latest(latest, c, s.semester)
 	return latest
 
 
+def _add_latest(latest: Dict[str, Tuple[Course, int]], c: Course, semester: int):
+	# spelling variants ("Mathematik"/"mathematik", "Übung"/"Uebung") and module IDs share one key
+	key = course_key(c.name, c.course_id)
+	if key not in latest:
+		latest[key] = (c, semester)
+		return
+	cur, cur_sem = latest[key]
+	if c.attempt > cur.attempt:
+		latest[key] = (c, semester)
+	elif c.attempt == cur.attempt:
+		if (c.date or date.min) > (cur.date or date.min):
+			latest[key] = (c, semester)
+
+
 def _latest_courses_list(semesters: Iterable[SemesterGrades]):
 	return [c for c, _ in _latest_course_map(semesters).values()]
 
 
 def semester_average_grades(semesters: Iterable[SemesterGrades]):
-	latest = _latest_course_map(list(semesters))
+	return semester_average_grades_from_latest(_latest_course_map(list(semesters)))
+
+
+def semester_average_grades_from_latest(latest: Dict[str, Tuple[Course, int]]):
 	acc: Dict[int, Tuple[float, int]] = {}
 	for c, sem in latest.values():
 		if sem == 0:
@@ -47,7 +64,11 @@ def semester_average_grades(semesters: Iterable[SemesterGrades]):
 
 
 def weighted_average_grade(semesters: Iterable[SemesterGrades]):
-	courses = _latest_courses_list(list(semesters))
+	return weighted_average_grade_from_latest(_latest_course_map(list(semesters)))
+
+
+def weighted_average_grade_from_latest(latest: Dict[str, Tuple[Course, int]]):
+	courses = [c for c, _ in latest.values()]
 	sum_weighted = 0.0
 	sum_ects = 0
 	for c in courses:
@@ -61,7 +82,10 @@ def weighted_average_grade(semesters: Iterable[SemesterGrades]):
 
 
 def ects_by_semester(semesters: Iterable[SemesterGrades]):
-	latest = _latest_course_map(list(semesters))
+	return ects_by_semester_from_latest(_latest_course_map(list(semesters)))
+
+
+def ects_by_semester_from_latest(latest: Dict[str, Tuple[Course, int]]):
 	result: Dict[int, int] = {}
 	for course, sem in latest.values():
 		if sem == 0:
@@ -72,7 +96,10 @@ def ects_by_semester(semesters: Iterable[SemesterGrades]):
 
 
 def ects_current_semester_month(semesters: Iterable[SemesterGrades], today: Optional[date] = None):
-	latest = _latest_course_map(list(semesters))
+	return ects_current_semester_month_from_latest(_latest_course_map(list(semesters)), today)
+
+
+def ects_current_semester_month_from_latest(latest: Dict[str, Tuple[Course, int]], today: Optional[date] = None):
 	if not latest:
 		return 0, 0
 	sems = [sem for _, sem in latest.values()]
@@ -87,29 +114,36 @@ def ects_current_semester_month(semesters: Iterable[SemesterGrades], today: Opti
 	return sem_ects, month_ects
 
 
-def ects_status(sem_ects: int, month_ects: int):
-	if month_ects >= 10:
+def ects_status(sem_ects: int, month_ects: int, sem_bounds=None, month_bounds=None):
+	low, high = month_bounds or MONTH_ECTS_BOUNDS
+	if month_ects == 0:
+		m = "red"
+	elif month_ects >= high:
 		m = "light_green"
-	elif month_ects >= 5:
+	elif month_ects >= low:
 		m = "green"
-	elif month_ects == 0:
-		m = "red"
 	else:
 		m = "orange"
+	return semester_ects_status(sem_ects, sem_bounds), m
 
-	if sem_ects > 30:
-		s = "light_green"
-	elif sem_ects == 30:
-		s = "green"
-	elif sem_ects < 25:
-		s = "red"
-	else:
-		s = "orange"
-	return s, m
+
+def semester_ects_status(sem_ects: int, bounds=None):
+	low, target = bounds or SEMESTER_ECTS_BOUNDS
+	if sem_ects > target:
+		return "light_green"
+	if sem_ects >= target:
+		return "green"
+	if sem_ects < low:
+		return "red"
+	return "orange"
 
 
 def pass_rate(semesters: Iterable[SemesterGrades]):
-	courses = _latest_courses_list(list(semesters))
+	return pass_rate_from_latest(_latest_course_map(list(semesters)))
+
+
+def pass_rate_from_latest(latest: Dict[str, Tuple[Course, int]]):
+	courses = [c for c, _ in latest.values()]
 	attempted = 0
 	passed = 0
 	for c in courses:
@@ -123,7 +157,11 @@ def pass_rate(semesters: Iterable[SemesterGrades]):
 
 
 def repeat_ratio(semesters: Iterable[SemesterGrades]):
-	courses = _latest_courses_list(list(semesters))
+	return repeat_ratio_from_latest(_latest_course_map(list(semesters)))
+
+
+def repeat_ratio_from_latest(latest: Dict[str, Tuple[Course, int]]):
+	courses = [c for c, _ in latest.values()]
 	failed = 0
 	success_after_repeat = 0
 	for c in courses:
@@ -145,23 +183,35 @@ def weekly_learning_hours(weeks: Iterable[Tuple[date, float]]):
 	return round(weeks[-1][1], 1)
 
 
-def learning_hours_status(hours: float):
+def learning_hours_status(hours: float, bounds=None):
+    low, high = bounds or HOURS_BOUNDS
     if hours is None:
         return "red"
-    if 25 <= hours <= 30:
+    if low <= hours <= high:
         return "green"
-    if hours > 30:
+    if hours > high:
         return "light_green"
     return "orange"
 
 
 
-def backlog_modules(semesters: Iterable[SemesterGrades], months_since_start: int):
-	# expectation: 5 ECTS per month, only count ECTS from latest passed attempts
-	general = get_general()
-	required = int(general["ects_required"])
+def backlog_modules(semesters: Iterable[SemesterGrades], months_since_start: int, catalog=None, today: Optional[date] = None):
+	return backlog_modules_from_latest(_latest_course_map(list(semesters)), months_since_start, catalog, today)
+
+
+def elapsed_months(general: Dict, today: Optional[date] = None):
+	today = today or date.today()
+	start = date.fromisoformat(general["start_date"])
+	return max(0, (today.year - start.year) * 12 + (today.month - start.month))
+
+
+def backlog_modules_from_latest(latest: Dict[str, Tuple[Course, int]], months_since_start: int, catalog=None, today: Optional[date] = None):
+	# with a curriculum.Catalog: modules of finished recommended semesters minus the passed ones
+	if catalog is not None:
+		return len(catalog.due(latest, months_since_start, today))
+	# fallback expectation: 5 ECTS per month, only count ECTS from latest passed attempts
 	completed = 0
-	for c in _latest_courses_list(list(semesters)):
+	for c, _ in latest.values():
 		if c.passed:
 			completed += c.ects
 	expected_ects = 5 * months_since_start
@@ -170,16 +220,20 @@ def backlog_modules(semesters: Iterable[SemesterGrades], months_since_start: int
 	return behind // 5
 
 
-def backlog_status(count: int):
-	if count == 0:
+def backlog_status(count: int, bounds=None):
+	ok, warn = bounds or BACKLOG_BOUNDS
+	if count <= ok:
 		return "green"
-	if count == 1:
+	if count <= warn:
 		return "orange"
 	return "red"
 
 
 def study_end_forecast(semesters: Iterable[SemesterGrades]):
-	general = get_general()
+	return study_end_forecast_from_latest(_latest_course_map(list(semesters)), get_general())
+
+
+def study_end_forecast_from_latest(latest: Dict[str, Tuple[Course, int]], general: Dict, today: Optional[date] = None):
 	start = date.fromisoformat(general["start_date"])
 	planned_months = int(general["planned_duration_months"])
 	planned_end = start + timedelta(days=planned_months * 30)
@@ -188,8 +242,7 @@ def study_end_forecast(semesters: Iterable[SemesterGrades]):
 	# Split completed into credited (semester 0) and earned in real semesters (>0)
 	credited_sem0 = 0
 	completed_non0 = 0
-	from_this = _latest_course_map(list(semesters))
-	for c, sem in from_this.values():
+	for c, sem in latest.values():
 		if c.passed:
 			if sem == 0:
 				credited_sem0 += c.ects
@@ -200,13 +253,13 @@ def study_end_forecast(semesters: Iterable[SemesterGrades]):
 	remaining = max(0, (required_total - credited_sem0) - completed_non0)
 
 	# average ECTS per semester from history (latest attempts, excluding semester 0)
-	by_sem = ects_by_semester(list(semesters))  # already excludes 0
+	by_sem = ects_by_semester_from_latest(latest)  # already excludes 0
 	sem_ects = list(by_sem.values())
 	avg_semester_ects = max(1.0, (sum(sem_ects) / len(sem_ects))) if sem_ects else 30.0
 	# convert to months: assume 6 months per semester
 	avg_month_ects = avg_semester_ects / 6.0
 	months_needed = int((remaining / avg_month_ects) if avg_month_ects > 0 else 0)
-	forecast_end = date.today() + timedelta(days=months_needed * 30)
+	forecast_end = (today or date.today()) + timedelta(days=months_needed * 30)
 
 	# color logic
 	if forecast_end < planned_end:
@@ -220,13 +273,14 @@ def study_end_forecast(semesters: Iterable[SemesterGrades]):
 	return forecast_end, status
 
 
-def grade_status(avg: Optional[float]):
+def grade_status(avg: Optional[float], bounds=None):
+	very_good, good, fair = bounds or GRADE_BOUNDS
 	if avg is None:
 		return "orange"
-	if avg < 1.8:
+	if avg < very_good:
 		return "light_green"
-	if 1.8 <= avg < 2.0:
+	if very_good <= avg < good:
 		return "green"
-	if 2.0 <= avg < 2.5:
+	if good <= avg < fair:
 		return "orange"
 	return "red"
@@ -1,24 +1,21 @@
 import tkinter as tk
-from tkinter import ttk
 from datetime import date, timedelta
+from tkinter import ttk, messagebox
 
-from data_store import get_general, get_semester_grades, get_study_time_weeks
+from data_store import get_general, set_snapshot_reads
 from weekly_time_dialog import WeeklyTimeDialog
 from analytics import (
-    weighted_average_grade,
-    ects_by_semester,
-    ects_current_semester_month,
-    ects_status,
-    pass_rate,
-    repeat_ratio,
-    learning_hours_status,
-    backlog_modules,
-    backlog_status,
-    study_end_forecast,
+    ects_by_semester_from_latest,
+    elapsed_months,
     grade_status,
-    semester_average_grades,
+    semester_ects_status,
+    semester_average_grades_from_latest,
 )
-from charts import bar_chart, line_chart
+from charts import bar_chart, scatter_chart, set_render_backend, weekly_hours_chart
+from clock import BoundaryScheduler
+from kpis import DEFAULT_CARDS, TIMELINE_FIELDS, Evaluation, registry
+from layout import LayoutManager, ResponsiveCanvas, StagedBuild
+from sessions import running_since, start_timer, stop_timer
 
 COLOR_BG = "#f8fafc"
 COLOR_PANEL = "#ffffff"
@@ -38,6 +35,27 @@ class Dashboard(tk.Tk):
         self.title("Studien-Dashboard")
         self.geometry("1350x850")
         self.configure(bg=COLOR_BG)
+        # exams and weeks come from the memory-mapped data.snap instead of parsing data.json
+        set_snapshot_reads(True)
+        self._layout = LayoutManager(self)
+        self._staged = None
+        self._clock = BoundaryScheduler(self)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+        self.bind("<F5>", lambda event: self.refresh())
+        self._build()
+
+    def _close(self):
+        # stages that have not run yet must not touch the destroyed widgets
+        self._staged.cancel()
+        self._clock.cancel()
+        self.destroy()
+
+    def refresh(self):
+        # reload everything from disk; a build still in progress is abandoned
+        self._staged.cancel()
+        self._clock.cancel()
+        self._content.destroy()
+        self._clock = BoundaryScheduler(self)
         self._build()
 
     def _get_progression_width(self, status: str, max_width: int) -> int:
@@ -53,216 +71,326 @@ class Dashboard(tk.Tk):
             return max_width // 4  # Default to red length
 
     def _build(self):
-        general = get_general()
-        semesters = get_semester_grades()
-        weeks = get_study_time_weeks()
-
-        content = ttk.Frame(self)
+        # Only the empty section frames are created here, so the first frame paints right away.
+        # The sections are filled in by priority, one after_idle task (and frame budget) each.
+        self._content = content = ttk.Frame(self)
         content.pack(fill=tk.BOTH, expand=True, padx=14, pady=14)
 
-        # Top KPIs grid
-        kpi_frame = ttk.Frame(content)
-        kpi_frame.pack(fill=tk.X)
-
+        self._kpi_frame = ttk.Frame(content)
+        self._kpi_frame.pack(fill=tk.X)
         for i in range(4):
-            kpi_frame.columnconfigure(i, weight=1)
-
-        # 1. Studienzeit forecast
-        forecast_date, forecast_status = study_end_forecast(semesters)
-        card1 = ttk.LabelFrame(kpi_frame, text="Studienzeit")
-        card1.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        ttk.Label(card1, text=f"Prognose Enddatum: {forecast_date.isoformat()}").pack(anchor="w")
-        self._progress_bar(card1, forecast_status)
-
-
-        # 2. Durchschnittsnote
-        avg = weighted_average_grade(semesters)
-        card2 = ttk.LabelFrame(kpi_frame, text="Durchschnittsnote")
-        card2.grid(row=0, column=1, sticky="nsew", padx=6, pady=6)
-        avg_txt = "-" if avg is None else f"{avg:.2f}"
-        ttk.Label(card2, text=f"Aktuell: {avg_txt}").pack(anchor="w")
-        grade_status_val = grade_status(avg)
-        self._progress_bar(card2, grade_status_val)
-
-
-        # 3. ECTS im Semester/Monat
-        sem_ects, month_ects = ects_current_semester_month(semesters)
-        sem_status, month_status = ects_status(sem_ects, month_ects)
-        card3 = ttk.LabelFrame(kpi_frame, text="ECTS")
-        card3.grid(row=0, column=2, sticky="nsew", padx=6, pady=6)
-        ttk.Label(card3, text=f"Aktuelles Semester: {sem_ects} ECTS").pack(anchor="w")
-        ttk.Label(card3, text=f"Diesen Monat: {month_ects} ECTS").pack(anchor="w")
-        self._progress_bar(card3, month_status)
-
-        # 4. Bestehensquote
-        rate = pass_rate(semesters)
-        card4 = ttk.LabelFrame(kpi_frame, text="Bestehensquote")
-        card4.grid(row=0, column=3, sticky="nsew", padx=6, pady=6)
-        rate_txt = "-" if rate is None else f"{int(rate*100)}%"
-        ttk.Label(card4, text=f"Dieses Semester: {rate_txt}").pack(anchor="w")
-
-        # Row 2
-        kpi2 = ttk.Frame(content)
-        kpi2.pack(fill=tk.X)
-        for i in range(3):
-            kpi2.columnconfigure(i, weight=1)
-
-        # Wiederholungsquote
-        rep = repeat_ratio(semesters)
-        card5 = ttk.LabelFrame(kpi2, text="Wiederholungsquote")
-        card5.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        rep_txt = "-" if rep is None or rep == float("inf") else f"{rep:.2f}"
-        ttk.Label(card5, text=f"Ratio: {rep_txt}").pack(anchor="w")
-
-        today = date.today()
-        current_week_start = today - timedelta(days=today.weekday())
-
-        # Find current week hours
-        current_week_hours = None
-        for week_date, hours in weeks:
-            if week_date == current_week_start:
-                current_week_hours = hours
-                break
-
-        card6 = ttk.LabelFrame(kpi2, text="Wöchentliche Lernzeit")
-        card6.grid(row=0, column=1, sticky="nsew", padx=6, pady=6)
-
-        w_txt = "-" if current_week_hours is None else f"{current_week_hours} h"
-        avg_hours = sum(week[1] for week in weeks) / len(weeks)
-
-        header = ttk.Frame(card6)
-        header.pack(fill=tk.X)
-
-        ttk.Label(header, text=f"Durchschnitt: {avg_hours:.1f} h").pack(anchor="w")
-        ttk.Button(header, text="+", width=3, command=self._open_weekly_time_dialog).pack(side=tk.RIGHT)
-        ttk.Label(card6, text=f"Diese Woche: {w_txt}").pack(anchor="w")
-
-        current_week_status = learning_hours_status(current_week_hours)
-        self._progress_bar(card6, current_week_status)
-
-
-# Backlog
-        months_since_start = max(0, (date.today().year - date.fromisoformat(general['start_date']).year) * 12 + (date.today().month - date.fromisoformat(general['start_date']).month))
-        backlog = backlog_modules(semesters, months_since_start)
-        card7 = ttk.LabelFrame(kpi2, text="Nachhol-Backlog")
-        card7.grid(row=0, column=2, sticky="nsew", padx=6, pady=6)
-        ttk.Label(card7, text=f"Module zurück: {backlog}").pack(anchor="w")
-        backlog_status_val = backlog_status(backlog)
-        self._progress_bar(card7, backlog_status_val)
-
-
-# Charts row
-        charts_row = ttk.Frame(content)
-        charts_row.pack(fill=tk.BOTH, expand=True)
-        charts_row.columnconfigure(0, weight=1)
-        charts_row.columnconfigure(1, weight=1)
+            self._kpi_frame.columnconfigure(i, weight=1)
+
+        self._as_of_frame = ttk.Frame(content)
+        self._as_of_frame.pack(fill=tk.X, padx=6)
+
+        self._charts_row = ttk.Frame(content)
+        self._charts_row.pack(fill=tk.BOTH, expand=True)
+        self._charts_row.columnconfigure(0, weight=1)
+        self._charts_row.columnconfigure(1, weight=1)
+
+        self._line_chart_frame = ttk.LabelFrame(content, text="Wöchentliche Lernzeit Verlauf")
+        self._line_chart_frame.pack(fill=tk.X, padx=6, pady=6)
+
+        self._correlation_frame = ttk.LabelFrame(content, text="")
+        self._correlation_frame.pack(fill=tk.X, padx=6, pady=6)
+
+        self._cards = {}
+        self._as_of_day = None  # None: cards show today's values
+        self._study_weeks = []
+        self._weeks_zoom = 1
+        self._line_view = None
+        self._correlation_view = None
+        self._staged = StagedBuild(self, [
+            ("kpis", self._build_kpis),
+            ("bar_charts", self._build_bar_charts),
+            ("line_chart", self._build_line_chart),
+            ("correlation", self._build_correlation),
+            ("validation", self._build_validation_banner),
+        ]).start()
+
+    def _build_kpis(self):
+        general = get_general()
+        set_render_backend(general["chart_backend"])
+        self._general = general
+
+        # KPI cards from the registry; only the visible ones are evaluated and only the inputs
+        # they read are loaded (with shards: the manifest, not every shard)
+        self._kpis = Evaluation(registry, {"general": general})
+        for i, key in enumerate(general.get("kpi_cards") or DEFAULT_CARDS):
+            if key not in registry.kpis:
+                continue
+            self._cards[key] = self._kpi_card(self._kpi_frame, i // 4, i % 4, key)
+            yield
+
+        # date-dependent cards are repainted when a day/week/month boundary passes
+        for boundary in {registry.kpis[key].boundary for key in self._cards} - {None}:
+            self._clock.register([boundary], lambda b=boundary: self._refresh_clock_cards(b))
+        if TIMELINE_FIELDS.keys() & self._cards.keys():
+            self._build_as_of_slider(general)
+
+    def _build_as_of_slider(self, general):
+        # one step per month since the start; the rightmost position is today
+        months = elapsed_months(general, date.today())
+        if months == 0:
+            return
+        start = date.fromisoformat(general["start_date"])
+        self._as_of_label = ttk.Label(self._as_of_frame, text="Stand: heute", width=24)
+        self._as_of_label.pack(side=tk.LEFT)
+        scale = ttk.Scale(self._as_of_frame, from_=0, to=months, value=months)
+        scale.configure(command=lambda value: self._show_as_of(start, round(float(value)), months))
+        scale.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    def _show_as_of(self, start: date, month: int, months: int):
+        day = None if month >= months else _month_end(start, month)
+        if day == self._as_of_day:
+            return
+        self._as_of_day = day
+        if day is None:
+            self._as_of_label.config(text="Stand: heute")
+        else:
+            ects = self._kpis.get("timeline").as_of(day).ects_total
+            self._as_of_label.config(text=f"Stand: {day.strftime('%m/%Y')} ({ects} ECTS)")
+        for key in TIMELINE_FIELDS.keys() & self._cards.keys():
+            self._refresh_card(key)
+
+    def _build_bar_charts(self):
+        latest = self._kpis.get("latest")
+        bounds = self._kpis.get("thresholds")
 
         # ECTS Fortschritt per Semester
-        frame_chart1 = ttk.LabelFrame(charts_row, text="ECTS-Fortschritt")
+        frame_chart1 = ttk.LabelFrame(self._charts_row, text="ECTS-Fortschritt")
         frame_chart1.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
         canvas1 = tk.Canvas(frame_chart1, height=280, bg=COLOR_BG, highlightthickness=0)
         canvas1.pack(fill=tk.BOTH, expand=True)
-        ects_map = ects_by_semester(semesters)
+        ects_map = ects_by_semester_from_latest(latest)
         sem_keys = sorted(ects_map.keys())
         values = [ects_map[s] for s in sem_keys]
         labels = [f"S{s}" for s in sem_keys]
 
         # Create colors based on ECTS status for each semester
-        colors = []
-        for ects in values:
-            if ects > 30:
-                colors.append(STATUS_COLORS["light_green"])
-            elif ects == 30:
-                colors.append(STATUS_COLORS["green"])
-            elif ects < 25:
-                colors.append(STATUS_COLORS["red"])
-            else:
-                colors.append(STATUS_COLORS["orange"])
+        colors = [STATUS_COLORS[semester_ects_status(ects, bounds.get("semester_ects"))] for ects in values]
 
-        bar_chart(canvas1, (40, 250), (480, 200), values, labels, colors)
+        self._layout.add(canvas1, self._bar_chart_drawer(values, labels, colors))
+        yield
 
         # Notenverlauf pro Semester (nur letzte Versuche)
-        frame_chart2 = ttk.LabelFrame(charts_row, text="Notenverlauf pro Semester")
+        frame_chart2 = ttk.LabelFrame(self._charts_row, text="Notenverlauf pro Semester")
         frame_chart2.grid(row=0, column=1, sticky="nsew", padx=6, pady=6)
         canvas2 = tk.Canvas(frame_chart2, height=280, bg=COLOR_BG, highlightthickness=0)
         canvas2.pack(fill=tk.BOTH, expand=True)
-        avg_map = semester_average_grades(semesters)
+        avg_map = semester_average_grades_from_latest(latest)
         sem_keys2 = sorted(avg_map.keys())
         avg_values = [avg_map[s] for s in sem_keys2]
 
         grade_colors = []
         for avg in avg_values:
-            grade_colors.append(STATUS_COLORS[grade_status(avg)])
+            grade_colors.append(STATUS_COLORS[grade_status(avg, bounds.get("grade"))])
 
-        bar_chart(canvas2, (40, 250), (480, 200), avg_values, [f"S{s}" for s in sem_keys2], grade_colors)
+        self._layout.add(canvas2, self._bar_chart_drawer(avg_values, [f"S{s}" for s in sem_keys2], grade_colors))
 
-        # Weekly Study Time Line Chart
-        line_chart_frame = ttk.LabelFrame(content, text="Wöchentliche Lernzeit Verlauf")
-        line_chart_frame.pack(fill=tk.X, padx=6, pady=6)
+    def _build_line_chart(self):
+        # the only section that needs every study week
+        self._study_weeks = self._kpis.get("weeks")
+        self._weeks_zoom = min(6, len(self._study_weeks)) or 1
 
         # Create scrollable frame for the chart
-        chart_container = tk.Frame(line_chart_frame)
+        chart_container = tk.Frame(self._line_chart_frame)
         chart_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # Create canvas with scrollbar
         line_canvas = tk.Canvas(chart_container, height=250, bg=COLOR_BG, highlightthickness=0)  # Made taller
-        scrollbar = ttk.Scrollbar(chart_container, orient="horizontal", command=line_canvas.xview)
+        scrollbar = ttk.Scrollbar(chart_container, orient="horizontal")
         line_canvas.configure(xscrollcommand=scrollbar.set)
 
         line_canvas.pack(side="top", fill="both", expand=True)
         scrollbar.pack(side="bottom", fill="x")
 
-        # Prepare data for line chart
-        study_weeks = get_study_time_weeks()
-        if study_weeks:
-            # Sort by date
-            study_weeks.sort(key=lambda x: x[0])
-
-            # Extract values and labels
-            hours_values = [week[1] for week in study_weeks]
-            week_labels = []
-
-            for week_date, _ in study_weeks:
-                # Format as week number (e.g., "KW 37")
-                week_num = week_date.isocalendar()[1]
-                week_labels.append(f"KW {week_num}")
-
-            weeks_to_show = min(6, len(hours_values))
-            base_width = 800  # Base width for 6 weeks
-            total_width = max(base_width, len(hours_values) * (base_width // weeks_to_show))
-
-            # Set scroll region
-            line_canvas.configure(scrollregion=(0, 0, total_width, 250))
-            line_chart(line_canvas, (60, 200), (total_width - 120, 150), hours_values, week_labels)
-
-            # Auto-scroll to the right to show latest weeks
-            line_canvas.after(100, lambda: line_canvas.xview_moveto(1.0))
+        self._line_view = self._layout.add(line_canvas, self._draw_weeks)
+
+        def scroll(*args):
+            line_canvas.xview(*args)
+            self._layout.mark_dirty(self._line_view, force=True)
+
+        scrollbar.configure(command=scroll)
+        line_canvas.bind("<Control-MouseWheel>", self._zoom_weeks)
+        line_canvas.bind("<Control-Button-4>", self._zoom_weeks)
+        line_canvas.bind("<Control-Button-5>", self._zoom_weeks)
+
+        # Auto-scroll to the right to show latest weeks
+        line_canvas.after(100, lambda: scroll("moveto", 1.0))
+
+    def _build_correlation(self):
+        # the correlation is only computed once the cheaper sections are on screen
+        from correlation import load_study_correlation
+
+        # Lernzeit vor Prüfungen vs. Note
+        correlation_canvas = tk.Canvas(self._correlation_frame, height=220, bg=COLOR_BG, highlightthickness=0)
+        correlation_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._correlation = load_study_correlation()
+        self._correlation_view = self._layout.add(correlation_canvas, self._draw_correlation)
+        self._update_correlation_title()
+
+    def _build_validation_banner(self):
+        from validation import validate_file
+
+        # Datenprüfung (Ergebnis wird pro Dateiinhalt gecacht)
+        report = validate_file()
+        if report.ok:
+            return
+        banner = tk.Frame(self._content, bg=STATUS_COLORS["orange"])
+        banner.pack(fill=tk.X, padx=6, pady=(0, 6), before=self._kpi_frame)
+        tk.Label(
+            banner,
+            text=f"Datenprüfung: {len(report.issues)} Problem(e) in data.json gefunden",
+            bg=STATUS_COLORS["orange"],
+            fg=COLOR_TEXT,
+        ).pack(side=tk.LEFT, padx=8, pady=4)
+        ttk.Button(banner, text="Details", command=lambda: self._show_validation(report)).pack(side=tk.RIGHT, padx=8, pady=4)
+
+    def _update_correlation_title(self):
+        result = self._correlation
+        r = "-" if result.grade_r is None else f"{result.grade_r:+.2f}"
+        self._correlation_frame.config(
+            text=f"Lernzeit {result.window_weeks} Wochen vor der Prüfung vs. Note (r = {r}, n = {len(result)})"
+        )
+
+    def _draw_correlation(self, c, w, h):
+        result = self._correlation
+        bounds = self._kpis.get("thresholds").get("grade")
+        colors = [STATUS_COLORS[grade_status(g, bounds)] for g in result.grades]
+        scatter_chart(
+            c, (50, h - 30), (max(50, w - 80), max(20, h - 50)),
+            result.hours.tolist(), result.grades.tolist(), colors, result.trend,
+        )
+
+    def _draw_weeks(self, c, w, h):
+        if not self._study_weeks:
+            c.configure(scrollregion=(0, 0, w, h))
+            c.create_text(w // 2, h // 2, text="Keine Lernzeit-Daten vorhanden", fill="#94a3b8", font=("Segoe UI", 14))
+            return
+        # `_weeks_zoom` weeks fill the visible width; zoomed out, weeks are merged into
+        # months/semesters and only the scrolled-in part is drawn
+        total_width = max(w, len(self._study_weeks) * (w // self._weeks_zoom))
+        c.configure(scrollregion=(0, 0, total_width, h))
+        visible = (c.canvasx(0), c.canvasx(w))
+        weekly_hours_chart(c, (60, h - 50), (total_width - 120, max(40, h - 100)), self._study_weeks, visible)
+
+    def _zoom_weeks(self, event):
+        step = 1 if event.delta < 0 or getattr(event, "num", None) == 5 else -1
+        weeks = min(len(self._study_weeks), max(2, self._weeks_zoom + step * max(1, self._weeks_zoom // 4)))
+        if weeks != self._weeks_zoom:
+            self._weeks_zoom = weeks
+            self._layout.mark_dirty(self._line_view, force=True)
+
+    def refresh_study_time(self):
+        # study hours changed (dialog or timer): update the weekly card and the chart in place
+        self._kpis.invalidate("weeks")
+        if "weekly_hours" in self._cards:
+            self._refresh_card("weekly_hours")
+        if self._line_view is not None:
+            zoom = self._weeks_zoom if self._study_weeks else 6
+            self._study_weeks = self._kpis.get("weeks")
+            self._weeks_zoom = max(1, min(zoom, len(self._study_weeks)))
+            self._layout.mark_dirty(self._line_view, force=True)
+        if self._correlation_view is not None:
+            from correlation import load_study_correlation
+            self._correlation = load_study_correlation()
+            self._update_correlation_title()
+            self._layout.mark_dirty(self._correlation_view, force=True)
+
+    def _kpi_card(self, parent: tk.Widget, row: int, column: int, key: str):
+        kpi = registry.kpis[key]
+        card = ttk.LabelFrame(parent, text=kpi.title)
+        card.grid(row=row, column=column, sticky="nsew", padx=6, pady=6)
+        if key == "weekly_hours":
+            ttk.Button(card, text="+", width=3, command=self._open_weekly_time_dialog).pack(side=tk.RIGHT, anchor="n")
+            self._timer_button = ttk.Button(card, width=3, command=self._toggle_timer)
+            self._timer_button.pack(side=tk.RIGHT, anchor="n")
+            self._update_timer_button()
+        labels = []
+        bar = self._progress_bar(card, "red") if kpi.status else None
+        view = {"labels": labels, "bar": bar, "card": card}
+        self._refresh_card(key, view)
+        return view
+
+    def _refresh_card(self, key: str, view=None):
+        view = view or self._cards[key]
+        if self._as_of_day is not None and key in TIMELINE_FIELDS:
+            snapshot = self._kpis.get("timeline").as_of(self._as_of_day)
+            result = self._kpis.result(key, getattr(snapshot, TIMELINE_FIELDS[key]))
         else:
-            line_canvas.create_text(400, 125, text="Keine Lernzeit-Daten vorhanden", fill="#94a3b8", font=("Segoe UI", 14))
+            result = self._kpis.kpi(key)
+        labels = view["labels"]
+        while len(labels) < len(result.lines):
+            label = ttk.Label(view["card"])
+            if view["bar"] is not None:
+                label.pack(anchor="w", before=view["bar"].canvas)
+            else:
+                label.pack(anchor="w")
+            labels.append(label)
+        for label, text in zip(labels, result.lines):
+            label.config(text=text)
+        if view["bar"] is not None:
+            self._set_progress(view["bar"], result.status)
+
+    def _refresh_clock_cards(self, boundary: str):
+        # the clock moved on: drop "today" and everything derived from it, repaint only affected cards
+        self._kpis.invalidate("today")
+        for key in self._cards:
+            if registry.kpis[key].boundary == boundary:
+                self._refresh_card(key)
+
+    def _update_timer_button(self):
+        started = running_since()
+        self._timer_button.config(text="■" if started else "▶")
+
+    def _toggle_timer(self):
+        if running_since() is None:
+            start_timer()
+        else:
+            stop_timer()
+            self.refresh_study_time()
+        self._update_timer_button()
+
+    def _show_validation(self, report):
+        lines = [f"- {issue.message}" for issue in report.issues[:20]]
+        if len(report.issues) > 20:
+            lines.append(f"... und {len(report.issues) - 20} weitere (python validation.py)")
+        messagebox.showwarning("Datenprüfung", "\n".join(lines), parent=self)
 
     def _open_weekly_time_dialog(self):
         dialog = WeeklyTimeDialog(self)
         self.wait_window(dialog)
 
-    def _progress_bar(self, parent: tk.Widget, status_key: str, height: int = 10) -> tk.Canvas:
+    def _bar_chart_drawer(self, values, labels, colors):
+        def draw(c, w, h):
+            bar_chart(c, (40, h - 30), (max(50, w - 80), max(20, h - 80)), values, labels, colors)
+        return draw
+
+    def _progress_bar(self, parent: tk.Widget, status_key: str, height: int = 10) -> ResponsiveCanvas:
         c = tk.Canvas(parent, height=height, bg=COLOR_BG, highlightthickness=0)
         c.pack(fill=tk.X, pady=(6, 0))
+        return self._layout.add(c, self._progress_drawer(status_key, height))
+
+    def _set_progress(self, view: ResponsiveCanvas, status_key: str, height: int = 10):
+        view.set_draw(self._progress_drawer(status_key, height))
 
-        def redraw(event=None):
-            w = c.winfo_width()
-            if w <= 1:
-                return
-            c.delete("all")
-            c.create_rectangle(
+    def _progress_drawer(self, status_key: str, height: int):
+        def draw(canvas, w, h):
+            canvas.create_rectangle(
                 0, 0,
                 self._get_progression_width(status_key, w), height,
                 fill=STATUS_COLORS[status_key],
                 outline=""
             )
+        return draw
 
-        c.bind("<Configure>", redraw)
-        return c
 
+def _month_end(start: date, months: int):
+    # last day of the month `months` after the start month
+    total = start.year * 12 + start.month + months
+    return date(total // 12, total % 12 + 1, 1) - timedelta(days=1)
 
 
 def run_app():
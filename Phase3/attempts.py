@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+
+from codec import read_json, write_json
+from courses import course_key
+from curriculum import counts_as_passed
+from data_store import Course, SemesterGrades, data_source, get_general, get_semester_grades
+
+# attempt records in data order as an append-only log, plus a small watermark file
+# (derived from the data, both safe to delete)
+ATTEMPTS_FILE = Path(__file__).with_name(".attempts.jsonl")
+FORMAT_VERSION = 1
+
+# examination regulations usually allow three attempts per module
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass
+class CourseHistory:
+	key: str
+	attempts: List[Tuple[Course, int]] = field(default_factory=list)  # (course, semester), oldest first
+	failures: int = 0
+	passed: bool = False  # latest attempt passed, by the curriculum.counts_as_passed rule
+	attempts_to_pass: Optional[int] = None  # position of the first passing attempt
+	days_to_pass: Optional[int] = None  # first attempt -> first pass, None if a date is missing
+	improvements: List[float] = field(default_factory=list)  # grade gain of retake 2, 3, ... (positive = better)
+
+	@property
+	def name(self):
+		return self.attempts[-1][0].name
+
+	@property
+	def latest(self):
+		return self.attempts[-1]
+
+
+def _order(course: Course):
+	return course.attempt, course.date or date.min
+
+
+def _summarize(history: CourseHistory, today: date):
+	# a registered retake without a grade is neither a failure nor a pass until its date is over
+	history.failures = sum(1 for c, _ in history.attempts if not c.passed)
+	history.passed = counts_as_passed(history.attempts[-1][0], today)
+	history.attempts_to_pass = None
+	history.days_to_pass = None
+	for i, (c, _) in enumerate(history.attempts):
+		if counts_as_passed(c, today):
+			history.attempts_to_pass = i + 1
+			first = history.attempts[0][0].date
+			if first is not None and c.date is not None:
+				history.days_to_pass = (c.date - first).days
+			break
+	grades = [c.grade for c, _ in history.attempts if c.grade is not None]
+	history.improvements = [round(before - after, 2) for before, after in zip(grades, grades[1:])]
+
+
+class AttemptIndex:
+	# course key -> ordered attempts. Every retake analytic is kept as a running aggregate
+	# that is corrected per course on append, so questions are answered without a rescan.
+	def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, today: Optional[date] = None):
+		self.max_attempts = max_attempts
+		self.today = today or date.today()  # ungraded attempts dated before it count as passed
+		self.courses: Dict[str, CourseHistory] = {}
+		self.distribution: Counter = Counter()  # attempts used -> number of modules
+		self._retake_gain: DefaultDict[int, List[float]] = defaultdict(lambda: [0.0, 0])  # retake no. -> [sum, count]
+		self._pass_days = [0, 0]  # [sum, count]
+		self._pass_attempts = [0, 0]
+		self._open_by_failures: DefaultDict[int, Set[str]] = defaultdict(set)  # not passed: failures -> keys
+
+	def __len__(self):
+		return len(self.courses)
+
+	def __contains__(self, key: str):
+		return key in self.courses
+
+	def _account(self, history: CourseHistory, sign: int):
+		self.distribution[len(history.attempts)] += sign
+		if self.distribution[len(history.attempts)] <= 0:
+			del self.distribution[len(history.attempts)]
+		for retake, gain in enumerate(history.improvements, start=2):
+			acc = self._retake_gain[retake]
+			acc[0] += sign * gain
+			acc[1] += sign
+		if history.days_to_pass is not None:
+			self._pass_days[0] += sign * history.days_to_pass
+			self._pass_days[1] += sign
+		if history.attempts_to_pass is not None:
+			self._pass_attempts[0] += sign * history.attempts_to_pass
+			self._pass_attempts[1] += sign
+		if not history.passed:
+			bucket = self._open_by_failures[history.failures]
+			if sign > 0:
+				bucket.add(history.key)
+			else:
+				bucket.discard(history.key)
+
+	def append(self, course: Course, semester: int):
+		self.extend([(course, semester)])
+		return self.courses[course_key(course.name, course.course_id)]
+
+	def extend(self, records: Iterable[Tuple[Course, int]]):
+		return self._insert((course_key(c.name, c.course_id), c, sem) for c, sem in records)
+
+	def _insert(self, keyed: Iterable[Tuple[str, Course, int]]):
+		# each touched course is taken out of the aggregates once, sorted and summarized once
+		pending: Dict[str, List[Tuple[Course, int]]] = {}
+		for key, course, semester in keyed:
+			if key not in pending:
+				pending[key] = []
+				history = self.courses.get(key)
+				if history is None:
+					self.courses[key] = CourseHistory(key)
+				else:
+					self._account(history, -1)
+			pending[key].append((course, semester))
+		for key, new in pending.items():
+			history = self.courses[key]
+			# new records go in front, newest first, so the stable sort leaves the first seen
+			# record last on a full tie (analytics._latest_course_map keeps the first seen)
+			history.attempts = new[::-1] + history.attempts
+			history.attempts.sort(key=lambda entry: _order(entry[0]))
+			_summarize(history, self.today)
+			self._account(history, +1)
+		return self
+
+	def lineage(self, key: str):
+		history = self.courses.get(key)
+		return list(history.attempts) if history else []
+
+	def latest_map(self):
+		# same result as analytics._latest_course_map over the indexed data
+		return {key: h.latest for key, h in self.courses.items()}
+
+	def time_to_pass(self, key: Optional[str] = None):
+		# days from the first attempt to the first pass, for one course or the mean over all
+		if key is not None:
+			history = self.courses.get(key)
+			return history.days_to_pass if history else None
+		total, count = self._pass_days
+		return round(total / count, 1) if count else None
+
+	def mean_attempts_to_pass(self):
+		total, count = self._pass_attempts
+		return round(total / count, 2) if count else None
+
+	def improvement_per_retake(self):
+		# retake number -> mean grade gain against the previous graded attempt
+		return {n: round(total / count, 2) for n, (total, count) in sorted(self._retake_gain.items()) if count}
+
+	def exhausted(self):
+		# not passed and no attempt left
+		return sorted(k for f, keys in self._open_by_failures.items() if f >= self.max_attempts for k in keys)
+
+	def at_risk(self):
+		# not passed and only the last attempt left
+		return sorted(self._open_by_failures.get(self.max_attempts - 1, ()))
+
+
+def _flatten(semesters: Iterable[SemesterGrades]):
+	return [(c, s.semester) for s in semesters for c in s.courses]
+
+
+def _record_crc(records: Iterable[Tuple[Course, int]], crc: int = 0):
+	for c, sem in records:
+		crc = zlib.crc32(f"{c.name}|{c.course_id}|{sem}|{c.ects}|{c.grade}|{c.passed}|{c.attempt}|{c.date}\n".encode(), crc)
+	return crc
+
+
+def _signature():
+	try:
+		st = os.stat(data_source())
+		return [st.st_mtime_ns, st.st_size]
+	except OSError:
+		return None
+
+
+def _course_to_row(course: Course, semester: int):
+	# the course key is stored too: loading skips the name normalization
+	return [course_key(course.name, course.course_id), course.name, course.course_id, semester, course.ects, course.grade, course.passed, course.attempt,
+		course.date.isoformat() if course.date else None]
+
+
+def _course_from_row(row: list):
+	key, name, course_id, semester, ects, grade, passed, attempt, day = row
+	return key, Course(name, ects, grade, passed, attempt, date.fromisoformat(day) if day else None, course_id), semester
+
+
+class AttemptStore:
+	# Watermark over the exam records in data order: how many are in the log and a CRC over
+	# them. Unchanged data -> the data is not read at all; appended exams -> only the new
+	# records are added to the log; anything else (edits, deletions) -> one rebuild.
+	def __init__(self, path: Path = ATTEMPTS_FILE):
+		self.path = Path(path)
+		self.meta_path = self.path.with_suffix(".meta.json")
+		self.signature = None
+		self.count = 0
+		self.crc = 0
+		self.rows: List[list] = []
+		try:
+			meta = read_json(self.meta_path)
+			with open(self.path, "r", encoding="utf-8") as f:
+				# one decoder call for the whole log instead of one per line
+				rows = json.loads("[" + ",".join(line for line in f if line.strip()) + "]")
+		except (OSError, ValueError):
+			return
+		if meta.get("version") != FORMAT_VERSION:
+			return
+		self.signature = meta.get("source")
+		self.count = int(meta.get("count", 0))
+		self.crc = int(meta.get("crc", 0))
+		self.rows = rows
+
+	def matches(self, records: List[Tuple[Course, int]]):
+		# are the logged records still the unchanged prefix of the data?
+		return len(self.rows) == self.count <= len(records) and _record_crc(records[:self.count]) == self.crc
+
+	def reset(self):
+		self.count, self.crc, self.rows = 0, 0, []
+
+	def save(self, new: List[Tuple[Course, int]], signature):
+		rows = [_course_to_row(c, sem) for c, sem in new]
+		try:
+			# the log is written before the watermark: a crash in between only costs a rebuild
+			with open(self.path, "a" if self.count else "w", encoding="utf-8") as f:
+				for row in rows:
+					f.write(json.dumps(row, ensure_ascii=False) + "\n")
+			self.signature = signature
+			self.count += len(new)
+			self.crc = _record_crc(new, self.crc)
+			self.rows += rows
+			write_json(self.meta_path, {"version": FORMAT_VERSION, "source": signature, "count": self.count, "crc": self.crc})
+		except OSError:
+			pass  # read-only install: rebuilt on the next start
+
+
+_cached: Dict[Path, Tuple[object, int, AttemptIndex]] = {}
+
+
+def load_attempt_index(max_attempts: Optional[int] = None, path: Path = ATTEMPTS_FILE, persist: bool = True, today: Optional[date] = None):
+	# persist=False: an existing log is still used, but nothing is written (read-only callers)
+	if max_attempts is None:
+		max_attempts = get_general()["max_attempts"]
+	today = today or date.today()
+	path = Path(path)
+	signature = _signature()
+	cached = _cached.get(path)
+	# the day is part of the key: a registered retake turns into a pass once its date is over
+	if cached is not None and signature is not None and cached[0] == signature and cached[1] == (max_attempts, today):
+		return cached[2]
+
+	store = AttemptStore(path)
+	if signature is None or store.signature != signature:
+		records = _flatten(get_semester_grades())
+		if not store.matches(records):
+			store.reset()
+		# the data was read anyway: its records plus the logged keys, no name normalization
+		index = AttemptIndex(max_attempts, today)._insert((row[0], c, sem) for row, (c, sem) in zip(store.rows, records))
+		new = records[store.count:]  # only the appended exams after the first run
+		index.extend(new)
+		if persist:
+			store.save(new, signature)
+	else:
+		index = AttemptIndex(max_attempts, today)._insert(_course_from_row(row) for row in store.rows)
+	_cached[path] = (signature, (max_attempts, today), index)
+	return index
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Prüfungsversuche je Modul: Wiederholungen, Zeit bis zum Bestehen, gefährdete Module")
+	parser.add_argument("module", nargs="?", help="Versuchsverlauf eines Moduls anzeigen (Name oder Modul-ID)")
+	parser.add_argument("--max-attempts", type=int, help="Erlaubte Versuche je Modul (Standard: max_versuche bzw. 3)")
+	args = parser.parse_args()
+
+	index = load_attempt_index(args.max_attempts)
+	if args.module:
+		key = course_key(args.module) if course_key(args.module) in index else course_key("", args.module)
+		history = index.courses.get(key)
+		if history is None:
+			print(f"Kein Modul '{args.module}' gefunden")
+			return
+		for c, sem in history.attempts:
+			grade = "-" if c.grade is None else f"{c.grade:.1f}"
+			state = "bestanden" if counts_as_passed(c, index.today) else ("angemeldet" if c.passed else "nicht bestanden")
+			print(f"Versuch {c.attempt}: {c.date or '-'}  Semester {sem}  Note {grade}  {state}")
+		if history.days_to_pass is not None:
+			print(f"Bestanden nach {history.attempts_to_pass} Versuch(en), {history.days_to_pass} Tage")
+		return
+
+	print(f"{len(index)} Module")
+	for attempts, modules in sorted(index.distribution.items()):
+		print(f"  {attempts} Versuch(e): {modules} Module")
+	mean_days = index.time_to_pass()
+	print(f"Ø Versuche bis bestanden: {index.mean_attempts_to_pass() or '-'}, Ø Tage bis bestanden: {'-' if mean_days is None else mean_days}")
+	for retake, gain in index.improvement_per_retake().items():
+		print(f"  Versuch {retake}: Ø {gain:+.2f} Notenstufen gegenüber dem vorigen Versuch")
+	for label, keys in (("Letzter Versuch", index.at_risk()), ("Keine Versuche mehr", index.exhausted())):
+		for key in keys:
+			history = index.courses[key]
+			print(f"! {label}: {history.name} ({history.failures} von {index.max_attempts} nicht bestanden)")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,4 +1,9 @@
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Optional
+import base64
+import io
 import tkinter as tk
 
 ColorBG = "#ffffff"
@@ -6,6 +11,28 @@ ColorAxis = "#94a3b8"
 ColorBar = "#10b981"
 ColorBarAlt = "#f59e0b"
 
+# "canvas" draws Tk primitives, "raster" blits a cached matplotlib (Agg) image
+RENDER_BACKENDS = ("canvas", "raster")
+_render_backend = "canvas"
+
+# padding around the plot area that the raster image covers (labels, tick texts)
+RASTER_PAD = (40, 10, 30, 30)  # left, top, right, bottom
+RASTER_CACHE_SIZE = 32
+
+def set_render_backend(name: str):
+	global _render_backend
+	if name not in RENDER_BACKENDS:
+		raise ValueError(f"unknown render backend: {name}")
+	_render_backend = name
+
+
+def get_render_backend():
+	return _render_backend
+
+
+def _theme(canvas: tk.Canvas):
+	return (str(canvas.cget("bg")), ColorAxis, ColorBar, "#475569", "#334155")
+
 
 def draw_axis(canvas: tk.Canvas, x: int, y: int, width: int, height: int):
 	canvas.create_line(x, y, x, y - height, fill=ColorAxis)
@@ -13,6 +40,9 @@ def draw_axis(canvas: tk.Canvas, x: int, y: int, width: int, height: int):
 
 
 def bar_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int], values: List[float], labels: List[str], colors: Optional[List[str]] = None):
+	if _render_backend == "raster":
+		key = ("bar", tuple(size), tuple(values), tuple(labels), tuple(colors or ()), _theme(canvas))
+		return _blit(canvas, origin, key)
 	x0, y0 = origin
 	width, height = size
 	draw_axis(canvas, x0, y0, width, height)
@@ -30,7 +60,20 @@ def bar_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int],
 		canvas.create_text(x + bar_w // 2, y0 - bar_h - 10, text=str(v), fill="#334155", font=("Segoe UI", 9))
 
 
-def line_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int], values: List[float], labels: List[str], color: str = "#10b981"):
+def line_chart(
+	canvas: tk.Canvas,
+	origin: Tuple[int, int],
+	size: Tuple[int, int],
+	values: List[float],
+	labels: List[str],
+	color: str = "#10b981",
+	bands: Optional[List[Tuple[float, float]]] = None,
+	visible: Optional[Tuple[float, float]] = None,
+):
+	# bands: optional (min, max) per point drawn as a shaded range behind the line
+	# visible: x range in canvas coordinates; points outside it are not drawn
+	if _render_backend == "raster" and len(values) >= 2:
+		return _blit_line(canvas, origin, size, values, labels, color, bands, visible)
 	x0, y0 = origin
 	width, height = size
 	draw_axis(canvas, x0, y0, width, height)
@@ -44,21 +87,34 @@ def line_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int]
 	max_val = max(values) or 1
 	max_scale = max(50, max_val)
 	
+	if bands:
+		max_scale = max(max_scale, max(hi for _, hi in bands))
+
 	# Calculate points for the line
+	step = (width - 40) / (len(values) - 1)
+	lo, hi = 0, len(values)
+	if visible is not None:
+		# one extra point on each side so the line runs out of the viewport
+		lo = max(0, int((visible[0] - x0 - 20) // step))
+		hi = min(len(values), int((visible[1] - x0 - 20) // step) + 2)
 	points = []
-	for i, v in enumerate(values):
-		x = x0 + 20 + (i * (width - 40) / (len(values) - 1))
-		y = y0 - 20 - (v / max_scale) * (height - 40)
+	for i in range(lo, hi):
+		x = x0 + 20 + i * step
+		y = y0 - 20 - (values[i] / max_scale) * (height - 40)
 		points.append((x, y))
-	
-	# Draw the line
-	for i in range(len(points) - 1):
-		x1, y1 = points[i]
-		x2, y2 = points[i + 1]
-		canvas.create_line(x1, y1, x2, y2, fill=color, width=2)
+
+	if bands:
+		upper = [(x, y0 - 20 - (bands[lo + i][1] / max_scale) * (height - 40)) for i, (x, _) in enumerate(points)]
+		lower = [(x, y0 - 20 - (bands[lo + i][0] / max_scale) * (height - 40)) for i, (x, _) in enumerate(points)]
+		if len(upper) >= 2:
+			canvas.create_polygon(*[c for p in upper + lower[::-1] for c in p], fill="#d1fae5", outline="")
+
+	# Draw the line as a single polyline item
+	if len(points) >= 2:
+		canvas.create_line(*[c for p in points for c in p], fill=color, width=2)
 	
 	# Draw points
-	for i, (x, y) in enumerate(points):
+	for i, (x, y) in enumerate(points, start=lo):
 		# Draw circle for each point
 		canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline="")
 		
@@ -70,7 +126,6 @@ def line_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int]
 			canvas.create_text(x, y0 + 15, text=labels[i], fill="#475569", font=("Segoe UI", 8))
 	
 	# Draw y-axis labels with 5-hour steps
-	max_scale = max(50, max_val)
 	y_steps = 10  # 0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50
 	for i in range(y_steps + 1):
 		value = i * 5  # 5-hour increments
@@ -86,4 +141,297 @@ def line_chart(canvas: tk.Canvas, origin: Tuple[int, int], size: Tuple[int, int]
 	if max_scale >= 30:
 		y30 = y0 - 20 - (30 / max_scale) * (height - 40)
 		canvas.create_line(x0 + 20, y30, x0 + width - 20, y30, fill="#ef4444", width=1, dash=(5, 5))
-		canvas.create_text(x0 + width - 15, y30, text="30h", fill="#ef4444", font=("Segoe UI", 8), anchor="w")
\ No newline at end of file
+		canvas.create_text(x0 + width - 15, y30, text="30h", fill="#ef4444", font=("Segoe UI", 8), anchor="w")
+
+
+GRADE_BEST, GRADE_WORST = 1.0, 5.0
+
+
+def _scatter_scale(xs: Sequence[float], width: int, height: int):
+	# plot-area coordinates (origin bottom left, y up); grades run 5.0 at the bottom to 1.0 at the top
+	x_max = (max(xs) * 1.05) or 1.0
+
+	def px(v: float):
+		return 10 + (v / x_max) * (width - 20)
+
+	def py(g: float):
+		g = min(GRADE_WORST, max(GRADE_BEST, g))
+		return 10 + (GRADE_WORST - g) / (GRADE_WORST - GRADE_BEST) * (height - 20)
+
+	return x_max, px, py
+
+
+def scatter_chart(
+	canvas: tk.Canvas,
+	origin: Tuple[int, int],
+	size: Tuple[int, int],
+	xs: Sequence[float],
+	ys: Sequence[float],
+	colors: Optional[Sequence[str]] = None,
+	trend: Optional[Tuple[float, float]] = None,
+):
+	# study hours (x) against grades (y) with an optional least-squares trend line
+	if _render_backend == "raster" and xs:
+		key = ("scatter", tuple(size), tuple(xs), tuple(ys), tuple(colors or ()), trend, _theme(canvas))
+		return _blit(canvas, origin, key)
+	x0, y0 = origin
+	width, height = size
+	draw_axis(canvas, x0, y0, width, height)
+	if not xs:
+		canvas.create_text(x0 + width // 2, y0 - height // 2, text="Keine Daten", fill="#94a3b8", font=("Segoe UI", 12))
+		return
+	x_max, px, py = _scatter_scale(xs, width, height)
+
+	for g in (1.0, 2.0, 3.0, 4.0, 5.0):
+		canvas.create_text(x0 - 8, y0 - py(g), text=f"{g:.1f}", fill="#475569", font=("Segoe UI", 8), anchor="e")
+	for v in (0.0, x_max / 2, x_max):
+		canvas.create_text(x0 + px(v), y0 + 12, text=f"{v:.0f} h", fill="#475569", font=("Segoe UI", 8))
+
+	if trend is not None:
+		slope, intercept = trend
+		canvas.create_line(
+			x0 + px(0), y0 - py(intercept), x0 + px(x_max), y0 - py(slope * x_max + intercept),
+			fill="#64748b", width=1, dash=(4, 3),
+		)
+	for i, (x, y) in enumerate(zip(xs, ys)):
+		cx, cy = x0 + px(x), y0 - py(y)
+		color = colors[i] if colors and i < len(colors) else ColorBar
+		canvas.create_oval(cx - 4, cy - 4, cx + 4, cy + 4, fill=color, outline="")
+
+
+# --- level of detail for the weekly hours chart ---------------------------
+
+# below this many pixels per point, weeks are aggregated (labels would overlap)
+LOD_MIN_SPACING = 36
+LOD_LEVELS = ("week", "month", "semester")
+MONTH_NAMES = ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+
+
+def _bucket(day: date, level: str):
+	if level == "week":
+		return day
+	if level == "month":
+		return date(day.year, day.month, 1)
+	# Sommersemester April-September, Wintersemester Oktober-März
+	if 4 <= day.month <= 9:
+		return date(day.year, 4, 1)
+	return date(day.year if day.month >= 10 else day.year - 1, 10, 1)
+
+
+def _bucket_label(start: date, level: str):
+	if level == "week":
+		return f"KW {start.isocalendar()[1]}"
+	if level == "month":
+		return f"{MONTH_NAMES[start.month - 1]} {start.year % 100:02d}"
+	if start.month == 4:
+		return f"SoSe {start.year % 100:02d}"
+	return f"WiSe {start.year % 100:02d}/{(start.year + 1) % 100:02d}"
+
+
+def aggregate_weeks(weeks: Sequence[Tuple[date, float]], level: str):
+	# weeks must be sorted; returns labels, means and (min, max) per bucket
+	labels: List[str] = []
+	means: List[float] = []
+	bands: List[Tuple[float, float]] = []
+	current = None
+	bucket_values: List[float] = []
+
+	def close():
+		labels.append(_bucket_label(current, level))
+		means.append(round(sum(bucket_values) / len(bucket_values), 1))
+		bands.append((min(bucket_values), max(bucket_values)))
+
+	for day, hours in weeks:
+		key = _bucket(day, level)
+		if key != current and bucket_values:
+			close()
+			bucket_values = []
+		current = key
+		bucket_values.append(hours)
+	if bucket_values:
+		close()
+	return labels, means, bands
+
+
+def lttb(values: Sequence[float], threshold: int):
+	# Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the visual shape
+	n = len(values)
+	if threshold >= n or threshold < 3:
+		return list(range(n))
+	picked = [0]
+	every = (n - 2) / (threshold - 2)
+	a = 0
+	for i in range(threshold - 2):
+		start = int(i * every) + 1
+		end = int((i + 1) * every) + 1
+		nxt_start, nxt_end = end, min(int((i + 2) * every) + 1, n)
+		avg_x = (nxt_start + nxt_end - 1) / 2
+		avg_y = sum(values[nxt_start:nxt_end]) / max(1, nxt_end - nxt_start)
+		best, best_area = start, -1.0
+		for j in range(start, min(end, n - 1)):
+			area = abs((a - avg_x) * (values[j] - values[a]) - (a - j) * (avg_y - values[a]))
+			if area > best_area:
+				best, best_area = j, area
+		picked.append(best)
+		a = best
+	picked.append(n - 1)
+	return picked
+
+
+def choose_level(weeks: Sequence[Tuple[date, float]], width: int):
+	for level in LOD_LEVELS:
+		buckets = len({_bucket(day, level) for day, _ in weeks}) if level != "week" else len(weeks)
+		if buckets < 2 or width / buckets >= LOD_MIN_SPACING:
+			return level
+	return LOD_LEVELS[-1]
+
+
+def weekly_hours_chart(
+	canvas: tk.Canvas,
+	origin: Tuple[int, int],
+	size: Tuple[int, int],
+	weeks: Sequence[Tuple[date, float]],
+	visible: Optional[Tuple[float, float]] = None,
+):
+	# picks the finest level whose points are at least LOD_MIN_SPACING apart; if even
+	# semesters are too dense the series is thinned with LTTB, so the item count is bounded
+	width = size[0]
+	level = choose_level(weeks, width)
+	labels, values, bands = aggregate_weeks(weeks, level)
+	budget = max(3, width // LOD_MIN_SPACING)
+	if len(values) > budget:
+		keep = lttb(values, budget)
+		labels = [labels[i] for i in keep]
+		values = [values[i] for i in keep]
+		bands = [bands[i] for i in keep]
+	line_chart(canvas, origin, size, values, labels, bands=None if level == "week" else bands, visible=visible)
+	return level
+
+
+def _blit_line(canvas, origin, size, values, labels, color, bands, visible):
+	# Only the points in (or next to) the viewport are rendered, snapped to whole points:
+	# the image stays about one viewport wide and scrolling re-renders only when a point
+	# enters or leaves. Scale and step come from the full series so slices line up.
+	width, height = size
+	n = len(values)
+	max_scale = max(50, max(values) or 1, max((hi for _, hi in bands or ()), default=0))
+	step = (width - 40) / (n - 1)
+	lo, hi = 0, n
+	if visible is not None:
+		lo = max(0, min(n - 2, int((visible[0] - origin[0] - 20) // step)))
+		hi = max(lo + 2, min(n, int((visible[1] - origin[0] - 20) // step) + 2))
+	view_w = round((hi - 1 - lo) * step) + 40
+	key = (
+		"line", (view_w, height), tuple(values[lo:hi]), tuple(labels[lo:hi]), color, tuple((bands or ())[lo:hi]),
+		(max_scale, step, lo == 0, hi == n), _theme(canvas),
+	)
+	return _blit(canvas, (origin[0] + round(lo * step), origin[1]), key)
+
+
+def _blit(canvas: tk.Canvas, origin: Tuple[int, int], key: tuple):
+	# one image item per chart; PhotoImages are cached on the Tk root they belong to,
+	# so they go away with it and a later root never sees them
+	cache = canvas._root().__dict__.setdefault("_chart_photos", OrderedDict())
+	photo = cache.get(key)
+	if photo is None:
+		photo = tk.PhotoImage(master=canvas, data=_render_png(key))
+		cache[key] = photo
+		if len(cache) > RASTER_CACHE_SIZE:
+			cache.popitem(last=False)
+	else:
+		cache.move_to_end(key)
+	# keep a reference on the canvas as long as it displays the image
+	refs = canvas.__dict__.setdefault("_chart_images", [])
+	refs.append(photo)
+	x0, y0 = origin
+	height = key[1][1]
+	left, top = RASTER_PAD[0], RASTER_PAD[1]
+	return canvas.create_image(x0 - left, y0 - height - top, image=photo, anchor="nw")
+
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def _render_png(key: tuple):
+	# PNG bytes survive dashboard rebuilds; only PhotoImages are bound to a Tk root
+	from matplotlib.figure import Figure
+	from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+	kind, (width, height) = key[0], key[1]
+	bg, axis, bar, label_color, value_color = key[-1]
+	left, top, right, bottom = RASTER_PAD
+	dpi = 100
+	total_w, total_h = width + left + right, height + top + bottom
+	fig = Figure(figsize=(total_w / dpi, total_h / dpi), dpi=dpi, facecolor=bg)
+	FigureCanvasAgg(fig)
+	# axes cover exactly the plot area so pixel positions match the canvas backend
+	ax = fig.add_axes((left / total_w, bottom / total_h, width / total_w, height / total_h))
+	ax.set_facecolor(bg)
+	ax.set_xlim(0, width)
+	ax.set_ylim(0, height)
+	for side in ("top", "right"):
+		ax.spines[side].set_visible(False)
+	for side in ("left", "bottom"):
+		ax.spines[side].set_color(axis)
+	ax.set_xticks([])
+	ax.set_yticks([])
+	font = {"fontsize": 7, "family": "sans-serif"}
+
+	if kind == "bar":
+		_, _, values, labels, colors, _ = key
+		if values:
+			max_val = max(values) or 1
+			bar_w = max(10, int(width / (len(values) * 1.5)))
+			gap = int(bar_w * 0.5)
+			for i, v in enumerate(values):
+				x = 10 + i * (bar_w + gap)
+				bar_h = int((v / max_val) * (height - 10))
+				ax.add_patch(_rect(x, bar_h, bar_w, colors[i] if i < len(colors) else bar))
+				ax.text(x + bar_w / 2, -12, labels[i], color=label_color, ha="center", va="center", clip_on=False, **font)
+				ax.text(x + bar_w / 2, bar_h + 10, str(v), color=value_color, ha="center", va="center", clip_on=False, **font)
+	elif kind == "scatter":
+		_, _, xs, ys, colors, trend, _ = key
+		x_max, px, py = _scatter_scale(xs, width, height)
+		for g in (1.0, 2.0, 3.0, 4.0, 5.0):
+			ax.text(-8, py(g), f"{g:.1f}", color=label_color, ha="right", va="center", clip_on=False, **font)
+		for v in (0.0, x_max / 2, x_max):
+			ax.text(px(v), -12, f"{v:.0f} h", color=label_color, ha="center", va="center", clip_on=False, **font)
+		if trend is not None:
+			slope, intercept = trend
+			ax.plot([px(0), px(x_max)], [py(intercept), py(slope * x_max + intercept)], color="#64748b", linewidth=1, linestyle=(0, (4, 3)))
+		ax.scatter([px(x) for x in xs], [py(y) for y in ys], s=30, c=[colors[i] if i < len(colors) else bar for i in range(len(xs))], linewidths=0)
+	else:
+		# values, labels and bands may be a slice; first/last: the slice starts/ends the series
+		_, _, values, labels, color, bands, (max_scale, step, first, last), _ = key
+		xs = [20 + i * step for i in range(len(values))]
+		ys = [20 + (v / max_scale) * (height - 40) for v in values]
+		if not first:
+			ax.spines["left"].set_visible(False)
+		if bands:
+			ax.fill_between(
+				xs,
+				[20 + (lo / max_scale) * (height - 40) for lo, _ in bands],
+				[20 + (hi / max_scale) * (height - 40) for _, hi in bands],
+				color="#d1fae5", linewidth=0,
+			)
+		ax.plot(xs, ys, color=color, linewidth=2, marker="o", markersize=4, clip_on=False)
+		for i, (x, y) in enumerate(zip(xs, ys)):
+			ax.text(x, y + 15, f"{values[i]:.1f}h", color=value_color, ha="center", va="center", clip_on=False, **font)
+			if i < len(labels):
+				ax.text(x, -15, labels[i], color=label_color, ha="center", va="center", clip_on=False, **font)
+		if first:
+			for tick in range(11):
+				value = tick * 5
+				ax.text(-10, 20 + (value / max_scale) * (height - 40), f"{value:.0f}", color=label_color, ha="right", va="center", clip_on=False, **font)
+		for target in (25, 30):
+			y = 20 + (target / max_scale) * (height - 40)
+			ax.plot([20 if first else 0, width - 20 if last else width], [y, y], color="#ef4444", linewidth=1, linestyle=(0, (5, 5)))
+			if last:
+				ax.text(width - 15, y, f"{target}h", color="#ef4444", ha="left", va="center", clip_on=False, **font)
+
+	buf = io.BytesIO()
+	fig.savefig(buf, format="png", dpi=dpi, facecolor=bg)
+	return base64.b64encode(buf.getvalue())
+
+
+def _rect(x: float, h: float, w: float, color: str):
+	from matplotlib.patches import Rectangle
+	return Rectangle((x, 0), w, h, facecolor=color, edgecolor="none")
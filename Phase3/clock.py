@@ -0,0 +1,69 @@
+import tkinter as tk
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+
+# Tk's after() takes a 32-bit millisecond delay (~24.8 days); longer sleeps are split
+MAX_SLEEP_MS = 2_000_000_000
+
+
+def next_boundary(now: datetime, kind: str) -> datetime:
+    today = now.date()
+    if kind == DAY:
+        nxt = today + timedelta(days=1)
+    elif kind == WEEK:
+        nxt = today + timedelta(days=7 - today.weekday())
+    elif kind == MONTH:
+        nxt = date(today.year + 1, 1, 1) if today.month == 12 else date(today.year, today.month + 1, 1)
+    else:
+        raise ValueError(f"unknown boundary: {kind}")
+    return datetime.combine(nxt, time.min)
+
+
+class BoundaryScheduler:
+    # Sleeps on the Tk loop until the next day/week/month boundary that some
+    # registered callback depends on, then runs only those callbacks.
+    def __init__(self, root: tk.Misc, now: Callable[[], datetime] = datetime.now):
+        self.root = root
+        self.now = now
+        self._callbacks: List[Tuple[Set[str], Callable[[], None]]] = []
+        self._due: Dict[str, datetime] = {}
+        self._after_id: Optional[str] = None
+
+    def register(self, kinds: Iterable[str], callback: Callable[[], None]):
+        self._callbacks.append((set(kinds), callback))
+        self._reschedule()
+
+    def cancel(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _reschedule(self):
+        self.cancel()
+        now = self.now()
+        kinds = set().union(*(k for k, _ in self._callbacks)) if self._callbacks else set()
+        self._due = {kind: self._due.get(kind) or next_boundary(now, kind) for kind in kinds}
+        if not self._due:
+            return
+        wake = min(self._due.values())
+        # +50 ms so we wake up just after the boundary, never right before it
+        delay = int((wake - now).total_seconds() * 1000) + 50
+        self._after_id = self.root.after(max(0, min(delay, MAX_SLEEP_MS)), self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        now = self.now()
+        crossed = {kind for kind, due in self._due.items() if due <= now}
+        for kind in crossed:
+            self._due[kind] = next_boundary(now, kind)
+        for kinds, callback in self._callbacks:
+            if kinds & crossed:
+                callback()
+        self._reschedule()
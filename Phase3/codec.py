@@ -0,0 +1,144 @@
+import argparse
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# name -> (magic bytes, file extensions); the compression modules are imported on first use
+CODECS: Dict[str, Tuple[bytes, Tuple[str, ...]]] = {
+	"gzip": (b"\x1f\x8b", (".gz", ".gzip")),
+	"bz2": (b"BZh", (".bz2",)),
+	"lzma": (b"\xfd7zXZ\x00", (".xz", ".lzma")),
+}
+PLAIN = "plain"
+
+# compact by default; pass indent=2 for a hand-editable file
+COMPACT = (",", ":")
+
+
+def codec_for_name(path: Path):
+	suffix = Path(path).suffix.lower()
+	for name, (_, extensions) in CODECS.items():
+		if suffix in extensions:
+			return name
+	return PLAIN
+
+
+def sniff(head: bytes):
+	for name, (magic, _) in CODECS.items():
+		if head.startswith(magic):
+			return name
+	return PLAIN
+
+
+def detect(path: Path):
+	# magic bytes win over the extension, so a gzip file called data.json still loads
+	try:
+		with open(path, "rb") as f:
+			return sniff(f.read(6))
+	except OSError:
+		return codec_for_name(path)
+
+
+def _module(codec: str):
+	if codec == "gzip":
+		import gzip
+		return gzip
+	if codec == "bz2":
+		import bz2
+		return bz2
+	if codec == "lzma":
+		import lzma
+		return lzma
+	raise ValueError(f"unknown codec: {codec}")
+
+
+def open_stream(path: Path, mode: str = "rb", codec: Optional[str] = None):
+	# binary file object that (de)compresses on the fly while it is read or written
+	if codec is None:
+		codec = detect(path) if "r" in mode else codec_for_name(path)
+	if codec == PLAIN:
+		return open(path, mode)
+	if codec == "gzip":
+		# mtime=0: identical data gives identical bytes (stable hashes, no spurious sync)
+		import gzip
+		return gzip.GzipFile(path, mode, compresslevel=6, mtime=0)
+	return _module(codec).open(path, mode)
+
+
+def find_data_file(path: Path):
+	# data.json, or a compressed variant (data.json.gz, .bz2, .xz) if only that exists
+	path = Path(path)
+	if path.exists():
+		return path
+	for _, extensions in CODECS.values():
+		candidate = path.with_name(path.name + extensions[0])
+		if candidate.exists():
+			return candidate
+	return path
+
+
+def read_json(path: Path):
+	with io.TextIOWrapper(open_stream(path, "rb"), encoding="utf-8") as f:
+		return json.load(f)
+
+
+def loads(raw: bytes):
+	codec = sniff(raw[:6])
+	if codec != PLAIN:
+		raw = _module(codec).decompress(raw)
+	return json.loads(raw.decode("utf-8"))
+
+
+def dumps(data: Any, indent: Optional[int] = None):
+	# UTF-8 bytes, compact unless an indent is given
+	return json.dumps(data, ensure_ascii=False, indent=indent, separators=None if indent else COMPACT).encode("utf-8")
+
+
+def write_json(path: Path, data: Any, codec: Optional[str] = None, indent: Optional[int] = None):
+	# streams the encoder output through the compressor into a temp file, then swaps it in;
+	# an existing file keeps its format, a new one gets it from the extension
+	path = Path(path)
+	codec = codec or (detect(path) if path.exists() else codec_for_name(path))
+	tmp = path.with_name(path.name + ".tmp")
+	with open_stream(tmp, "wb", codec) as raw:
+		with io.TextIOWrapper(raw, encoding="utf-8") as f:
+			json.dump(data, f, ensure_ascii=False, indent=indent, separators=None if indent else COMPACT)
+	os.replace(tmp, path)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Datendateien komprimieren, entpacken oder prüfen")
+	sub = parser.add_subparsers(dest="command", required=True)
+	convert = sub.add_parser("convert", help="JSON-Datei umwandeln (Format nach Endung des Ziels)")
+	convert.add_argument("source", type=Path)
+	convert.add_argument("target", type=Path)
+	convert.add_argument("--indent", type=int, help="Eingerückt statt kompakt schreiben")
+	convert.add_argument("--remove", action="store_true", help="Quelldatei danach löschen")
+	info = sub.add_parser("info", help="Format und Größe anzeigen")
+	info.add_argument("files", nargs="+", type=Path)
+	args = parser.parse_args()
+
+	if args.command == "convert":
+		try:
+			data = read_json(args.source)
+		except (OSError, ValueError) as e:
+			print(f"Fehler beim Lesen von {args.source}: {e}")
+			sys.exit(1)
+		write_json(args.target, data, indent=args.indent)
+		before, after = args.source.stat().st_size, args.target.stat().st_size
+		print(f"[OK] {args.source} ({before} B) -> {args.target} ({after} B, {codec_for_name(args.target)})")
+		if args.remove and args.source.resolve() != args.target.resolve():
+			args.source.unlink()
+	else:
+		for path in args.files:
+			if not path.exists():
+				print(f"{path}: nicht gefunden")
+				continue
+			print(f"{path}: {detect(path)}, {path.stat().st_size} B")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from courses import course_key
+
+
+@dataclass
+class ExamColumns:
+	names: List[str]  # distinct course names, indexed by name_code
+	name_code: np.ndarray  # int32
+	semester: np.ndarray  # int32
+	ects: np.ndarray  # int32
+	grade: np.ndarray  # float64, NaN = no grade yet
+	attempt: np.ndarray  # int32
+	date: np.ndarray  # datetime64[D], NaT = no date
+	passed_flag: np.ndarray  # float64 1/0 for an explicit "passed" field, NaN if absent
+	keys: List[str]  # course_key per name_code ("id:..." for records with a modul_id)
+
+	def __len__(self):
+		return int(self.name_code.size)
+
+
+@dataclass
+class WeekColumns:
+	week_start: np.ndarray  # datetime64[D]
+	hours: np.ndarray  # float64
+
+	def __len__(self):
+		return int(self.week_start.size)
+
+
+def _flag(value: Any):
+	if value is None:
+		return np.nan
+	if isinstance(value, bool):
+		return float(value)
+	return 1.0 if str(value).strip().lower() in {"true", "1", "ja", "yes", "y"} else 0.0
+
+
+def exam_columns(data: Dict[str, Any]):
+	# list comprehensions + one array conversion per column; courses are interned into codes
+	# by their normalized key, names keeps the first spelling of each
+	exams = data.get("exams", [])
+	codes: Dict[str, int] = {}
+	names: List[str] = []
+	raw_names = [e.get("prüfungsname") or e.get("name", "Kurs") for e in exams]
+	keys = [course_key(n, e.get("modul_id")) for n, e in zip(raw_names, exams)]
+	for key, name in zip(keys, raw_names):
+		if key not in codes:
+			codes[key] = len(codes)
+			names.append(name)
+	name_code = np.array([codes[k] for k in keys], dtype=np.int32)
+	semester = np.array([e.get("semester", 0) for e in exams], dtype=np.int32)
+	ects = np.array([e.get("ects", 0) for e in exams], dtype=np.int32)
+	grade = np.array([e.get("note") if e.get("note") is not None else np.nan for e in exams], dtype=np.float64)
+	attempt = np.array([e.get("versuch", 1) for e in exams], dtype=np.int32)
+	dates = np.array([e.get("datum") or "NaT" for e in exams], dtype="datetime64[D]")
+	passed_flag = np.array([_flag(e.get("passed", e.get("bestanden"))) for e in exams], dtype=np.float64)
+	return ExamColumns(names, name_code, semester, ects, grade, attempt, dates, passed_flag, list(codes))
+
+
+def week_columns(data: Dict[str, Any]):
+	weeks = data.get("study_time", [])
+	week_start = np.array([w["week_start"] for w in weeks], dtype="datetime64[D]")
+	hours = np.array([float(w["hours"]) for w in weeks], dtype=np.float64)
+	return WeekColumns(week_start, hours)
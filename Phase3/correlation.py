@@ -0,0 +1,142 @@
+import argparse
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from columns import ExamColumns, exam_columns
+from data_store import get_study_time_weeks, load_json
+from snapshot import load_columns
+
+DEFAULT_WINDOW_WEEKS = 4
+
+
+def window_sums(week_start: np.ndarray, hours: np.ndarray, days: np.ndarray, weeks: int):
+	# Study hours of the weeks starting in [day - weeks*7, day) for every day, as a sorted-merge
+	# join: two searchsorted calls and a prefix sum, O((n + m) log n) instead of n*m.
+	# Also returns how many recorded weeks fell into each window (0 = no data, not "0 hours").
+	order = np.argsort(week_start, kind="stable")
+	starts = week_start[order]
+	prefix = np.concatenate(([0.0], np.cumsum(hours[order])))
+	lo = np.searchsorted(starts, days - np.timedelta64(7 * weeks, "D"), side="left")
+	hi = np.searchsorted(starts, days, side="left")
+	return prefix[hi] - prefix[lo], hi - lo
+
+
+def _pearson(x: np.ndarray, y: np.ndarray):
+	if x.size < 3 or np.ptp(x) == 0 or np.ptp(y) == 0:
+		return None
+	return float(np.corrcoef(x, y)[0, 1])
+
+
+def _ranks(x: np.ndarray):
+	# average ranks for ties
+	_, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+	ends = np.cumsum(counts)
+	return ((ends - counts + 1 + ends) / 2.0)[inverse]
+
+
+@dataclass
+class StudyCorrelation:
+	window_weeks: int
+	rows: np.ndarray  # exam indices (into data["exams"]) with a grade and study data
+	names: List[str]
+	hours: np.ndarray  # study hours in the window before each exam
+	grades: np.ndarray
+	passed: np.ndarray  # bool
+	grade_r: Optional[float]  # Pearson; negative = more hours, better (lower) grade
+	grade_rho: Optional[float]  # Spearman, robust against a few very long weeks
+	trend: Optional[Tuple[float, float]]  # least squares grade = slope * hours + intercept
+	pass_r: Optional[float]  # point-biserial: hours vs. passed
+	hours_passed: Optional[float]  # mean window hours of passed / failed attempts
+	hours_failed: Optional[float]
+	skipped: int  # graded exams without any recorded week in their window
+
+	def __len__(self):
+		return int(self.rows.size)
+
+
+def study_correlation(
+	cols: ExamColumns,
+	weeks: Sequence[Tuple[object, float]],
+	window_weeks: int = DEFAULT_WINDOW_WEEKS,
+):
+	# every dated, graded attempt is its own observation (a retake has its own preparation)
+	candidates = np.flatnonzero(~np.isnan(cols.grade) & ~np.isnat(cols.date))
+	week_start = np.array([w for w, _ in weeks], dtype="datetime64[D]")
+	hours = np.array([h for _, h in weeks], dtype=np.float64)
+	sums, covered = window_sums(week_start, hours, cols.date[candidates], window_weeks)
+
+	keep = covered > 0
+	rows = candidates[keep]
+	x = sums[keep]
+	grades = cols.grade[rows]
+	passed = grades < 5.0
+
+	trend = None
+	if x.size >= 2 and np.ptp(x) > 0:
+		slope, intercept = np.polyfit(x, grades, 1)
+		trend = (float(slope), float(intercept))
+	grade_rho = _pearson(_ranks(x), _ranks(grades)) if x.size >= 3 else None
+
+	return StudyCorrelation(
+		window_weeks=window_weeks,
+		rows=rows,
+		names=[cols.names[c] for c in cols.name_code[rows]],
+		hours=x,
+		grades=grades,
+		passed=passed,
+		grade_r=_pearson(x, grades),
+		grade_rho=grade_rho,
+		trend=trend,
+		pass_r=_pearson(x, passed.astype(np.float64)),
+		hours_passed=float(x[passed].mean()) if passed.any() else None,
+		hours_failed=float(x[~passed].mean()) if (~passed).any() else None,
+		skipped=int(candidates.size - rows.size),
+	)
+
+
+def correlation_by_window(cols: ExamColumns, weeks: Sequence[Tuple[object, float]], windows: Iterable[int] = (1, 2, 4, 8)):
+	# how far back study time still relates to the grade
+	return {n: study_correlation(cols, weeks, n) for n in windows}
+
+
+def _current_exam_columns():
+	# read-only views into data.snap; the JSON only when the snapshot is missing or stale
+	cols = load_columns()
+	return cols[0] if cols is not None else exam_columns(load_json())
+
+
+def load_study_correlation(window_weeks: int = DEFAULT_WINDOW_WEEKS):
+	return study_correlation(_current_exam_columns(), get_study_time_weeks(), window_weeks)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Zusammenhang zwischen Lernzeit vor Prüfungen und Noten")
+	parser.add_argument("-w", "--weeks", type=int, default=DEFAULT_WINDOW_WEEKS, help="Wochen vor dem Prüfungsdatum (Standard: 4)")
+	parser.add_argument("--all-windows", action="store_true", help="Korrelation für 1, 2, 4 und 8 Wochen vergleichen")
+	args = parser.parse_args()
+
+	cols = _current_exam_columns()
+	weeks = get_study_time_weeks()
+
+	def fmt(v):
+		return "-" if v is None else f"{v:+.2f}"
+
+	if args.all_windows:
+		for n, result in correlation_by_window(cols, weeks).items():
+			print(f"{n:2d} Wochen: n={len(result):3d}  r(Note)={fmt(result.grade_r)}  rho={fmt(result.grade_rho)}  r(bestanden)={fmt(result.pass_r)}")
+		return
+
+	result = study_correlation(cols, weeks, args.weeks)
+	for name, h, g in zip(result.names, result.hours, result.grades):
+		print(f"{name[:40]:<40} {h:6.1f} h  Note {g:.1f}")
+	print(f"n={len(result)} (ohne Lernzeitdaten: {result.skipped})")
+	print(f"r(Stunden, Note) = {fmt(result.grade_r)}, Spearman = {fmt(result.grade_rho)}, r(Stunden, bestanden) = {fmt(result.pass_r)}")
+	if result.trend is not None:
+		slope, _ = result.trend
+		print(f"Trend: {slope * 10:+.2f} Notenstufen je 10 Stunden mehr")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+
+# German umlauts are transliterated before accents are stripped, so "Übung" and "Uebung" agree
+_TRANSLIT = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_ROMAN = {"i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6", "vii": "7", "viii": "8"}
+
+# Dice similarity on trigrams from which a name counts as a likely duplicate
+SIMILARITY_THRESHOLD = 0.6
+# one name's words all contained in the other ("Mathematik" / "Mathematik: Analysis")
+CONTAINED_SCORE = 0.75
+
+
+def normalize_name(name: str):
+	text = unicodedata.normalize("NFKC", name).casefold().translate(_TRANSLIT)
+	text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+	words = _NON_WORD.sub(" ", text).split()
+	return " ".join(_ROMAN.get(w, w) for w in words)
+
+
+def course_key(name: str, course_id: Optional[str] = None):
+	# a stable module ID (e.g. "modul_id" in data.json) wins over the spelling of the name
+	if course_id:
+		return f"id:{str(course_id).strip().casefold()}"
+	return normalize_name(name)
+
+
+def trigrams(normalized: str):
+	padded = f"  {normalized} "
+	return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _numbers(normalized: str):
+	return {w for w in normalized.split() if w.isdigit()}
+
+
+def _adjust(a: str, b: str, dice: float):
+	# "Mathe 1" and "Mathe 2" are never the same course
+	na, nb = _numbers(a), _numbers(b)
+	if na and nb and na != nb:
+		return 0.0
+	wa, wb = set(a.split()), set(b.split())
+	if wa and wb and (wa <= wb or wb <= wa):
+		return max(dice, CONTAINED_SCORE)
+	return dice
+
+
+def similarity(a: str, b: str):
+	# a and b are normalized names
+	if a == b:
+		return 1.0
+	ta, tb = trigrams(a), trigrams(b)
+	return _adjust(a, b, 2 * len(ta & tb) / (len(ta) + len(tb)))
+
+
+class CourseIndex:
+	# Trigram postings over normalized course names. A lookup only scores names that
+	# share a trigram with the query, so cost follows the matches, not the catalog size.
+	def __init__(self, names: Iterable[str] = ()):
+		self.keys: List[str] = []
+		self.display: Dict[str, str] = {}  # normalized -> first spelling seen
+		self._postings: DefaultDict[str, Set[int]] = defaultdict(set)
+		self._sizes: List[int] = []  # trigram count per key
+		for name in names:
+			self.add(name)
+
+	def __len__(self):
+		return len(self.keys)
+
+	def __contains__(self, name: str):
+		return normalize_name(name) in self.display
+
+	def add(self, name: str):
+		key = normalize_name(name)
+		if key in self.display:
+			return key
+		self.display[key] = name
+		i = len(self.keys)
+		self.keys.append(key)
+		grams = trigrams(key)
+		self._sizes.append(len(grams))
+		for gram in grams:
+			self._postings[gram].add(i)
+		return key
+
+	def lookup(self, name: str):
+		# exact match after normalization, returns the stored spelling
+		return self.display.get(normalize_name(name))
+
+	def suggest(self, name: str, limit: int = 5, threshold: float = SIMILARITY_THRESHOLD):
+		key = normalize_name(name)
+		grams = trigrams(key)
+		hits: DefaultDict[int, int] = defaultdict(int)
+		for gram in grams:
+			for i in self._postings.get(gram, ()):
+				hits[i] += 1
+		scored: List[Tuple[float, str]] = []
+		for i, shared in hits.items():
+			other = self.keys[i]
+			if other == key:
+				continue
+			# the shared count from the postings is the trigram intersection, no set operations needed
+			score = _adjust(key, other, 2 * shared / (len(grams) + self._sizes[i]))
+			if score >= threshold:
+				scored.append((score, self.display[other]))
+		scored.sort(key=lambda s: (-s[0], s[1]))
+		return scored[:limit]
+
+
+def likely_duplicates(names: Iterable[str], threshold: float = SIMILARITY_THRESHOLD):
+	# pairs of distinct course names that probably mean the same module, best match first
+	index = CourseIndex()
+	pairs: List[Tuple[str, str, float]] = []
+	for name in names:
+		if name in index:
+			continue
+		for score, other in index.suggest(name, limit=3, threshold=threshold):
+			pairs.append((other, name, round(score, 2)))
+		index.add(name)
+	pairs.sort(key=lambda p: -p[2])
+	return pairs
@@ -0,0 +1,307 @@
+import argparse
+import heapq
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from codec import read_json
+from courses import CourseIndex, course_key, normalize_name
+
+CURRICULUM_FILE = Path(__file__).with_name("curriculum.json")
+
+# curriculum.json:
+# {"module": [{"id": "DLBDSIPWP01", "name": "Einführung in die Programmierung mit Python",
+#              "ects": 5, "semester": 1, "voraussetzungen": ["DLBDSIPWP01", "Mathematik: Analysis"]}, ...]}
+# "id" is optional; prerequisites may name a module by id or by name.
+
+
+@dataclass
+class Module:
+	key: str
+	name: str
+	ects: int
+	semester: int  # recommended semester, 0 = unknown
+	prerequisites: Tuple[str, ...] = ()
+
+
+@dataclass
+class PlanMonth:
+	month: date  # first day of the month
+	modules: List[Module] = field(default_factory=list)  # completed this month
+	ongoing: List[Module] = field(default_factory=list)  # larger modules still running
+
+	@property
+	def ects(self):
+		return sum(m.ects for m in self.modules)
+
+
+@dataclass
+class Plan:
+	months: List[PlanMonth]
+	capacity: int
+	deadline: Optional[date]
+
+	@property
+	def end(self):
+		return self.months[-1].month if self.months else None
+
+	@property
+	def meets_deadline(self):
+		return self.deadline is None or self.end is None or self.end < self.deadline
+
+
+class Catalog:
+	def __init__(self, modules: Iterable[Module]):
+		self.modules: Dict[str, Module] = {}
+		# every spelling a module can be referred to by: its key, normalized name and id
+		self._alias: Dict[str, str] = {}
+		self._names = CourseIndex()
+		for m in modules:
+			if m.key in self.modules:
+				raise ValueError(f"Modul doppelt im Curriculum: {m.name}")
+			self.modules[m.key] = m
+			self._alias[m.key] = m.key
+			self._alias[course_key(m.name)] = m.key
+			self._names.add(m.name)
+		self.by_semester: Dict[int, List[str]] = {}
+		for m in sorted(self.modules.values(), key=lambda m: (m.semester, m.name)):
+			self.by_semester.setdefault(m.semester, []).append(m.key)
+		self.total_ects = sum(m.ects for m in self.modules.values())
+
+	def __len__(self):
+		return len(self.modules)
+
+	def resolve(self, key: str):
+		# course_key of an exam (or a prerequisite reference) -> module key, None if unknown
+		return self._alias.get(key) or self._alias.get(normalize_name(key)) or self._alias.get(course_key("", key))
+
+	def suggest(self, name: str):
+		return self._names.suggest(name, limit=3)
+
+	def passed(self, latest: Dict[str, Tuple[Any, int]], today: Optional[date] = None):
+		# module keys whose latest attempt is passed; latest is analytics._latest_course_map
+		today = today or date.today()
+		done: Set[str] = set()
+		for key, (course, _) in latest.items():
+			module = self.resolve(key)
+			if module is not None and counts_as_passed(course, today):
+				done.add(module)
+		return done
+
+	def unmatched(self, latest: Dict[str, Tuple[Any, int]]):
+		# exam courses that are not part of the curriculum (typos, electives, credited modules)
+		return sorted(course.name for key, (course, _) in latest.items() if self.resolve(key) is None)
+
+	def remaining(self, latest: Dict[str, Tuple[Any, int]], today: Optional[date] = None):
+		return set(self.modules) - self.passed(latest, today)
+
+	def due(self, latest: Dict[str, Tuple[Any, int]], months_since_start: int, today: Optional[date] = None):
+		# modules whose recommended semester is already over but which are not passed yet
+		semesters_over = months_since_start // 6
+		due = {key for sem, keys in self.by_semester.items() if 0 < sem <= semesters_over for key in keys}
+		return due - self.passed(latest, today)
+
+	def topological_order(self, keys: Optional[Iterable[str]] = None):
+		# Kahn's algorithm, ties broken by recommended semester and name
+		wanted = set(self.modules if keys is None else keys)
+		indegree = {k: 0 for k in wanted}
+		dependents: Dict[str, List[str]] = {k: [] for k in wanted}
+		for k in wanted:
+			for pre in self.modules[k].prerequisites:
+				if pre in wanted:
+					indegree[k] += 1
+					dependents[pre].append(k)
+		ready = [self._rank(k) for k, d in indegree.items() if d == 0]
+		heapq.heapify(ready)
+		order: List[str] = []
+		while ready:
+			k = heapq.heappop(ready)[-1]
+			order.append(k)
+			for nxt in dependents[k]:
+				indegree[nxt] -= 1
+				if indegree[nxt] == 0:
+					heapq.heappush(ready, self._rank(nxt))
+		if len(order) != len(wanted):
+			stuck = sorted(self.modules[k].name for k in wanted if indegree[k] > 0)
+			raise ValueError(f"Zyklische Voraussetzungen: {', '.join(stuck)}")
+		return order
+
+	def _rank(self, key: str):
+		m = self.modules[key]
+		return (m.semester or 99, m.name, key)
+
+	def plan(self, remaining: Iterable[str], start: date, capacity: int, deadline: Optional[date] = None):
+		# List scheduling in topological order: a module is taken in the first month after all
+		# of its open prerequisites, as long as the month still has capacity. A module above the
+		# capacity gets a month of its own and blocks the following months accordingly.
+		if capacity <= 0:
+			raise ValueError("ECTS-Kapazität muss positiv sein")
+		remaining = set(remaining)
+		order = self.topological_order(remaining)
+		finished: Dict[str, int] = {}  # module -> index of the month it is completed in
+		load: List[int] = []
+		months: List[List[Module]] = []
+		ongoing: List[List[Module]] = []
+		for key in order:
+			m = self.modules[key]
+			earliest = max((finished[p] + 1 for p in m.prerequisites if p in finished), default=0)
+			span = max(1, -(-m.ects // capacity))
+			i = earliest
+			while True:
+				while len(load) < i + span:
+					load.append(0)
+					months.append([])
+					ongoing.append([])
+				if span == 1 and load[i] + m.ects <= capacity:
+					break
+				if span > 1 and all(load[j] == 0 for j in range(i, i + span)):
+					break
+				i += 1
+			for j in range(i, i + span):
+				load[j] = capacity if span > 1 else load[j] + m.ects
+			for j in range(i, i + span - 1):
+				ongoing[j].append(m)
+			months[i + span - 1].append(m)
+			finished[key] = i + span - 1
+		while months and not months[-1]:
+			months.pop()
+		return Plan(
+			[PlanMonth(_add_months(start, i), mods, running) for i, (mods, running) in enumerate(zip(months, ongoing))],
+			capacity, deadline,
+		)
+
+	def required_capacity(self, remaining: Iterable[str], start: date, deadline: date):
+		# smallest monthly capacity that still finishes before the deadline (plan length is monotone in it)
+		remaining = set(remaining)
+		if not remaining:
+			return 0
+		lo, hi = 1, max(self.modules[k].ects for k in remaining) * len(remaining)
+		if not self.plan(remaining, start, hi, deadline).meets_deadline:
+			return None  # prerequisite chains alone are longer than the time left
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if self.plan(remaining, start, mid, deadline).meets_deadline:
+				hi = mid
+			else:
+				lo = mid + 1
+		return lo
+
+
+def counts_as_passed(course: Any, today: date):
+	# data_store counts every exam without a grade as passed. For the curriculum that only holds
+	# once the exam date is over (pass/fail modules are never graded); before that, and for
+	# undated entries, it is just a registration.
+	if not course.passed:
+		return False
+	return course.grade is not None or (course.date is not None and course.date < today)
+
+
+def _add_months(day: date, months: int):
+	total = day.year * 12 + day.month - 1 + months
+	return date(total // 12, total % 12 + 1, 1)
+
+
+def _module(raw: Dict[str, Any]):
+	name = raw.get("name") or raw.get("modul") or raw.get("prüfungsname")
+	if not name:
+		raise ValueError(f"Modul ohne Namen im Curriculum: {raw}")
+	return Module(
+		key=course_key(name, raw.get("id") or raw.get("modul_id")),
+		name=name,
+		ects=int(raw.get("ects", 5)),
+		semester=int(raw.get("semester", raw.get("empfohlenes_semester", 0)) or 0),
+		prerequisites=tuple(raw.get("voraussetzungen", raw.get("prerequisites", []))),
+	)
+
+
+def catalog_from_json(data: Dict[str, Any]):
+	modules = [_module(raw) for raw in data.get("module", data.get("modules", []))]
+	catalog = Catalog(modules)
+	# prerequisites are written by id or name, store them as module keys
+	for m in catalog.modules.values():
+		resolved = []
+		for ref in m.prerequisites:
+			key = catalog.resolve(ref)
+			if key is None:
+				raise ValueError(f"{m.name}: unbekannte Voraussetzung '{ref}'")
+			resolved.append(key)
+		m.prerequisites = tuple(resolved)
+	catalog.topological_order()  # fail early on cycles
+	return catalog
+
+
+_cached: Dict[Path, Tuple[int, Catalog]] = {}
+
+
+def load_curriculum(path: Path = CURRICULUM_FILE):
+	# None when there is no curriculum file; the dashboard then falls back to the ECTS heuristic
+	path = Path(path)
+	try:
+		mtime = path.stat().st_mtime_ns
+	except OSError:
+		return None
+	cached = _cached.get(path)
+	if cached is not None and cached[0] == mtime:
+		return cached[1]
+	catalog = catalog_from_json(read_json(path))
+	_cached[path] = (mtime, catalog)
+	return catalog
+
+
+def study_plan(catalog: Catalog, latest: Dict[str, Tuple[Any, int]], general: Dict, today: Optional[date] = None, capacity: Optional[int] = None):
+	today = today or date.today()
+	start = date.fromisoformat(general["start_date"])
+	deadline = _add_months(date(start.year, start.month, 1), int(general["planned_duration_months"]))
+	first_month = _add_months(date(today.year, today.month, 1), 1)
+	return catalog.plan(catalog.remaining(latest, today), first_month, capacity or int(general["ects_per_month"]), deadline)
+
+
+def main():
+	from analytics import _latest_course_map, elapsed_months
+	from data_store import get_general, get_semester_grades
+
+	parser = argparse.ArgumentParser(
+		description="Plant die offenen Module aus curriculum.json unter einer monatlichen ECTS-Kapazität",
+	)
+	parser.add_argument("--file", type=Path, default=CURRICULUM_FILE, help="Curriculum-Datei (Standard: curriculum.json)")
+	parser.add_argument("--capacity", type=int, help="ECTS pro Monat (Standard: ects_pro_monat_ziel)")
+	args = parser.parse_args()
+
+	try:
+		catalog = load_curriculum(args.file)
+	except (ValueError, json.JSONDecodeError) as e:
+		print(f"Fehler im Curriculum: {e}")
+		sys.exit(1)
+	if catalog is None:
+		print(f"Fehler: Datei {args.file} nicht gefunden!")
+		sys.exit(1)
+
+	general = get_general()
+	latest = _latest_course_map(get_semester_grades())
+	remaining = catalog.remaining(latest)
+	due = catalog.due(latest, elapsed_months(general))
+	print(f"{len(catalog)} Module ({catalog.total_ects} ECTS), offen: {len(remaining)}, im Rückstand: {len(due)}")
+	for name in catalog.unmatched(latest):
+		hint = ", ".join(other for _, other in catalog.suggest(name))
+		print(f" ? '{name}' nicht im Curriculum" + (f" (meinten Sie: {hint})" if hint else ""))
+
+	plan = study_plan(catalog, latest, general, capacity=args.capacity)
+	for month in plan.months:
+		names = ", ".join([m.name for m in month.modules] + [f"({m.name})" for m in month.ongoing]) or "-"
+		print(f"{month.month.strftime('%m/%Y')}: {month.ects:3d} ECTS | {names}")
+	if plan.end is not None:
+		state = "im Plan" if plan.meets_deadline else f"nach Regelstudienzeit ({plan.deadline.strftime('%m/%Y')})"
+		print(f"Fertig: {plan.end.strftime('%m/%Y')} - {state}")
+	if not plan.meets_deadline:
+		needed = catalog.required_capacity(remaining, plan.months[0].month, plan.deadline)
+		if needed is None:
+			print("Voraussetzungsketten sind länger als die verbleibende Zeit.")
+		else:
+			print(f"Benötigte Kapazität für die Regelstudienzeit: {needed} ECTS/Monat")
+
+
+if __name__ == "__main__":
+	main()
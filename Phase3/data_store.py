@@ -1,16 +1,28 @@
-import json
 from dataclasses import dataclass
-from datetime import datetime, date
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, DefaultDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, DefaultDict
 from collections import defaultdict
 
+from codec import find_data_file, read_json, write_json
+from sessions import session_weeks
+from shards import ShardedStore
 
-DATA_FILE = Path(__file__).with_name("data.json")
+
+# data.json, or data.json.gz / .bz2 / .xz when the data was compressed (python codec.py convert)
+DATA_FILE = find_data_file(Path(__file__).with_name("data.json"))
+
+# when data_shards/manifest.json exists, data lives in per-semester / per-year shards
+_shard_store = ShardedStore()
+
+# The dashboard reads data.json through the binary snapshot (data.snap, needs numpy); the text
+# mode and the CLIs keep parsing JSON. Switched on by the app, like charts.set_render_backend.
+_snapshot_reads = False
 
 
 def _parse_date(value: str):
-	return datetime.strptime(value, "%Y-%m-%d").date()
+	# fromisoformat: no _strptime/locale import, which matters for the text mode startup
+	return date.fromisoformat(value)
 
 
 @dataclass
@@ -21,6 +33,7 @@ class Course:
 	passed: bool
 	attempt: int
 	date: Optional[date]
+	course_id: Optional[str] = None  # stable module ID, if the data has one
 
 
 @dataclass
@@ -29,14 +42,100 @@ class SemesterGrades:
 	courses: List[Course]
 
 
+def sharded():
+	return _shard_store.exists()
+
+
+def data_source():
+	# file whose mtime/content represents the current data set
+	return _shard_store.manifest_path if _shard_store.exists() else DATA_FILE
+
+
+def set_snapshot_reads(enabled: bool):
+	global _snapshot_reads
+	_snapshot_reads = enabled
+
+
 def load_json():
-	with open(DATA_FILE, "r", encoding="utf-8") as f:
-		return json.load(f)
+	if _shard_store.exists():
+		return _shard_store.load_all()
+	return read_json(DATA_FILE)
+
+
+def _write_snapshot(data: Dict[str, Any]):
+	# best effort: without a current data.snap the readers fall back to the JSON
+	import snapshot
+
+	if "grades" in data:
+		return  # the old per-semester format has no snapshot
+	try:
+		snapshot.write_snapshot(data)
+	except OSError:
+		pass  # read-only install, or data.snap still mapped by a running dashboard on Windows
+
+
+def _extend_snapshot(base, **changes):
+	import snapshot
+
+	try:
+		snapshot.extend_snapshot(base, **changes)
+	except OSError:
+		pass
+
+
+def _current_snapshot():
+	import snapshot
+
+	return snapshot.open_snapshot()
 
 
 def save_json(data: Dict[str, Any]):
-	with open(DATA_FILE, "w", encoding="utf-8") as f:
-		json.dump(data, f, ensure_ascii=False, indent=2)
+	if _shard_store.exists():
+		# only shards whose content changed are rewritten
+		_shard_store.save_all(data)
+	else:
+		write_json(DATA_FILE, data)
+	_write_snapshot(data)
+
+
+def append_exam(exam: Dict[str, Any]):
+	# with shards only the exam's semester shard and the manifest are rewritten, and data.snap
+	# is extended from its previous state instead of being rebuilt from all shards
+	if _shard_store.exists():
+		base = _current_snapshot()
+		_shard_store.append_exam(exam)
+		if base is not None:
+			_extend_snapshot(base, exams=[exam])
+		return
+	data = load_json()
+	data.setdefault("exams", []).append(exam)
+	save_json(data)
+
+
+def _read():
+	# the dashboard's read path for a single data.json: a current data.snap is read instead of
+	# the JSON; otherwise the JSON is parsed once and data.snap written from that same parse,
+	# so the next reads (validation, correlation, KPIs) find it current. Returns the open
+	# Snapshot or the parsed dict.
+	if _snapshot_reads and not _shard_store.exists():
+		snap = _current_snapshot()
+		if snap is not None:
+			return snap
+		data = load_json()
+		_write_snapshot(data)
+		return data
+	return load_json()
+
+
+def _load_settings():
+	# general settings only; with shards this reads nothing but the manifest
+	if _shard_store.exists():
+		return _shard_store.meta()
+	data = _read()
+	if isinstance(data, dict):
+		return data
+	with data as snap:
+		return snap.settings()
 
 
 def _to_bool(val: Any):
@@ -49,13 +148,20 @@ def _to_bool(val: Any):
 
 
 def get_general():
-	data = load_json()
+	data = _load_settings()
 	if "general" in data:
 		g = data["general"]
 		return {
 			"ects_required": int(g.get("ects_required", g.get("total_ects", 180))),
 			"planned_duration_months": int(g.get("planned_duration_months", g.get("ziel_monate", 36))),
 			"start_date": g.get("start_date") or g.get("startdatum") or date.today().isoformat(),
+			"grade_target": float(g.get("grade_target", g.get("notenziel", 2.0))),
+			"ects_per_semester_target": int(g.get("ects_per_semester_target", g.get("ects_pro_semester_ziel", 30))),
+			"ects_per_month": int(g.get("ects_per_month", g.get("ects_pro_monat_ziel", 5))),
+			"chart_backend": g.get("chart_backend", "canvas"),
+			"kpi_cards": g.get("kpi_cards"),
+			"status_thresholds": g.get("status_thresholds", g.get("schwellenwerte", "fixed")),
+			"max_attempts": int(g.get("max_attempts", g.get("max_versuche", 3))),
 		}
 	elif "studieninfo" in data:
 		s = data["studieninfo"]
@@ -63,6 +169,13 @@ def get_general():
 			"ects_required": int(s.get("total_ects", 180)),
 			"planned_duration_months": int(s.get("ziel_monate", 36)),
 			"start_date": s.get("startdatum", date.today().isoformat()),
+			"grade_target": float(s.get("notenziel", 2.0)),
+			"ects_per_semester_target": int(s.get("ects_pro_semester_ziel", 30)),
+			"ects_per_month": int(s.get("ects_pro_monat_ziel", 5)),
+			"chart_backend": s.get("chart_backend", "canvas"),
+			"kpi_cards": s.get("kpi_cards"),
+			"status_thresholds": s.get("schwellenwerte", "fixed"),
+			"max_attempts": int(s.get("max_versuche", 3)),
 		}
 	else:
 		# sensible defaults
@@ -70,14 +183,80 @@ def get_general():
 			"ects_required": 180,
 			"planned_duration_months": 36,
 			"start_date": date.today().isoformat(),
+			"grade_target": 2.0,
+			"ects_per_semester_target": 30,
+			"ects_per_month": 5,
+			"chart_backend": "canvas",
+			"kpi_cards": None,
+			"status_thresholds": "fixed",
+			"max_attempts": 3,
 		}
 
 
-def get_semester_grades():
-	data = load_json()
+def current_semester_of(sems: Iterable[int]):
+	sems = list(sems)
+	positive = [s for s in sems if s > 0]
+	return max(positive or sems or [0])
+
+
+def get_current_semester():
+	if _shard_store.exists():
+		sems = _shard_store.semesters()
+	else:
+		data = _read()
+		if isinstance(data, dict):
+			sems = [int(e["semester"]) for e in data.get("exams", [])] + [int(g["semester"]) for g in data.get("grades", [])]
+		else:
+			with data as snap:
+				sems = snap.exams["semester"].tolist()
+	return current_semester_of(sems)
+
+
+def _exam_course(name: str, course_id: Optional[str], ects: int, grade: Optional[float], attempt: int, day: Optional[date]):
+	# Pass rule: 5.0 => failed, else passed; None => passed but no grade
+	passed = False if (grade is not None and grade >= 5.0) else True
+	return Course(name=name, ects=int(ects), grade=grade, passed=passed, attempt=int(attempt), date=day, course_id=course_id)
+
+
+def _course_from_exam(e: Dict[str, Any]):
+	return _exam_course(
+		e.get("prüfungsname") or e.get("name", "Kurs"),
+		e.get("modul_id"),
+		e["ects"],
+		float(e["note"]) if e.get("note") is not None else None,
+		e.get("versuch", 1),
+		_parse_date(e["datum"]) if e.get("datum") else None,
+	)
+
+
+def get_latest_courses():
+	# analytics._latest_course_map over all exams; with shards from the manifest's per-course
+	# index, so no shard is read
+	if _shard_store.exists():
+		return {key: (_course_from_exam(exam), sem) for key, (sem, exam) in _shard_store.latest().items()}
+	from analytics import _latest_course_map
+	return _latest_course_map(get_semester_grades())
+
+
+def get_semester_grades(semesters: Optional[Iterable[int]] = None):
+	# semesters limits the result (and, with shards, what is read from disk)
+	wanted = set(semesters) if semesters is not None else None
+	if _shard_store.exists():
+		data = {"exams": _shard_store.exams(wanted)}
+	else:
+		data = _read()
 	semesters: List[SemesterGrades] = []
+	if not isinstance(data, dict):
+		bucket: DefaultDict[int, List[Course]] = defaultdict(list)
+		with data as snap:
+			for name, course_id, sem, ects, grade, attempt, day in snap.exam_records():
+				if wanted is None or sem in wanted:
+					bucket[sem].append(_exam_course(name, course_id, ects, grade, attempt, day))
+		return [SemesterGrades(semester=sem, courses=bucket[sem]) for sem in sorted(bucket)]
 	if "grades" in data:
 		for entry in data.get("grades", []):
+			if wanted is not None and int(entry["semester"]) not in wanted:
+				continue
 			courses: List[Course] = []
 			for c in entry.get("courses", []):
 				courses.append(
@@ -88,6 +267,7 @@ def get_semester_grades():
 						passed=_to_bool(c.get("passed", True)),
 						attempt=int(c.get("attempt", 1)),
 						date=_parse_date(c["date"]) if c.get("date") else None,
+						course_id=c.get("id"),
 					)
 				)
 			semesters.append(SemesterGrades(semester=int(entry["semester"]), courses=courses))
@@ -95,19 +275,9 @@ def get_semester_grades():
 	elif "exams" in data:
 		bucket: DefaultDict[int, List[Course]] = defaultdict(list)
 		for e in data.get("exams", []):
-			grade_val: Optional[float] = float(e["note"]) if e.get("note") is not None else None
-			# Pass rule: 5.0 => failed, else passed; None => passed but no grade
-			passed = False if (grade_val is not None and grade_val >= 5.0) else True
-			bucket[int(e["semester"])].append(
-				Course(
-					name=e.get("prüfungsname") or e.get("name", "Kurs"),
-					ects=int(e["ects"]),
-					grade=grade_val,
-					passed=passed,
-					attempt=int(e.get("versuch", 1)),
-					date=_parse_date(e["datum"]) if e.get("datum") else None,
-				)
-			)
+			if wanted is not None and int(e["semester"]) not in wanted:
+				continue
+			bucket[int(e["semester"])].append(_course_from_exam(e))
 		for sem in sorted(bucket.keys()):
 			semesters.append(SemesterGrades(semester=sem, courses=bucket[sem]))
 		return semesters
@@ -115,9 +285,60 @@ def get_semester_grades():
 		return []
 
 
-def get_study_time_weeks():
-	data = load_json()
-	weeks: List[Tuple[date, float]] = []
-	for w in data.get("study_time", []):
-		weeks.append((_parse_date(w["week_start"]), float(w["hours"])) )
+def get_study_time_weeks(since: Optional[date] = None, include_sessions: bool = True):
+	# manual weekly hours plus hours from the session log (sessions.jsonl), summed per week
+	if _shard_store.exists():
+		data = {"study_time": _shard_store.weeks(since)}
+	else:
+		data = _read()
+	if isinstance(data, dict):
+		records = [(_parse_date(w["week_start"]), float(w["hours"])) for w in data.get("study_time", [])]
+	else:
+		with data as snap:
+			records = list(snap.week_records())
+	totals: Dict[date, float] = {}
+	for week_start, hours in records:
+		if since is not None and week_start < since:
+			continue
+		totals[week_start] = totals.get(week_start, 0.0) + hours
+	if include_sessions:
+		for week_start, hours in session_weeks():
+			if since is not None and week_start < since:
+				continue
+			totals[week_start] = round(totals.get(week_start, 0.0) + hours, 2)
+	weeks: List[Tuple[date, float]] = sorted(totals.items())
 	return weeks
+
+
+def get_study_time_totals():
+	# (hours, number of weeks) over all study weeks including sessions; with shards from the
+	# manifest totals, reading only the year shards the logged sessions fall into
+	if not _shard_store.exists():
+		weeks = get_study_time_weeks()
+		return sum(hours for _, hours in weeks), len(weeks)
+	totals = _shard_store.totals("study_time").values()
+	hours = sum(t["hours"] for t in totals)
+	count = sum(t["count"] for t in totals)
+	sessions = session_weeks()
+	if sessions:
+		manual = {_parse_date(w["week_start"]) for w in _shard_store.weeks(since=sessions[0][0])}
+		hours += sum(h for _, h in sessions)
+		count += sum(1 for week_start, _ in sessions if week_start not in manual)
+	return hours, count
+
+
+def update_study_time(changes: Dict[date, Optional[float]]):
+	# applies a batch of week edits with one load and one write; None or 0 hours deletes the week
+	if _shard_store.exists():
+		# only the shards of the touched years are rewritten
+		base = _current_snapshot()
+		_shard_store.upsert_weeks(changes)
+		if base is not None:
+			_extend_snapshot(base, week_changes=changes)
+		return
+	data = load_json()
+	touched = {week_start.isoformat() for week_start in changes}
+	weeks = [w for w in data.get("study_time", []) if w.get("week_start") not in touched]
+	weeks += [{"week_start": week_start.isoformat(), "hours": hours} for week_start, hours in changes.items() if hours]
+	data["study_time"] = sorted(weeks, key=lambda w: w["week_start"])
+	save_json(data)
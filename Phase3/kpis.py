@@ -0,0 +1,388 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import analytics
+from attempts import load_attempt_index
+from curriculum import load_curriculum, study_plan
+from data_store import (
+	current_semester_of,
+	get_current_semester,
+	get_general,
+	get_latest_courses,
+	get_semester_grades,
+	get_study_time_totals,
+	get_study_time_weeks,
+	sharded,
+)
+from thresholds import PERSONAL, normalize_mode, status_bounds
+
+# same strings as clock.DAY / WEEK / MONTH (kept Tk-free here)
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+
+
+@dataclass
+class Node:
+	name: str
+	deps: Tuple[str, ...]
+	fn: Callable[..., Any]
+	lazy: Tuple[str, ...] = ()  # passed after deps as loaders, only evaluated when called
+
+
+@dataclass
+class KPI:
+	key: str
+	title: str
+	inputs: Tuple[str, ...]
+	compute: Callable[..., Any]
+	status: Optional[Callable[[Any], str]]  # None: card without progress bar
+	lines: Callable[[Any], List[str]]
+	boundary: Optional[str] = None  # DAY/WEEK/MONTH if the value depends on the clock
+	status_inputs: Tuple[str, ...] = ()  # extra nodes passed to status after the value
+
+
+@dataclass
+class KPIResult:
+	key: str
+	title: str
+	value: Any
+	status: Optional[str]
+	lines: List[str]
+
+
+class KPIRegistry:
+	def __init__(self):
+		self.nodes: Dict[str, Node] = {}
+		self.kpis: Dict[str, KPI] = {}
+
+	def node(self, name: str, deps: Iterable[str] = (), lazy: Iterable[str] = ()):
+		def register(fn):
+			self.nodes[name] = Node(name, tuple(deps), fn, tuple(lazy))
+			return fn
+		return register
+
+	def kpi(self, key: str, title: str, inputs: Iterable[str], status=None, lines=None, boundary: Optional[str] = None, status_inputs: Iterable[str] = ()):
+		def register(fn):
+			self.kpis[key] = KPI(key, title, tuple(inputs), fn, status, lines or (lambda v: [str(v)]), boundary, tuple(status_inputs))
+			return fn
+		return register
+
+	def dependents(self, name: str):
+		# every node that (transitively) reads `name`
+		out: Set[str] = set()
+		changed = True
+		while changed:
+			changed = False
+			for node in self.nodes.values():
+				inputs = node.deps + node.lazy
+				if node.name not in out and (name in inputs or out.intersection(inputs)):
+					out.add(node.name)
+					changed = True
+		return out
+
+
+class Evaluation:
+	# Memoizes intermediate nodes; a KPI only triggers the part of the graph it reads.
+	def __init__(self, registry: KPIRegistry, overrides: Optional[Dict[str, Any]] = None):
+		self.registry = registry
+		self._values: Dict[str, Any] = dict(overrides or {})
+		self._overrides = set(self._values)
+
+	def get(self, name: str, _stack: Tuple[str, ...] = ()):
+		if name in self._values:
+			return self._values[name]
+		if name in _stack:
+			raise ValueError(f"KPI dependency cycle: {' -> '.join(_stack + (name,))}")
+		node = self.registry.nodes[name]
+		stack = _stack + (name,)
+		args = [self.get(dep, stack) for dep in node.deps]
+		args += [lambda dep=dep: self.get(dep, stack) for dep in node.lazy]
+		value = node.fn(*args)
+		self._values[name] = value
+		return value
+
+	def set(self, name: str, value: Any):
+		# replace an input (e.g. after new data arrived) and drop everything derived from it
+		self.invalidate(name)
+		self._values[name] = value
+		if name in self.registry.nodes:
+			self._overrides.discard(name)
+
+	def invalidate(self, *names: str):
+		for name in names:
+			for stale in {name} | self.registry.dependents(name):
+				if stale not in self._overrides or stale == name:
+					self._values.pop(stale, None)
+
+	def kpi(self, key: str):
+		kpi = self.registry.kpis[key]
+		return self.result(key, kpi.compute(*[self.get(name) for name in kpi.inputs]))
+
+	def result(self, key: str, value: Any):
+		# status and card lines of a KPI for a given value (e.g. one looked up in the timeline)
+		kpi = self.registry.kpis[key]
+		status = kpi.status(value, *[self.get(name) for name in kpi.status_inputs]) if kpi.status else None
+		return KPIResult(key, kpi.title, value, status, kpi.lines(value))
+
+	def evaluate(self, keys: Iterable[str]):
+		return {key: self.kpi(key) for key in keys}
+
+
+registry = KPIRegistry()
+
+
+# --- shared inputs -------------------------------------------------------
+
+@registry.node("today")
+def _today():
+	return date.today()
+
+
+@registry.node("sharded")
+def _sharded():
+	# resolved per evaluation: shards can be created (shards.py split) while the app runs
+	return sharded()
+
+
+@registry.node("persist")
+def _persist():
+	# False: caches next to the data (attempt log, sketches) are read but not written
+	return True
+
+
+@registry.node("general")
+def _general():
+	return get_general()
+
+
+@registry.node("semesters")
+def _semesters():
+	return get_semester_grades()
+
+
+# With shards the all-time inputs come from the manifest and the current semester / week from
+# their own shard, so older shards are only read when something needs their rows; a single
+# data.json is loaded once by the "semesters" / "weeks" nodes and derived from there.
+
+@registry.node("latest", deps=["sharded"], lazy=["semesters"])
+def _latest(sharded, semesters):
+	if sharded:
+		return get_latest_courses()
+	return analytics._latest_course_map(semesters())
+
+
+@registry.node("current_latest", deps=["sharded"], lazy=["semesters"])
+def _current_latest(sharded, semesters):
+	if sharded:
+		return analytics._latest_course_map(get_semester_grades([get_current_semester()]))
+	semesters = semesters()
+	current = current_semester_of(s.semester for s in semesters)
+	return analytics._latest_course_map([s for s in semesters if s.semester == current])
+
+
+@registry.node("curriculum")
+def _curriculum():
+	try:
+		return load_curriculum()
+	except (ValueError, OSError):
+		return None  # broken file: keep the heuristic instead of breaking the dashboard
+
+
+@registry.node("attempts", deps=["general", "persist", "today"])
+def _attempts(general, persist, today):
+	# persistent per-course attempt lineage, only appended exams are read after the first run
+	return load_attempt_index(general["max_attempts"], persist=persist, today=today)
+
+
+@registry.node("weeks")
+def _weeks():
+	return get_study_time_weeks()
+
+
+@registry.node("week_start", deps=["today"])
+def _week_start(today):
+	return today - timedelta(days=today.weekday())
+
+
+@registry.node("week_average", deps=["sharded"], lazy=["weeks"])
+def _week_average(sharded, weeks):
+	if sharded:
+		hours, count = get_study_time_totals()
+	else:
+		weeks = weeks()
+		hours, count = sum(w[1] for w in weeks), len(weeks)
+	return hours / count if count else None
+
+
+@registry.node("current_week_hours", deps=["week_start", "sharded"], lazy=["weeks"])
+def _current_week_hours(week_start, sharded, weeks):
+	weeks = get_study_time_weeks(since=week_start) if sharded else weeks()
+	# weeks are sorted, the current one is at (or near) the end
+	for week_date, hours in reversed(weeks):
+		if week_date == week_start:
+			return hours
+		if week_date < week_start:
+			break
+	return None
+
+
+@registry.node("thresholds", deps=["general", "today", "curriculum", "persist"], lazy=["semesters", "weeks"])
+def _thresholds(general, today, curriculum, persist, semesters, weeks):
+	# metric -> adaptive status bounds; empty in the default fixed mode, where no history is read
+	if normalize_mode(general.get("status_thresholds")) != PERSONAL:
+		return status_bounds(general, [], [], today, curriculum, persist)
+	return status_bounds(general, semesters(), weeks(), today, curriculum, persist)
+
+
+@registry.node("timeline", deps=["semesters", "general", "curriculum"])
+def _timeline(semesters, general, curriculum):
+	# KPI values as of any past day (dashboard date slider); needs every exam row, so it is only
+	# built once the slider is moved. Imported on demand like scenarios (numpy).
+	from timeline import KPITimeline
+	return KPITimeline(semesters, date.fromisoformat(general["start_date"]), curriculum)
+
+
+# --- KPIs (in dashboard order) --------------------------------------------
+
+@registry.kpi(
+	"forecast", "Studienzeit", ["latest", "general", "today"],
+	status=lambda v: v[1],
+	lines=lambda v: [f"Prognose Enddatum: {v[0].isoformat()}"],
+	boundary=DAY,
+)
+def _forecast(latest, general, today):
+	return analytics.study_end_forecast_from_latest(latest, general, today)
+
+
+@registry.kpi(
+	"average_grade", "Durchschnittsnote", ["latest"],
+	status=lambda v, bounds: analytics.grade_status(v, bounds.get("grade")),
+	status_inputs=["thresholds"],
+	lines=lambda v: [f"Aktuell: {'-' if v is None else f'{v:.2f}'}"],
+)
+def _average_grade(latest):
+	return analytics.weighted_average_grade_from_latest(latest)
+
+
+@registry.kpi(
+	"ects", "ECTS", ["current_latest", "today"],
+	status=lambda v, bounds: analytics.ects_status(*v, bounds.get("semester_ects"), bounds.get("month_ects"))[1],
+	status_inputs=["thresholds"],
+	lines=lambda v: [f"Aktuelles Semester: {v[0]} ECTS", f"Diesen Monat: {v[1]} ECTS"],
+	boundary=MONTH,
+)
+def _ects(current_latest, today):
+	return analytics.ects_current_semester_month_from_latest(current_latest, today)
+
+
+@registry.kpi(
+	"pass_rate", "Bestehensquote", ["latest"],
+	lines=lambda v: [f"Dieses Semester: {'-' if v is None else f'{int(v * 100)}%'}"],
+)
+def _pass_rate(latest):
+	return analytics.pass_rate_from_latest(latest)
+
+
+@registry.kpi(
+	"repeat_ratio", "Wiederholungsquote", ["latest"],
+	lines=lambda v: [f"Ratio: {'-' if v is None or v == float('inf') else f'{v:.2f}'}"],
+)
+def _repeat_ratio(latest):
+	return analytics.repeat_ratio_from_latest(latest)
+
+
+@registry.kpi(
+	"weekly_hours", "Wöchentliche Lernzeit", ["week_average", "current_week_hours"],
+	status=lambda v, bounds: analytics.learning_hours_status(v[1], bounds.get("weekly_hours")),
+	status_inputs=["thresholds"],
+	lines=lambda v: [
+		f"Durchschnitt: {v[0]:.1f} h" if v[0] is not None else "Durchschnitt: -",
+		f"Diese Woche: {'-' if v[1] is None else f'{v[1]} h'}",
+	],
+	boundary=WEEK,
+)
+def _weekly_hours(week_average, current_week_hours):
+	return week_average, current_week_hours
+
+
+@registry.kpi(
+	"backlog", "Nachhol-Backlog", ["latest", "general", "today", "curriculum"],
+	status=lambda v, bounds: analytics.backlog_status(v, bounds.get("backlog")),
+	status_inputs=["thresholds"],
+	lines=lambda v: [f"Module zurück: {v}"],
+	boundary=MONTH,
+)
+def _backlog(latest, general, today, curriculum):
+	return analytics.backlog_modules_from_latest(latest, analytics.elapsed_months(general, today), curriculum, today)
+
+
+def _retake_lines(index):
+	mean = index.mean_attempts_to_pass()
+	return [
+		f"Letzter Versuch offen: {len(index.at_risk())} Modul(e)",
+		f"Ø Versuche bis bestanden: {'-' if mean is None else f'{mean:.2f}'}",
+	]
+
+
+@registry.kpi(
+	"retakes", "Wiederholungen", ["attempts"],
+	status=lambda index: "red" if index.exhausted() else ("orange" if index.at_risk() else "green"),
+	lines=_retake_lines,
+	boundary=DAY,
+)
+def _retakes(attempts):
+	return attempts
+
+
+def _plan_lines(plan):
+	if plan is None:
+		return ["Kein Curriculum (curriculum.json)"]
+	if plan.end is None:
+		return ["Alle Module bestanden"]
+	open_ects = sum(month.ects for month in plan.months)
+	return [f"Offen: {open_ects} ECTS ({plan.capacity}/Monat)", f"Fertig laut Plan: {plan.end.strftime('%m/%Y')}"]
+
+
+@registry.kpi(
+	"study_plan", "Studienplan", ["curriculum", "latest", "general", "today"],
+	status=lambda plan: "orange" if plan is None else ("green" if plan.meets_deadline else "red"),
+	lines=_plan_lines,
+	boundary=MONTH,
+)
+def _study_plan(curriculum, latest, general, today):
+	if curriculum is None:
+		return None
+	return study_plan(curriculum, latest, general, today)
+
+
+def _grade_target_lines(t):
+	if t.required_grade is None:
+		need = "Alle ECTS erreicht"
+	elif t.required_grade < 1.0:
+		need = f"Nicht mehr erreichbar ({t.remaining_ects} ECTS offen)"
+	else:
+		need = f"Benötigt: Ø {t.required_grade:.2f} auf {t.remaining_ects} ECTS"
+	return [f"Ziel: {t.target:.1f}", need]
+
+
+@registry.kpi(
+	"grade_target", "Notenziel", ["general", "latest"],
+	status=lambda t: t.status,
+	lines=_grade_target_lines,
+)
+def _grade_target(general, latest):
+	# imported on demand: scenarios needs numpy, which text mode should not pay for
+	from scenarios import required_grade_for_target
+	return required_grade_for_target(general, latest)
+
+
+DEFAULT_CARDS = list(registry.kpis)
+
+# cards the timeline can show as of a past day -> KPISnapshot field
+TIMELINE_FIELDS = {
+	"average_grade": "weighted_average",
+	"pass_rate": "pass_rate",
+	"backlog": "backlog",
+}
@@ -0,0 +1,163 @@
+import time
+import tkinter as tk
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DrawFn = Callable[[Any, int, int], None]
+
+# how long a staged build may keep the event loop busy before it lets Tk paint (~one frame)
+FRAME_BUDGET_MS = 12
+
+
+class _Recorder:
+    # Stands in for a canvas while a chart draws: create_* calls are recorded,
+    # everything else (cget, configure, tk, ...) goes to the real canvas.
+    def __init__(self, canvas: tk.Canvas):
+        self._canvas = canvas
+        self.calls: List[Tuple[str, tuple, Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("create_"):
+            def record(*args, **kwargs):
+                if len(args) == 1 and isinstance(args[0], (list, tuple)):
+                    args = tuple(args[0])
+                self.calls.append((name, args, kwargs))
+                return len(self.calls)
+            return record
+        return getattr(self._canvas, name)
+
+
+class ResponsiveCanvas:
+    def __init__(self, manager: "LayoutManager", canvas: tk.Canvas, draw: DrawFn):
+        self.manager = manager
+        self.canvas = canvas
+        self.draw = draw
+        self._items: List[int] = []
+        self._calls: List[Tuple[str, tuple, Dict[str, Any]]] = []
+        self._size: Optional[Tuple[int, int]] = None
+        canvas.bind("<Configure>", lambda event: manager.mark_dirty(self), add="+")
+
+    def set_draw(self, draw: DrawFn):
+        self.draw = draw
+        self.manager.mark_dirty(self, force=True)
+
+    def flush(self, force: bool = False):
+        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if w <= 1 or h <= 1:
+            return
+        if not force and (w, h) == self._size:
+            return
+        self._size = (w, h)
+
+        recorder = _Recorder(self.canvas)
+        self.draw(recorder, w, h)
+        calls = recorder.calls
+
+        if [c[0] for c in calls] == [c[0] for c in self._calls]:
+            # same item structure: move the existing items instead of recreating them
+            for item, (_, args, kwargs), (_, _, old_kwargs) in zip(self._items, calls, self._calls):
+                self.canvas.coords(item, *args)
+                if kwargs != old_kwargs:
+                    self.canvas.itemconfigure(item, **kwargs)
+        else:
+            for item in self._items:
+                self.canvas.delete(item)
+            self._items = [getattr(self.canvas, name)(*args, **kwargs) for name, args, kwargs in calls]
+        self._calls = calls
+
+        # images created while recording must stay referenced by the real canvas
+        images = recorder.__dict__.get("_chart_images")
+        if images is not None:
+            self.canvas._chart_images = images
+
+
+class LayoutManager:
+    def __init__(self, root: tk.Misc):
+        self.root = root
+        self._dirty: Dict[ResponsiveCanvas, bool] = {}
+        self._scheduled = False
+
+    def add(self, canvas: tk.Canvas, draw: DrawFn) -> ResponsiveCanvas:
+        view = ResponsiveCanvas(self, canvas, draw)
+        self.mark_dirty(view)
+        return view
+
+    def mark_dirty(self, view: ResponsiveCanvas, force: bool = False):
+        # a resize storm produces many <Configure> events; all of them end up in one idle pass
+        self._dirty[view] = self._dirty.get(view, False) or force
+        if not self._scheduled:
+            self._scheduled = True
+            self.root.after_idle(self._flush)
+
+    def _flush(self):
+        self._scheduled = False
+        dirty, self._dirty = self._dirty, {}
+        for view, force in dirty.items():
+            try:
+                view.flush(force)
+            except tk.TclError:
+                # canvas destroyed while the pass was pending
+                continue
+
+
+class StagedBuild:
+    # Runs build stages in priority order, each as its own after_idle task, so the window
+    # paints between them. A stage that returns a generator is resumed step by step until
+    # the frame budget is used up, then continues in the next idle pass. After cancel()
+    # (window closed or rebuilt) the remaining stages never run.
+    def __init__(self, root: tk.Misc, stages: Iterable[Tuple[str, Callable[[], Any]]], budget_ms: float = FRAME_BUDGET_MS):
+        self.root = root
+        self.budget = budget_ms / 1000.0
+        self.finished: List[str] = []
+        self.cancelled = False
+        self._stages = list(stages)
+        self._current: Optional[Tuple[str, Iterator]] = None
+        self._after_id: Optional[str] = None
+
+    @property
+    def done(self):
+        return self._current is None and not self._stages
+
+    def start(self):
+        self._schedule()
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _schedule(self):
+        try:
+            self._after_id = self.root.after_idle(self._step)
+        except tk.TclError:
+            self.cancelled = True  # root already destroyed
+
+    def _step(self):
+        self._after_id = None
+        if self.cancelled or self.done:
+            return
+        deadline = time.perf_counter() + self.budget
+        try:
+            if self._current is None:
+                name, stage = self._stages.pop(0)
+                result = stage()
+                if not isinstance(result, Iterator):
+                    self.finished.append(name)
+                    self._schedule()
+                    return
+                self._current = (name, result)
+            name, steps = self._current
+            while time.perf_counter() < deadline:
+                next(steps)
+        except StopIteration:
+            self.finished.append(self._current[0])
+            self._current = None
+        except tk.TclError:
+            # widgets went away while the stage was running
+            self.cancel()
+            return
+        self._schedule()
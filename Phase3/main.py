@@ -1,4 +1,25 @@
-from app import run_app
+import argparse
 
-if __name__ == "__main__":
+
+def main():
+	parser = argparse.ArgumentParser(description="Studien-Dashboard")
+	parser.add_argument("--tui", "--text", dest="text", action="store_true", help="KPIs im Terminal anzeigen (ohne Tk)")
+	parser.add_argument(
+		"--watch", nargs="?", type=float, const=2.0, metavar="SEKUNDEN",
+		help="Textmodus: bei Datenänderungen neu zeichnen (Prüfintervall, Standard: 2 s)",
+	)
+	parser.add_argument("--no-color", dest="color", action="store_false", default=None, help="Textmodus ohne ANSI-Farben")
+	args = parser.parse_args()
+
+	if args.text or args.watch is not None:
+		# imported here so the text mode never loads Tk, numpy or matplotlib
+		from tui import run
+		run(watch=args.watch, color=args.color)
+		return
+
+	from app import run_app
 	run_app()
+
+
+if __name__ == "__main__":
+	main()
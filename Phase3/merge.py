@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from codec import read_json, write_json
+from courses import course_key
+from data_store import DATA_FILE, load_json, save_json
+
+BASE_FILE = Path(__file__).with_name("data.base.json")
+
+Key = Tuple[str, ...]
+
+
+@dataclass
+class Conflict:
+	section: str  # exams, study_time, settings
+	key: Key
+	base: Optional[Any]
+	ours: Optional[Any]
+	theirs: Optional[Any]
+
+	def describe(self):
+		label = " / ".join(str(k) for k in self.key if k != "")
+		kind = "gelöscht vs. geändert" if self.ours is None or self.theirs is None else "beidseitig geändert"
+		return f"[{self.section}] {label}: {kind}"
+
+
+@dataclass
+class MergeResult:
+	data: Dict[str, Any]
+	conflicts: List[Conflict] = field(default_factory=list)
+	taken_from_theirs: int = 0
+
+
+def _content_hash(record: Any):
+	return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _exam_key(e: Dict[str, Any]):
+	return (course_key(e.get("prüfungsname") or e.get("name", ""), e.get("modul_id")), str(e.get("versuch", 1)), e.get("datum") or "")
+
+
+def _week_key(w: Dict[str, Any]):
+	return (w["week_start"],)
+
+
+def _index(records: List[Dict[str, Any]], key_fn):
+	# key -> (content hash, record); identical keys inside one file get an occurrence suffix
+	out: Dict[Key, Tuple[str, Dict[str, Any]]] = {}
+	seen: Dict[Key, int] = {}
+	for r in records:
+		k = key_fn(r)
+		n = seen.get(k, 0)
+		seen[k] = n + 1
+		out[k + ((str(n),) if n else ())] = (_content_hash(r), r)
+	return out
+
+
+def _merge_section(section: str, base: Dict, ours: Dict, theirs: Dict, prefer: Optional[str], result: MergeResult):
+	merged: Dict[Key, Any] = {}
+	# ours first so the output keeps our record order, then additions from theirs
+	for key in list(ours) + [k for k in theirs if k not in ours] + [k for k in base if k not in ours and k not in theirs]:
+		b, o, t = base.get(key), ours.get(key), theirs.get(key)
+		bh, oh, th = (x[0] if x else None for x in (b, o, t))
+		if oh == th:
+			pick = o
+		elif oh == bh:
+			pick = t  # only theirs changed (or deleted / added)
+			result.taken_from_theirs += 1
+		elif th == bh:
+			pick = o  # only ours changed
+		else:
+			conflict = Conflict(section, key, b and b[1], o and o[1], t and t[1])
+			result.conflicts.append(conflict)
+			pick = t if prefer == "theirs" else o
+		if pick is not None:
+			merged[key] = pick[1]
+	return merged
+
+
+def merge_data(ours: Dict[str, Any], theirs: Dict[str, Any], base: Optional[Dict[str, Any]] = None, prefer: Optional[str] = None):
+	# three-way merge keyed by content hashes: O(n) dictionary lookups, no pairwise comparison.
+	# Without a base, records present on one side only are added and differing ones are conflicts.
+	base = base or {}
+	result = MergeResult(data={})
+
+	exams = _merge_section(
+		"exams",
+		_index(base.get("exams", []), _exam_key),
+		_index(ours.get("exams", []), _exam_key),
+		_index(theirs.get("exams", []), _exam_key),
+		prefer, result,
+	)
+	weeks = _merge_section(
+		"study_time",
+		_index(base.get("study_time", []), _week_key),
+		_index(ours.get("study_time", []), _week_key),
+		_index(theirs.get("study_time", []), _week_key),
+		prefer, result,
+	)
+
+	def settings(data):
+		return {(k,): (_content_hash(v), v) for k, v in data.items() if k not in ("exams", "study_time")}
+
+	merged_settings = _merge_section("settings", settings(base), settings(ours), settings(theirs), prefer, result)
+
+	result.data = {k[0]: v for k, v in merged_settings.items()}
+	result.data["exams"] = list(exams.values())
+	result.data["study_time"] = sorted(weeks.values(), key=lambda w: w["week_start"])
+	return result
+
+
+def _read(path: Path):
+	return read_json(path)
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		description="Führt zwei data.json-Stände (z.B. Laptop und Desktop) per Drei-Wege-Merge zusammen",
+		epilog="Ohne --base wird data.base.json (Stand des letzten Merges) verwendet, falls vorhanden.",
+	)
+	parser.add_argument("theirs", type=Path, help="Datei des anderen Geräts")
+	parser.add_argument("--ours", type=Path, default=None, help="Eigene Datei (Standard: aktuelle Daten)")
+	parser.add_argument("--base", type=Path, default=None, help="Gemeinsamer Ausgangsstand")
+	parser.add_argument("-o", "--output", type=Path, default=None, help="Ergebnisdatei (Standard: aktuelle Daten überschreiben)")
+	parser.add_argument("--prefer", choices=["ours", "theirs"], help="Konflikte automatisch zugunsten einer Seite lösen")
+	parser.add_argument("--dry-run", action="store_true", help="Nur Konflikte anzeigen, nichts schreiben")
+	args = parser.parse_args()
+
+	ours = _read(args.ours) if args.ours else load_json()
+	theirs = _read(args.theirs)
+	base_path = args.base or (BASE_FILE if BASE_FILE.exists() else None)
+	base = _read(base_path) if base_path else None
+
+	result = merge_data(ours, theirs, base, args.prefer)
+	print(f"[MERGE] {len(result.data['exams'])} Exams, {len(result.data['study_time'])} Wochen, "
+		  f"{result.taken_from_theirs} Änderung(en) übernommen, {len(result.conflicts)} Konflikt(e)")
+	for conflict in result.conflicts:
+		print(f" - {conflict.describe()}")
+
+	if result.conflicts and not args.prefer:
+		print("Fehler: Konflikte bitte mit --prefer ours|theirs auflösen oder manuell bereinigen.")
+		sys.exit(1)
+	if args.dry_run:
+		return
+
+	if args.output is None or args.output.resolve() == DATA_FILE.resolve():
+		save_json(result.data)
+		# the merged state is the common ancestor for the next merge; only when it really
+		# replaced the local data, otherwise their additions would later look like our deletions
+		write_json(BASE_FILE, result.data)
+	else:
+		write_json(args.output, result.data)
+		print(f"Hinweis: {DATA_FILE.name} unverändert, Merge-Basis nicht aktualisiert.")
+	print("[OK] Merge gespeichert.")
+
+
+if __name__ == "__main__":
+	main()
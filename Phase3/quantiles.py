@@ -0,0 +1,139 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+# KLL sketch (Karnin, Lang, Liberty): rank error ~1/k, size O(k) independent of n.
+# Pure Python on purpose: the text mode and analytics stay numpy-free.
+DEFAULT_K = 200
+_SHRINK = 2 / 3
+
+
+class KLLSketch:
+	# Level h holds items that each stand for 2**h values. A full level is sorted and every
+	# second item is promoted to the next level; the offset alternates per level so the
+	# rounding errors of successive compactions cancel out (deterministic, no RNG state).
+	def __init__(self, k: int = DEFAULT_K):
+		self.k = k
+		self.n = 0
+		self.levels: List[List[float]] = [[]]
+		self.min: Optional[float] = None
+		self.max: Optional[float] = None
+		self._offsets: List[int] = [0]
+		self._size = 0
+		self._limit = self._max_size()
+
+	def __len__(self):
+		return self.n
+
+	def _capacity(self, level: int):
+		depth = len(self.levels) - level - 1
+		return max(2, int(self.k * _SHRINK ** depth) + 1)
+
+	def _max_size(self):
+		return sum(self._capacity(h) for h in range(len(self.levels)))
+
+	def update(self, value: float):
+		value = float(value)
+		self.levels[0].append(value)
+		self.n += 1
+		self._size += 1
+		if self.min is None or value < self.min:
+			self.min = value
+		if self.max is None or value > self.max:
+			self.max = value
+		if self._size > self._limit:
+			self._compress()
+		return self
+
+	def extend(self, values: Iterable[float]):
+		for value in values:
+			self.update(value)
+		return self
+
+	def _compress(self):
+		while self._size > self._limit:
+			for h, level in enumerate(self.levels):
+				if len(level) >= self._capacity(h):
+					break
+			if h + 1 == len(self.levels):
+				self.levels.append([])
+				self._offsets.append(0)
+				self._limit = self._max_size()
+			level.sort()
+			# an odd item stays behind, so the compacted part has an even count
+			keep = [level.pop()] if len(level) % 2 else []
+			offset = self._offsets[h]
+			self._offsets[h] ^= 1
+			promoted = level[offset::2]
+			self.levels[h + 1].extend(promoted)
+			self.levels[h] = keep
+			self._size -= len(level) - len(promoted)
+
+	def merge(self, other: "KLLSketch"):
+		# level-wise concatenation, then the usual compaction: cost O(k), not O(n)
+		while len(self.levels) < len(other.levels):
+			self.levels.append([])
+			self._offsets.append(0)
+		self._limit = self._max_size()
+		for h, level in enumerate(other.levels):
+			self.levels[h].extend(level)
+		self.n += other.n
+		self._size += other._size
+		if other.n:
+			self.min = other.min if self.min is None else min(self.min, other.min)
+			self.max = other.max if self.max is None else max(self.max, other.max)
+		self._compress()
+		return self
+
+	def _weighted(self):
+		items = [(value, 1 << h) for h, level in enumerate(self.levels) for value in level]
+		items.sort()
+		return items
+
+	def rank(self, value: float):
+		# fraction of the stream <= value
+		if not self.n:
+			return None
+		weight = sum((1 << h) * sum(1 for v in level if v <= value) for h, level in enumerate(self.levels))
+		return weight / self.n
+
+	def quantile(self, q: float):
+		if not self.n:
+			return None
+		if q <= 0:
+			return self.min
+		if q >= 1:
+			return self.max
+		items = self._weighted()
+		total = sum(w for _, w in items)
+		target = q * total
+		seen = 0
+		for value, weight in items:
+			seen += weight
+			if seen >= target:
+				return value
+		return self.max
+
+	def quantiles(self, qs: Iterable[float]):
+		return tuple(self.quantile(q) for q in qs)
+
+	def to_dict(self):
+		return {"k": self.k, "n": self.n, "min": self.min, "max": self.max, "levels": self.levels, "offsets": self._offsets}
+
+	@classmethod
+	def from_dict(cls, raw: Dict[str, Any]):
+		sketch = cls(int(raw.get("k", DEFAULT_K)))
+		sketch.n = int(raw.get("n", 0))
+		sketch.min = raw.get("min")
+		sketch.max = raw.get("max")
+		sketch.levels = [[float(v) for v in level] for level in raw.get("levels", [[]])] or [[]]
+		sketch._offsets = list(raw.get("offsets", [])) + [0] * len(sketch.levels)
+		del sketch._offsets[len(sketch.levels):]
+		sketch._size = sum(len(level) for level in sketch.levels)
+		sketch._limit = sketch._max_size()
+		return sketch
+
+
+def merge_all(sketches: Iterable[KLLSketch], k: int = DEFAULT_K):
+	merged = KLLSketch(k)
+	for sketch in sketches:
+		merged.merge(sketch)
+	return merged
@@ -0,0 +1,210 @@
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from analytics import _latest_course_map
+from courses import course_key
+from data_store import Course, get_general
+
+# scenario_grid materializes every combination: len(grade_values) ** slots rows at most
+MAX_SCENARIOS = 100_000
+
+
+@dataclass
+class GradeTarget:
+	target: float
+	current_average: Optional[float]
+	remaining_ects: int
+	required_grade: Optional[float]  # None when nothing is left to write
+	status: str  # light_green, green, orange, red
+
+
+@dataclass
+class ScenarioResult:
+	averages: np.ndarray  # one ECTS-weighted average per scenario
+	meets_target: np.ndarray
+	target: float
+
+	@property
+	def share_meeting_target(self):
+		if self.averages.size == 0:
+			return 0.0
+		return float(self.meets_target.mean())
+
+
+@dataclass
+class _GradeBase:
+	# sums over latest attempts; "passed" only counts modules that will not be rewritten
+	passed_ects: int
+	passed_weighted: float
+	passed_graded_ects: int
+	all_weighted: float
+	all_graded_ects: int
+	latest: Dict[str, tuple]
+
+
+def _grade_base(latest: Dict[str, Tuple[Course, int]]):
+	passed_ects = 0
+	passed_weighted = 0.0
+	passed_graded_ects = 0
+	all_weighted = 0.0
+	all_graded_ects = 0
+	for c, _ in latest.values():
+		if c.passed:
+			passed_ects += c.ects
+		if c.grade is None:
+			continue
+		all_weighted += c.grade * c.ects
+		all_graded_ects += c.ects
+		if c.passed:
+			passed_weighted += c.grade * c.ects
+			passed_graded_ects += c.ects
+	return _GradeBase(passed_ects, passed_weighted, passed_graded_ects, all_weighted, all_graded_ects, latest)
+
+
+# general: get_general(); latest: analytics._latest_course_map (the shared "latest" KPI node)
+
+def remaining_ects(general: Dict, latest: Dict[str, Tuple[Course, int]]):
+	return max(0, int(general["ects_required"]) - _grade_base(latest).passed_ects)
+
+
+def required_grade_for_target(general: Dict, latest: Dict[str, Tuple[Course, int]], target: Optional[float] = None):
+	target = float(general["grade_target"]) if target is None else float(target)
+	base = _grade_base(latest)
+	remaining = max(0, int(general["ects_required"]) - base.passed_ects)
+	current = round(base.all_weighted / base.all_graded_ects, 2) if base.all_graded_ects else None
+
+	if remaining == 0:
+		final = base.passed_weighted / base.passed_graded_ects if base.passed_graded_ects else None
+		status = "green" if final is None or final <= target else "red"
+		return GradeTarget(target, current, 0, None, status)
+
+	# target * (graded + remaining) = weighted + x * remaining, solved for x;
+	# failed latest attempts are part of "remaining" because they have to be rewritten
+	needed = (target * (base.passed_graded_ects + remaining) - base.passed_weighted) / remaining
+	return GradeTarget(target, current, remaining, round(needed, 2), target_status(needed, target))
+
+
+def target_status(required: Optional[float], target: float):
+	if required is None:
+		return "green"
+	if required >= 4.0:
+		return "light_green"
+	if required >= target:
+		return "green"
+	if required >= 1.0:
+		return "orange"
+	return "red"
+
+
+def scenario_grid(grade_values: Sequence[float], slots: int):
+	# cartesian product of grade_values over all slots -> (len(grade_values) ** slots, slots)
+	values = np.asarray(grade_values, dtype=float)
+	if slots == 0:
+		return np.empty((1, 0))
+	if values.size ** slots > MAX_SCENARIOS:
+		raise ValueError(f"{values.size}^{slots} Szenarien, höchstens {MAX_SCENARIOS} möglich")
+	mesh = np.meshgrid(*([values] * slots), indexing="ij")
+	return np.stack([m.ravel() for m in mesh], axis=1)
+
+
+def evaluate_scenarios(
+	general: Dict,
+	latest: Dict[str, Tuple[Course, int]],
+	grades: np.ndarray,
+	ects: Sequence[int],
+	replaces: Optional[Sequence[Optional[str]]] = None,
+	target: Optional[float] = None,
+):
+	# grades: (n_scenarios, n_slots); NaN means "slot not written in this scenario".
+	# replaces[j] names the course (any spelling, or its module ID) whose latest attempt
+	# slot j retakes (None = new module).
+	if target is None:
+		target = float(general["grade_target"])
+	base = _grade_base(latest)
+	grades = np.atleast_2d(np.asarray(grades, dtype=float))
+	slot_ects = np.asarray(ects, dtype=float)
+	if grades.shape[1] != slot_ects.size:
+		raise ValueError("grades and ects must describe the same number of slots")
+	replaces = list(replaces) if replaces is not None else [None] * slot_ects.size
+	if len(replaces) != slot_ects.size:
+		raise ValueError("replaces must have one entry per slot")
+
+	# contribution of the attempt each slot would overwrite (0 for new modules / ungraded)
+	old_weighted = np.zeros(slot_ects.size)
+	old_ects = np.zeros(slot_ects.size)
+	for j, name in enumerate(replaces):
+		if name is None:
+			continue
+		entry = base.latest.get(course_key(name)) or base.latest.get(course_key("", name))
+		if entry is None:
+			continue
+		course, _ = entry
+		if course.grade is not None:
+			old_weighted[j] = course.grade * course.ects
+			old_ects[j] = course.ects
+
+	written = ~np.isnan(grades)
+	filled = np.where(written, grades, 0.0)
+	weighted = base.all_weighted + filled @ slot_ects - written @ old_weighted
+	total_ects = base.all_graded_ects + written @ slot_ects - written @ old_ects
+
+	with np.errstate(invalid="ignore", divide="ignore"):
+		averages = np.where(total_ects > 0, weighted / total_ects, np.nan)
+	averages = np.round(averages, 2)
+	return ScenarioResult(averages=averages, meets_target=averages <= target, target=target)
+
+
+def retake_candidates(general: Dict, latest: Dict[str, Tuple[Course, int]]):
+	# latest attempts that could still improve the average: failed or worse than the target
+	target = float(general["grade_target"])
+	out: List[Course] = []
+	for c, _ in latest.values():
+		if c.grade is not None and (not c.passed or c.grade > target):
+			out.append(c)
+	return out
+
+
+def main():
+	from data_store import get_semester_grades
+
+	parser = argparse.ArgumentParser(description="Notenziel und Was-wäre-wenn-Szenarien für die nächsten Prüfungen")
+	parser.add_argument("--slots", type=int, default=3, help="Anzahl weiterer Prüfungen (Standard: 3)")
+	parser.add_argument("--ects", type=int, default=5, help="ECTS je weiterer Prüfung (Standard: 5)")
+	parser.add_argument(
+		"--grades", type=float, nargs="+", default=[1.0, 1.7, 2.3, 3.0, 4.0],
+		help="mögliche Noten je Prüfung (Standard: 1.0 1.7 2.3 3.0 4.0)",
+	)
+	parser.add_argument("--retakes", action="store_true", help="Wiederholungskandidaten (nicht bestanden oder schlechter als das Ziel) mit durchspielen")
+	parser.add_argument("--target", type=float, help="Notenziel (Standard: notenziel aus data.json)")
+	args = parser.parse_args()
+
+	general = get_general()
+	latest = _latest_course_map(get_semester_grades())
+	goal = required_grade_for_target(general, latest, args.target)
+	current = "-" if goal.current_average is None else f"{goal.current_average:.2f}"
+	need = "-" if goal.required_grade is None else f"{goal.required_grade:.2f}"
+	print(f"Ziel {goal.target:.1f}: aktuell Ø {current}, offen {goal.remaining_ects} ECTS, benötigt Ø {need}")
+
+	retakes = retake_candidates(general, latest) if args.retakes else []
+	ects = [args.ects] * args.slots + [c.ects for c in retakes]
+	replaces = [None] * args.slots + [c.course_id or c.name for c in retakes]
+	try:
+		grid = scenario_grid(args.grades, len(ects))
+	except ValueError as e:
+		print(f"Fehler: {e} (--slots oder --grades verkleinern)")
+		sys.exit(1)
+	result = evaluate_scenarios(general, latest, grid, ects, replaces, goal.target)
+	for c in retakes:
+		print(f"  Wiederholung: {c.name} (Note {c.grade:.1f})")
+	print(f"{len(grid)} Szenarien, Ziel erreicht in {result.share_meeting_target:.0%}")
+	if result.averages.size:
+		print(f"Ø bestenfalls {np.nanmin(result.averages):.2f}, schlechtestenfalls {np.nanmax(result.averages):.2f}")
+
+
+if __name__ == "__main__":
+	main()
+
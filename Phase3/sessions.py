@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Deque, Dict, Optional, Set, Tuple
+
+SESSIONS_FILE = Path(__file__).with_name("sessions.jsonl")
+RUNNING_FILE = Path(__file__).with_name(".session_running")
+
+# sessions are appended roughly in order; duplicates are only looked for this far back
+DEDUP_WINDOW = timedelta(days=7)
+
+
+def _week_start(day: date):
+	return day - timedelta(days=day.weekday())
+
+
+class SessionAggregator:
+	# Folds (start, end) sessions into ISO-week buckets in one pass. Memory is bounded
+	# by the number of weeks plus the sessions inside the duplicate window.
+	def __init__(self):
+		self.hours: Dict[date, float] = {}
+		self._recent: Deque[Tuple[datetime, datetime]] = deque()
+		self._recent_keys: Set[Tuple[datetime, datetime]] = set()
+		self.duplicates = 0
+
+	def add(self, start: datetime, end: datetime):
+		if end <= start:
+			return
+		key = (start, end)
+		if key in self._recent_keys:
+			self.duplicates += 1
+			return
+		self._recent.append(key)
+		self._recent_keys.add(key)
+		while self._recent and self._recent[0][0] < start - DEDUP_WINDOW:
+			self._recent_keys.discard(self._recent.popleft())
+
+		# split sessions that run past Sunday midnight into their weeks
+		cursor = start
+		while cursor < end:
+			monday = _week_start(cursor.date())
+			next_monday = datetime.combine(monday + timedelta(days=7), time.min)
+			piece_end = min(end, next_monday)
+			self.hours[monday] = self.hours.get(monday, 0.0) + (piece_end - cursor).total_seconds() / 3600.0
+			cursor = piece_end
+
+	def weeks(self):
+		return sorted((week, round(hours, 2)) for week, hours in self.hours.items())
+
+
+def _local_time(text: str):
+	# timestamps with an offset (e.g. from other tools) become naive local time like the rest
+	value = datetime.fromisoformat(text)
+	if value.tzinfo is not None:
+		value = value.astimezone().replace(tzinfo=None)
+	return value
+
+
+def _parse_line(line: str):
+	try:
+		rec = json.loads(line)
+		return _local_time(rec["start"]), _local_time(rec["end"])
+	except (ValueError, KeyError, TypeError):
+		return None
+
+
+# path -> (bytes consumed, aggregator): later calls only read what was appended since
+_incremental: Dict[Path, Tuple[int, SessionAggregator]] = {}
+
+
+def aggregate_file(path: Path = SESSIONS_FILE):
+	path = Path(path)
+	try:
+		size = path.stat().st_size
+	except OSError:
+		return SessionAggregator()
+	offset, agg = _incremental.get(path, (0, None))
+	if agg is None or size < offset:
+		offset, agg = 0, SessionAggregator()  # new or truncated file
+	with open(path, "rb") as f:
+		f.seek(offset)
+		for raw in f:
+			if not raw.endswith(b"\n"):
+				break  # line still being written, pick it up next time
+			offset += len(raw)
+			parsed = _parse_line(raw.decode("utf-8"))
+			if parsed is not None:
+				agg.add(*parsed)
+	_incremental[path] = (offset, agg)
+	return agg
+
+
+def session_weeks(path: Path = SESSIONS_FILE):
+	return aggregate_file(path).weeks()
+
+
+def append_session(start: datetime, end: datetime, path: Path = SESSIONS_FILE):
+	if end <= start:
+		raise ValueError("Ende muss nach dem Start liegen")
+	line = json.dumps({"start": start.isoformat(timespec="seconds"), "end": end.isoformat(timespec="seconds")})
+	with open(path, "a", encoding="utf-8") as f:
+		f.write(line + "\n")
+
+
+def running_since():
+	try:
+		return _local_time(RUNNING_FILE.read_text(encoding="utf-8").strip())
+	except (OSError, ValueError):
+		return None
+
+
+def start_timer(now: Optional[datetime] = None):
+	started = running_since()
+	if started is not None:
+		return started
+	now = (now or datetime.now()).replace(microsecond=0)
+	RUNNING_FILE.write_text(now.isoformat(), encoding="utf-8")
+	return now
+
+
+def stop_timer(now: Optional[datetime] = None):
+	started = running_since()
+	if started is None:
+		return None
+	end = (now or datetime.now()).replace(microsecond=0)
+	if end > started:
+		append_session(started, end)
+	os.remove(RUNNING_FILE)
+	return started, end
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Lernsitzungen erfassen und zu Wochenstunden zusammenfassen")
+	sub = parser.add_subparsers(dest="command", required=True)
+	sub.add_parser("start", help="Timer starten")
+	sub.add_parser("stop", help="Timer stoppen und Sitzung speichern")
+	log = sub.add_parser("log", help="Abgeschlossene Sitzung nachtragen")
+	log.add_argument("--start", required=True, type=_local_time, help="Beginn (YYYY-MM-DDTHH:MM)")
+	log.add_argument("--end", required=True, type=_local_time, help="Ende (YYYY-MM-DDTHH:MM)")
+	sub.add_parser("weeks", help="Stunden pro Woche aus den Sitzungen anzeigen")
+	args = parser.parse_args()
+
+	if args.command == "start":
+		print(f"[OK] Timer läuft seit {start_timer().isoformat()}")
+	elif args.command == "stop":
+		result = stop_timer()
+		if result is None:
+			print("Fehler: Kein Timer aktiv.")
+			sys.exit(1)
+		start, end = result
+		print(f"[OK] Sitzung gespeichert: {start.isoformat()} - {end.isoformat()} ({(end - start).total_seconds() / 3600:.2f} h)")
+	elif args.command == "log":
+		try:
+			append_session(args.start, args.end)
+		except ValueError as e:
+			print(f"Fehler: {e}")
+			sys.exit(1)
+		print("[OK] Sitzung gespeichert.")
+	else:
+		for week, hours in session_weeks():
+			print(f"{week.isoformat()}: {hours:.2f} h")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Any, DefaultDict, Dict, Iterable, List, Optional, Tuple
+
+from codec import dumps, read_json, write_json
+from courses import course_key
+
+SHARD_DIR = Path(__file__).with_name("data_shards")
+MANIFEST_NAME = "manifest.json"
+
+
+def _exam_shard_file(semester: int):
+	return f"exams_s{semester}.json"
+
+
+def _week_shard_file(year: int):
+	return f"study_time_{year}.json"
+
+
+def _exam_totals(records: List[Dict[str, Any]]):
+	graded = [e for e in records if e.get("note") is not None]
+	return {
+		"count": len(records),
+		"ects": sum(int(e.get("ects", 0)) for e in records),
+		"graded_ects": sum(int(e.get("ects", 0)) for e in graded),
+		"weighted": round(sum(float(e["note"]) * int(e.get("ects", 0)) for e in graded), 4),
+		"last_date": max((e["datum"] for e in records if e.get("datum")), default=None),
+	}
+
+
+def _week_totals(records: List[Dict[str, Any]]):
+	starts = [w["week_start"] for w in records]
+	return {
+		"count": len(set(starts)),  # distinct weeks, repeated entries are summed when read
+		"hours": round(sum(float(w["hours"]) for w in records), 4),
+		"first": min(starts, default=None),
+		"last": max(starts, default=None),
+	}
+
+
+def _exam_key(exam: Dict[str, Any]):
+	return course_key(exam.get("prüfungsname") or exam.get("name", "Kurs"), exam.get("modul_id"))
+
+
+def _replaces(exam: Dict[str, Any], current: Dict[str, Any], first: bool):
+	# analytics._latest_course_map's rule on raw records: higher attempt, then later date;
+	# on a full tie the record that comes first in data order stays (first: the new one does)
+	attempt, current_attempt = int(exam.get("versuch", 1)), int(current.get("versuch", 1))
+	if attempt != current_attempt:
+		return attempt > current_attempt
+	day, current_day = exam.get("datum") or "", current.get("datum") or ""
+	if day != current_day:
+		return day > current_day
+	return first
+
+
+def _add_latest(latest: Dict[str, List[Any]], exam: Dict[str, Any], semester: int, first: bool = False):
+	key = _exam_key(exam)
+	current = latest.get(key)
+	if current is None or _replaces(exam, current[1], first and semester < current[0]):
+		latest[key] = [semester, exam]
+
+
+class ShardedStore:
+	# one JSON file per semester of exams and per year of study weeks, plus a manifest with
+	# the general settings, pre-aggregated totals per shard and the latest attempt per course
+	# (so the all-time KPIs need no shard at all)
+	def __init__(self, directory: Path = SHARD_DIR):
+		self.directory = Path(directory)
+		self.manifest_path = self.directory / MANIFEST_NAME
+		self._manifest: Optional[Dict[str, Any]] = None
+		self._manifest_mtime: Optional[int] = None
+		self._cache: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}  # file -> (hash, records)
+
+	def exists(self):
+		return self.manifest_path.exists()
+
+	def manifest(self):
+		mtime = self.manifest_path.stat().st_mtime_ns
+		if self._manifest is None or mtime != self._manifest_mtime:
+			self._manifest = read_json(self.manifest_path)
+			self._manifest_mtime = mtime
+		return self._manifest
+
+	def meta(self):
+		return self.manifest().get("meta", {})
+
+	def semesters(self):
+		return sorted(int(k) for k in self.manifest().get("exams", {}))
+
+	def years(self):
+		return sorted(int(k) for k in self.manifest().get("study_time", {}))
+
+	def totals(self, kind: str):
+		return {int(k): v["totals"] for k, v in self.manifest().get(kind, {}).items()}
+
+	def latest(self):
+		# course key -> [semester, exam record]; manifests written before the index existed
+		# are answered from the shards once per process
+		latest = self.manifest().get("latest")
+		if latest is None:
+			latest = {}
+			for exam in self.exams():
+				_add_latest(latest, exam, int(exam.get("semester", 0)))
+			self.manifest()["latest"] = latest
+		return latest
+
+	def _read_shard(self, entry: Dict[str, Any]):
+		cached = self._cache.get(entry["file"])
+		if cached is not None and cached[0] == entry["hash"]:
+			return cached[1]
+		records = read_json(self.directory / entry["file"])
+		self._cache[entry["file"]] = (entry["hash"], records)
+		return records
+
+	def exams(self, semesters: Optional[Iterable[int]] = None):
+		entries = self.manifest().get("exams", {})
+		keys = self.semesters() if semesters is None else sorted(set(semesters))
+		out: List[Dict[str, Any]] = []
+		for sem in keys:
+			if str(sem) in entries:
+				out.extend(self._read_shard(entries[str(sem)]))
+		return out
+
+	def weeks(self, since: Optional[date] = None):
+		entries = self.manifest().get("study_time", {})
+		out: List[Dict[str, Any]] = []
+		for year in self.years():
+			entry = entries[str(year)]
+			# whole shards that end before `since` are skipped without being read
+			if since is not None and (entry["totals"]["last"] or "") < since.isoformat():
+				continue
+			out.extend(self._read_shard(entry))
+		if since is not None:
+			out = [w for w in out if w["week_start"] >= since.isoformat()]
+		return out
+
+	def load_all(self):
+		data = dict(self.meta())
+		data["exams"] = self.exams()
+		data["study_time"] = self.weeks()
+		return data
+
+	def _write_shard(self, kind: str, key: int, records: List[Dict[str, Any]], manifest: Dict[str, Any]):
+		name = _exam_shard_file(key) if kind == "exams" else _week_shard_file(key)
+		import hashlib  # only needed for writing; keeps read-only imports (text mode) light
+
+		raw = dumps(records)
+		digest = hashlib.sha1(raw).hexdigest()
+		entries = manifest.setdefault(kind, {})
+		if entries.get(str(key), {}).get("hash") == digest:
+			return False
+		_atomic_write(self.directory / name, raw)
+		totals = _exam_totals(records) if kind == "exams" else _week_totals(records)
+		entries[str(key)] = {"file": name, "hash": digest, "totals": totals}
+		self._cache[name] = (digest, records)
+		return True
+
+	def _write_manifest(self, manifest: Dict[str, Any]):
+		_atomic_write(self.manifest_path, dumps(manifest))
+		self._manifest = manifest
+		self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+
+	def _current_manifest(self):
+		if self.exists():
+			return json.loads(json.dumps(self.manifest()))  # deep copy, written back on success
+		return {"version": 1, "meta": {}, "exams": {}, "study_time": {}}
+
+	def save_all(self, data: Dict[str, Any]):
+		# rewrites only the shards whose content changed
+		self.directory.mkdir(parents=True, exist_ok=True)
+		manifest = self._current_manifest()
+		manifest["meta"] = {k: v for k, v in data.items() if k not in ("exams", "study_time")}
+
+		by_sem: DefaultDict[int, List[Dict[str, Any]]] = defaultdict(list)
+		for e in data.get("exams", []):
+			by_sem[int(e.get("semester", 0))].append(e)
+		# in the order the shards are read back: semesters ascending, file order within
+		latest: Dict[str, List[Any]] = {}
+		for sem in sorted(by_sem):
+			for e in by_sem[sem]:
+				_add_latest(latest, e, sem)
+		manifest["latest"] = latest
+		by_year: DefaultDict[int, List[Dict[str, Any]]] = defaultdict(list)
+		for w in data.get("study_time", []):
+			by_year[int(w["week_start"][:4])].append(w)
+
+		written = 0
+		for kind, groups in (("exams", by_sem), ("study_time", by_year)):
+			for key, records in groups.items():
+				written += self._write_shard(kind, key, records, manifest)
+			for stale in [k for k in manifest[kind] if int(k) not in groups]:
+				(self.directory / manifest[kind].pop(stale)["file"]).unlink(missing_ok=True)
+				written += 1
+		self._write_manifest(manifest)
+		return written
+
+	def append_exam(self, exam: Dict[str, Any]):
+		manifest = self._current_manifest()
+		sem = int(exam.get("semester", 0))
+		records = list(self.exams([sem])) + [exam]
+		if "latest" in manifest:
+			# the exam ends up behind its semester, but before every later semester
+			_add_latest(manifest["latest"], exam, sem, first=True)
+		self._write_shard("exams", sem, records, manifest)
+		self._write_manifest(manifest)
+
+	def upsert_weeks(self, changes: Dict[date, Optional[float]]):
+		# None or 0 hours removes the week, like WeeklyTimeDialog; one manifest write per batch
+		manifest = self._current_manifest()
+		by_year: DefaultDict[int, Dict[str, Optional[float]]] = defaultdict(dict)
+		for week_start, hours in changes.items():
+			by_year[week_start.year][week_start.isoformat()] = hours
+		for year, updates in by_year.items():
+			entry = manifest.get("study_time", {}).get(str(year))
+			records = [w for w in (self._read_shard(entry) if entry else []) if w["week_start"] not in updates]
+			records += [{"week_start": start, "hours": hours} for start, hours in updates.items() if hours]
+			records.sort(key=lambda w: w["week_start"])
+			if records:
+				self._write_shard("study_time", year, records, manifest)
+			elif entry:
+				(self.directory / manifest["study_time"].pop(str(year))["file"]).unlink(missing_ok=True)
+		self._write_manifest(manifest)
+
+
+def _atomic_write(path: Path, raw: bytes):
+	tmp = path.with_suffix(path.suffix + ".tmp")
+	with open(tmp, "wb") as f:
+		f.write(raw)
+	os.replace(tmp, path)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Teilt data.json in Semester-/Jahres-Shards auf oder führt sie wieder zusammen")
+	sub = parser.add_subparsers(dest="command", required=True)
+	split = sub.add_parser("split", help="data.json in Shards aufteilen")
+	split.add_argument("source", nargs="?", type=Path, default=Path(__file__).with_name("data.json"))
+	join = sub.add_parser("join", help="Shards zu einer JSON-Datei zusammenführen")
+	join.add_argument("-o", "--output", type=Path, required=True)
+	sub.add_parser("info", help="Shards und vorberechnete Summen anzeigen")
+	args = parser.parse_args()
+
+	store = ShardedStore()
+	if args.command == "split":
+		data = read_json(args.source)
+		written = store.save_all(data)
+		print(f"[OK] {written} Shard(s) nach {store.directory} geschrieben.")
+	elif not store.exists():
+		print(f"Fehler: Keine Shards in {store.directory} gefunden!")
+		sys.exit(1)
+	elif args.command == "join":
+		write_json(args.output, store.load_all())
+		print(f"[OK] Shards nach {args.output} zusammengeführt.")
+	else:
+		for sem, t in store.totals("exams").items():
+			print(f"S{sem}: {t['count']} Exams, {t['ects']} ECTS")
+		for year, t in store.totals("study_time").items():
+			print(f"{year}: {t['count']} Wochen, {t['hours']} h")
+
+
+if __name__ == "__main__":
+	main()
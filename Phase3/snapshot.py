@@ -0,0 +1,264 @@
+import json
+import mmap
+import os
+import struct
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from columns import ExamColumns, WeekColumns, _flag
+from courses import course_key
+
+SNAPSHOT_FILE = Path(__file__).with_name("data.snap")
+
+MAGIC = b"SDSNAP03"
+# magic, source mtime_ns, source size, n_exams, n_weeks, n_names, n_extra,
+# exams offset, weeks offset, string offsets offset, string data offset.
+# Strings: course names (first spelling per key), their keys, the extra strings the records
+# point to (own spelling, modul_id) and last the settings (everything but exams/weeks) as JSON.
+HEADER = struct.Struct("<8sqqqqqqqqqq")
+
+EXAM_DTYPE = np.dtype([
+	("name_id", "<u4"),
+	("spelling_id", "<u4"),  # the record's own name, index into the extra strings
+	("module_id", "<i4"),  # modul_id, index into the extra strings, -1 = none
+	("semester", "<i4"),
+	("ects", "<i4"),
+	("attempt", "<i4"),
+	("grade", "<f8"),  # NaN = no grade yet
+	("date", "<M8[D]"),  # NaT = no date
+	("passed_flag", "<f8"),  # NaN = no explicit "passed" field
+])
+WEEK_DTYPE = np.dtype([
+	("week_start", "<M8[D]"),
+	("hours", "<f8"),
+])
+
+
+def _align(offset: int):
+	return (offset + 7) & ~7
+
+
+class Snapshot:
+	def __init__(self, path: Path):
+		self.path = Path(path)
+		self._file = open(self.path, "rb")
+		self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		(magic, self.source_mtime_ns, self.source_size, n_exams, n_weeks, self._n_names, self._n_extra,
+		 exams_off, weeks_off, stroff_off, strdata_off) = HEADER.unpack_from(self._mm, 0)
+		if magic != MAGIC:
+			self.close()
+			raise ValueError(f"{self.path} is not a StudyDashboard snapshot")
+		# zero-copy, read-only views: pages are only read when the arrays are touched
+		self.exams = np.frombuffer(self._mm, dtype=EXAM_DTYPE, count=n_exams, offset=exams_off)
+		self.weeks = np.frombuffer(self._mm, dtype=WEEK_DTYPE, count=n_weeks, offset=weeks_off)
+		n_strings = 2 * self._n_names + self._n_extra + 1
+		self._str_offsets = np.frombuffer(self._mm, dtype="<u8", count=n_strings + 1, offset=stroff_off)
+		self._strdata_off = strdata_off
+		self._names: Optional[List[str]] = None
+
+	def _string(self, i: int):
+		lo, hi = int(self._str_offsets[i]), int(self._str_offsets[i + 1])
+		return self._mm[self._strdata_off + lo:self._strdata_off + hi].decode("utf-8")
+
+	def name(self, name_id: int):
+		return self._string(name_id)
+
+	@property
+	def names(self):
+		if self._names is None:
+			self._names = [self._string(i) for i in range(self._n_names)]
+		return self._names
+
+	def course_keys(self):
+		return [self._string(self._n_names + i) for i in range(self._n_names)]
+
+	def extra_strings(self):
+		start = 2 * self._n_names
+		return [self._string(start + i) for i in range(self._n_extra)]
+
+	def settings(self):
+		return json.loads(self._string(2 * self._n_names + self._n_extra))
+
+	def exam_columns(self):
+		e = self.exams
+		return ExamColumns(
+			self.names, e["name_id"], e["semester"], e["ects"], e["grade"], e["attempt"], e["date"], e["passed_flag"],
+			self.course_keys(),
+		)
+
+	def week_columns(self):
+		return WeekColumns(self.weeks["week_start"], self.weeks["hours"])
+
+	def exam_records(self):
+		# plain Python values per exam in data order:
+		# (name, modul_id, semester, ects, grade or None, attempt, date or None)
+		e = self.exams
+		extra = self.extra_strings()
+		names = [extra[i] for i in e["spelling_id"].tolist()]
+		modules = [extra[i] if i >= 0 else None for i in e["module_id"].tolist()]
+		grades = [None if g != g else g for g in e["grade"].tolist()]
+		return zip(names, modules, e["semester"].tolist(), e["ects"].tolist(), grades, e["attempt"].tolist(), e["date"].tolist())
+
+	def week_records(self):
+		return zip(self.weeks["week_start"].tolist(), self.weeks["hours"].tolist())
+
+	def close(self):
+		# views must be dropped before the map can be closed
+		self.exams = self.weeks = self._str_offsets = None
+		try:
+			self._mm.close()
+		except BufferError:
+			pass  # views handed out (e.g. via exam_columns) are still alive; the map goes with them
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+class _Strings:
+	# interning state of one snapshot: course keys -> name ids, extra strings -> extra ids
+	def __init__(self, names: Iterable[str] = (), keys: Iterable[str] = (), extra: Iterable[str] = ()):
+		self.names = list(names)
+		self.codes = {key: i for i, key in enumerate(keys)}
+		self.extra = {s: i for i, s in enumerate(extra)}
+
+	def _extra_id(self, value: str):
+		if value not in self.extra:
+			self.extra[value] = len(self.extra)
+		return self.extra[value]
+
+	def exam_records(self, exams: List[Dict[str, Any]]):
+		# same interning as columns.exam_columns: one name id per course key, first spelling kept as name
+		records = np.zeros(len(exams), dtype=EXAM_DTYPE)
+		name_ids, spelling_ids, module_ids = [], [], []
+		for e in exams:
+			name = e.get("prüfungsname") or e.get("name", "Kurs")
+			key = course_key(name, e.get("modul_id"))
+			if key not in self.codes:
+				self.codes[key] = len(self.codes)
+				self.names.append(name)
+			name_ids.append(self.codes[key])
+			spelling_ids.append(self._extra_id(name))
+			module_ids.append(self._extra_id(str(e["modul_id"])) if e.get("modul_id") else -1)
+		records["name_id"] = name_ids
+		records["spelling_id"] = spelling_ids
+		records["module_id"] = module_ids
+		records["semester"] = [e.get("semester", 0) for e in exams]
+		records["ects"] = [e.get("ects", 0) for e in exams]
+		records["attempt"] = [e.get("versuch", 1) for e in exams]
+		records["grade"] = [e.get("note") if e.get("note") is not None else np.nan for e in exams]
+		records["date"] = np.array([e.get("datum") or "NaT" for e in exams], dtype="datetime64[D]")
+		records["passed_flag"] = [_flag(e.get("passed", e.get("bestanden"))) for e in exams]
+		return records
+
+
+def _week_records(weeks: List[Dict[str, Any]]):
+	records = np.zeros(len(weeks), dtype=WEEK_DTYPE)
+	records["week_start"] = np.array([w["week_start"] for w in weeks], dtype="datetime64[D]")
+	records["hours"] = [float(w["hours"]) for w in weeks]
+	return records
+
+
+def _write(path: Path, source: Path, exams: np.ndarray, weeks: np.ndarray, strings: _Strings, settings: str):
+	encoded = [s.encode("utf-8") for s in strings.names + list(strings.codes) + list(strings.extra) + [settings]]
+	str_offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+	str_offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+	exams_off = _align(HEADER.size)
+	weeks_off = _align(exams_off + exams.nbytes)
+	stroff_off = _align(weeks_off + weeks.nbytes)
+	strdata_off = stroff_off + str_offsets.nbytes
+
+	stat = source.stat()
+	tmp = Path(path).with_suffix(".tmp")
+	with open(tmp, "wb") as f:
+		f.write(HEADER.pack(
+			MAGIC, stat.st_mtime_ns, stat.st_size, len(exams), len(weeks), len(strings.names), len(strings.extra),
+			exams_off, weeks_off, stroff_off, strdata_off,
+		))
+		for offset, block in ((exams_off, exams), (weeks_off, weeks), (stroff_off, str_offsets)):
+			f.write(b"\0" * (offset - f.tell()))
+			f.write(block.tobytes())
+		f.write(b"".join(encoded))
+	os.replace(tmp, path)
+
+
+def _source(source: Optional[Path]):
+	from data_store import data_source
+
+	return Path(source or data_source())
+
+
+def write_snapshot(data: Dict[str, Any], path: Path = SNAPSHOT_FILE, source: Optional[Path] = None):
+	strings = _Strings()
+	exams = strings.exam_records(data.get("exams", []))
+	settings = json.dumps({k: v for k, v in data.items() if k not in ("exams", "study_time")}, ensure_ascii=False)
+	_write(path, _source(source), exams, _week_records(data.get("study_time", [])), strings, settings)
+
+
+def extend_snapshot(
+	base: Snapshot,
+	exams: List[Dict[str, Any]] = (),
+	week_changes: Optional[Dict[date, Optional[float]]] = None,
+	path: Path = SNAPSHOT_FILE,
+	source: Optional[Path] = None,
+):
+	# new snapshot from the current one (closed afterwards) plus appended exams / edited weeks,
+	# without reading the data:
+	# used by the shard writers, which only touch one shard. Exams go to the end of their
+	# semester block (shards are read in semester order); None or 0 hours deletes a week.
+	strings = _Strings(base.names, base.course_keys(), base.extra_strings())
+	records = base.exams
+	for exam in exams:
+		at = int(np.count_nonzero(records["semester"] <= int(exam.get("semester", 0))))
+		records = np.concatenate((records[:at], strings.exam_records([exam]), records[at:]))
+	weeks = base.weeks
+	if week_changes:
+		touched = np.array([d.isoformat() for d in week_changes], dtype="datetime64[D]")
+		added = _week_records([{"week_start": d.isoformat(), "hours": h} for d, h in week_changes.items() if h])
+		weeks = np.concatenate((weeks[~np.isin(weeks["week_start"], touched)], added))
+		weeks = weeks[np.argsort(weeks["week_start"], kind="stable")]
+	settings = base._string(2 * base._n_names + base._n_extra)
+	records, weeks = np.array(records), np.array(weeks)
+	# base is closed before data.snap is replaced: a mapped file cannot be replaced on Windows
+	base.close()
+	_write(path, _source(source), records, weeks, strings, settings)
+
+
+def _is_current(snap: Snapshot, source: Path):
+	try:
+		stat = source.stat()
+	except OSError:
+		return True  # nothing to compare against, the snapshot is all we have
+	return snap.source_mtime_ns == stat.st_mtime_ns and snap.source_size == stat.st_size
+
+
+def open_snapshot(path: Path = SNAPSHOT_FILE, source: Optional[Path] = None):
+	# the snapshot if it matches the current data, else None; it is written by the data_store
+	# save paths and by the dashboard's read path, never rebuilt here
+	path = Path(path)
+	if not path.exists():
+		return None
+	try:
+		snap = Snapshot(path)
+	except (ValueError, OSError, struct.error):
+		return None
+	if _is_current(snap, _source(source)):
+		return snap
+	snap.close()
+	return None
+
+
+def load_columns():
+	# read-only column views of the current data straight from the map, or None when data.snap
+	# is missing or stale. The views keep the map alive after the Snapshot object is gone.
+	snap = open_snapshot()
+	if snap is None:
+		return None
+	return snap.exam_columns(), snap.week_columns()
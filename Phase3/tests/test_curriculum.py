@@ -0,0 +1,41 @@
+import unittest
+from datetime import date
+
+from courses import course_key
+from curriculum import Catalog, Module
+from data_store import Course
+
+
+def _latest(*courses):
+	return {course_key(c.name): (c, 1) for c in courses}
+
+
+class UngradedPassFailTest(unittest.TestCase):
+	def setUp(self):
+		self.catalog = Catalog([
+			Module(course_key("Kollaboratives Arbeiten"), "Kollaboratives Arbeiten", 5, 1),
+			Module(course_key("Mathematik: Analysis"), "Mathematik: Analysis", 5, 1),
+		])
+		self.today = date(2026, 10, 19)
+
+	def test_past_ungraded_attempt_counts_as_passed(self):
+		latest = _latest(Course("Kollaboratives Arbeiten", 5, None, True, 1, date(2025, 3, 1)))
+		self.assertEqual(self.catalog.passed(latest, self.today), {course_key("Kollaboratives Arbeiten")})
+		self.assertEqual(self.catalog.due(latest, 12, self.today), {course_key("Mathematik: Analysis")})
+		remaining = self.catalog.remaining(latest, self.today)
+		plan = self.catalog.plan(remaining, date(2026, 11, 1), 5)
+		self.assertEqual([m.name for month in plan.months for m in month.modules], ["Mathematik: Analysis"])
+		self.assertEqual(self.catalog.required_capacity(remaining, date(2026, 11, 1), date(2026, 12, 1)), 5)
+
+	def test_registered_ungraded_attempt_stays_open(self):
+		for day in (date(2026, 11, 20), None):
+			latest = _latest(Course("Kollaboratives Arbeiten", 5, None, True, 1, day))
+			self.assertEqual(self.catalog.passed(latest, self.today), set())
+
+	def test_failed_attempt_is_not_passed(self):
+		latest = _latest(Course("Mathematik: Analysis", 5, 5.0, False, 1, date(2025, 3, 1)))
+		self.assertEqual(self.catalog.passed(latest, self.today), set())
+
+
+if __name__ == "__main__":
+	unittest.main()
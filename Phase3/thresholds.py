@@ -0,0 +1,308 @@
+import argparse
+import os
+import sys
+from bisect import bisect_left
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from analytics import (
+	_add_latest,
+	_latest_course_map,
+	backlog_modules_from_latest,
+	ects_by_semester_from_latest,
+	ects_current_semester_month_from_latest,
+)
+from codec import read_json, write_json
+from data_store import SemesterGrades, data_source
+from quantiles import KLLSketch, merge_all
+from sessions import SESSIONS_FILE
+
+# sketches of the own history, updated incrementally (not part of the data, safe to delete)
+SKETCH_FILE = Path(__file__).with_name(".sketches.json")
+# merged sketches of a group of students (python thresholds.py merge ...)
+COHORT_FILE = Path(__file__).with_name("cohort_sketches.json")
+
+FIXED = "fixed"
+PERSONAL = "personal"
+COHORT = "cohort"
+_MODES = {
+	"fixed": FIXED, "fest": FIXED,
+	"personal": PERSONAL, "persönlich": PERSONAL, "persoenlich": PERSONAL,
+	"cohort": COHORT, "kohorte": COHORT,
+}
+
+# below this many observations the fixed thresholds stay in place
+MIN_SAMPLES = 8
+
+# metric -> quantiles that replace the fixed bounds of the matching status function
+METRIC_QUANTILES: Dict[str, Tuple[float, ...]] = {
+	"weekly_hours": (0.5, 0.75),  # green from the median, light green above the upper quartile
+	"grade": (0.25, 0.5, 0.75),  # light green / green / orange limits, lower grade is better
+	"semester_ects": (0.25, 0.5),  # red below the lower quartile, green from the median
+	"month_ects": (0.5, 0.75),
+	"backlog": (0.5, 0.75),  # green up to the median, orange up to the upper quartile
+}
+
+# bumped when a series changes its definition: stored sketches are then rebuilt
+FORMAT_VERSION = 3
+
+
+def normalize_mode(mode: Optional[str]):
+	return _MODES.get(str(mode or FIXED).strip().casefold(), FIXED)
+
+
+def _month_index(day: date, start: date):
+	return (day.year - start.year) * 12 + day.month - start.month
+
+
+def history_series(
+	semesters: Sequence[SemesterGrades],
+	weeks: Sequence[Tuple[date, float]],
+	general: Dict,
+	today: date,
+	catalog=None,
+	since: Optional[Tuple[int, Optional[date]]] = None,
+):
+	# Completed periods only, in the order the data already has (no sorting): weeks come
+	# sorted from data_store, exams in file order, months and semesters by index.
+	# since=(month index, week start) of the first period not synced yet: only the periods
+	# completed after it are returned, for data that has not changed since (so "grade" and
+	# "semester_ects", which only change with the data, are left out).
+	first_month, first_week = since or (0, None)
+	week_start = today - timedelta(days=today.weekday())
+	lo = bisect_left(weeks, (first_week,)) if first_week else 0
+	series: Dict[str, List[float]] = {
+		"weekly_hours": [hours for start, hours in weeks[lo:] if start < week_start],
+	}
+
+	# month_ects and backlog replay the KPI functions month by month on the exams known at
+	# the end of that month (undated ones count from the beginning), so both compare like
+	# with like: current-semester ECTS of the month and, with a curriculum, catalog.due.
+	# Months before first_month are only folded in, their values are already in the sketches.
+	start = date.fromisoformat(general["start_date"])
+	months = max(0, _month_index(today, start))
+	latest: Dict[str, Tuple] = {}
+	by_month: List[List[Tuple]] = [[] for _ in range(months)]
+	for s in semesters:
+		for c in s.courses:
+			i = _month_index(c.date, start) if c.date else -1
+			if i < first_month:
+				_add_latest(latest, c, s.semester)
+			elif i < months:
+				by_month[i].append((c, s.semester))
+	month_ects: List[float] = []
+	backlog: List[float] = []
+	for i in range(first_month, months):
+		for c, sem in by_month[i]:
+			_add_latest(latest, c, sem)
+		month = date(start.year + (start.month - 1 + i) // 12, (start.month - 1 + i) % 12 + 1, 1)
+		month_ects.append(float(ects_current_semester_month_from_latest(latest, month)[1]))
+		# every attempt folded in so far lies before the end of the month
+		backlog.append(float(backlog_modules_from_latest(latest, i + 1, catalog, date.max)))
+	series["month_ects"] = month_ects
+	series["backlog"] = backlog
+	if since is not None:
+		return series
+
+	series["grade"] = [c.grade for s in semesters for c in s.courses if c.passed and c.grade is not None]
+	by_sem = ects_by_semester_from_latest(_latest_course_map(semesters))
+	current = max(by_sem, default=0)
+	series["semester_ects"] = [float(by_sem[sem]) for sem in range(1, current) if sem in by_sem]
+	return series
+
+
+def _signature():
+	# exams and weeks come from the data set plus the timer sessions
+	out = []
+	for path in (data_source(), SESSIONS_FILE):
+		try:
+			st = os.stat(path)
+			out.append([st.st_mtime_ns, st.st_size])
+		except OSError:
+			out.append(None)
+	return out
+
+
+class SketchStore:
+	# Persistent sketches with a watermark: the data signature they were built from plus the
+	# first month and week not folded in yet. With unchanged data only the periods completed
+	# since the last run are replayed and appended; any change to the data rebuilds them once.
+	def __init__(self, path: Path = SKETCH_FILE):
+		self.path = Path(path)
+		self.metrics: Dict[str, KLLSketch] = {}
+		self.source = None
+		self.month = 0
+		self.week: Optional[date] = None
+		self.changed = False
+		try:
+			raw = read_json(self.path)
+		except (OSError, ValueError):
+			raw = {}
+		if raw.get("version") != FORMAT_VERSION:
+			return
+		try:
+			self.metrics = {name: KLLSketch.from_dict(entry) for name, entry in raw["metrics"].items()}
+			self.month = int(raw["month"])
+			self.week = date.fromisoformat(raw["week"]) if raw.get("week") else None
+		except (KeyError, TypeError, ValueError):
+			self.metrics, self.month, self.week = {}, 0, None
+			return
+		self.source = raw.get("source")
+
+	def reset(self):
+		self.metrics, self.source, self.month, self.week = {}, None, 0, None
+		self.changed = True
+
+	def append(self, name: str, values: Sequence[float]):
+		sketch = self.metrics.setdefault(name, KLLSketch())
+		if values:
+			sketch.extend(values)
+			self.changed = True
+		return sketch
+
+	def advance(self, source, month: int, week: date):
+		if (source, month, week) != (self.source, self.month, self.week):
+			self.source, self.month, self.week = source, month, week
+			self.changed = True
+
+	def save(self):
+		if not self.changed:
+			return
+		try:
+			write_json(self.path, {
+				"version": FORMAT_VERSION,
+				"source": self.source,
+				"month": self.month,
+				"week": self.week.isoformat() if self.week else None,
+				"metrics": {name: sketch.to_dict() for name, sketch in self.metrics.items()},
+			})
+		except OSError:
+			return  # read-only install: the sketches are rebuilt next time
+		self.changed = False
+
+
+def personal_sketches(semesters: Sequence[SemesterGrades], weeks: Sequence[Tuple[date, float]], general: Dict, today: date, catalog=None, path: Path = SKETCH_FILE, persist: bool = True):
+	# persist=False: stored sketches are still read, the updated ones stay in memory
+	store = SketchStore(path)
+	source = _signature()
+	start = date.fromisoformat(general["start_date"])
+	month = max(0, _month_index(today, start))
+	week = today - timedelta(days=today.weekday())
+	if source[0] is None or store.source != source:
+		store.reset()
+		series = history_series(semesters, weeks, general, today, catalog)
+	elif (store.month, store.week) != (month, week):
+		series = history_series(semesters, weeks, general, today, catalog, since=(store.month, store.week))
+	else:
+		series = {}
+	for name, values in series.items():
+		store.append(name, values)
+	store.advance(source, month, week)
+	if persist:
+		store.save()
+	return dict(store.metrics)
+
+
+def _read_sketch_file(path: Path):
+	# {"students": n, "sketches": {metric: sketch}}, written by export/merge
+	raw = read_json(path)
+	sketches = {name: KLLSketch.from_dict(entry) for name, entry in raw.get("sketches", {}).items()}
+	return int(raw.get("students", 1)), sketches
+
+
+def _write_sketch_file(path: Path, students: int, sketches: Dict[str, KLLSketch]):
+	write_json(path, {"students": students, "sketches": {name: s.to_dict() for name, s in sketches.items()}})
+
+
+def load_cohort(path: Path = COHORT_FILE):
+	try:
+		return _read_sketch_file(path)[1]
+	except (OSError, ValueError, KeyError):
+		return {}
+
+
+def merge_sketch_files(paths: Iterable[Path]):
+	students = 0
+	parts: Dict[str, List[KLLSketch]] = {}
+	for path in paths:
+		n, sketches = _read_sketch_file(path)
+		students += n
+		for name, sketch in sketches.items():
+			parts.setdefault(name, []).append(sketch)
+	return students, {name: merge_all(sketches) for name, sketches in parts.items()}
+
+
+def adaptive_bounds(sketches: Dict[str, KLLSketch]):
+	# metric -> bounds for the analytics status functions; metrics with too little history are left out
+	return {
+		name: sketches[name].quantiles(qs)
+		for name, qs in METRIC_QUANTILES.items()
+		if name in sketches and len(sketches[name]) >= MIN_SAMPLES
+	}
+
+
+def status_bounds(general: Dict, semesters: Sequence[SemesterGrades], weeks: Sequence[Tuple[date, float]], today: date, catalog=None, persist: bool = True):
+	mode = normalize_mode(general.get("status_thresholds"))
+	if mode == PERSONAL:
+		return adaptive_bounds(personal_sketches(semesters, weeks, general, today, catalog, persist=persist))
+	if mode == COHORT:
+		return adaptive_bounds(load_cohort())
+	return {}
+
+
+def main():
+	from curriculum import load_curriculum
+	from data_store import get_general, get_semester_grades, get_study_time_weeks
+
+	parser = argparse.ArgumentParser(description="Quantil-Sketches für adaptive Ampel-Schwellenwerte")
+	sub = parser.add_subparsers(dest="command", required=True)
+	show = sub.add_parser("show", help="Schwellenwerte aus eigener Historie oder Kohorte anzeigen")
+	show.add_argument("--cohort", type=Path, nargs="?", const=COHORT_FILE, help="Kohorten-Datei statt eigener Historie")
+	export = sub.add_parser("export", help="Eigene Sketches zum Teilen exportieren (ohne Einzelwerte)")
+	export.add_argument("target", type=Path)
+	merge = sub.add_parser("merge", help="Sketches mehrerer Studierender zu einer Kohorte zusammenführen")
+	merge.add_argument("files", nargs="+", type=Path)
+	merge.add_argument("-o", "--output", type=Path, default=COHORT_FILE, help="Ziel (Standard: cohort_sketches.json)")
+	args = parser.parse_args()
+
+	if args.command == "merge":
+		try:
+			students, sketches = merge_sketch_files(args.files)
+		except (OSError, ValueError, KeyError) as e:
+			print(f"Fehler beim Lesen der Sketches: {e}")
+			sys.exit(1)
+		_write_sketch_file(args.output, students, sketches)
+		print(f"[OK] {students} Studierende -> {args.output}")
+		return
+
+	general = get_general()
+	try:
+		catalog = load_curriculum()
+	except (ValueError, OSError):
+		catalog = None
+	sketches = personal_sketches(get_semester_grades(), get_study_time_weeks(), general, date.today(), catalog)
+	if args.command == "export":
+		_write_sketch_file(args.target, 1, sketches)
+		print(f"[OK] {args.target}")
+		return
+
+	if args.cohort is not None:
+		sketches = load_cohort(args.cohort)
+		if not sketches:
+			print(f"Fehler: keine Sketches in {args.cohort}")
+			sys.exit(1)
+	bounds = adaptive_bounds(sketches)
+	print(f"Modus in data.json: {normalize_mode(general.get('status_thresholds'))}")
+	for name, qs in METRIC_QUANTILES.items():
+		sketch = sketches.get(name)
+		n = len(sketch) if sketch is not None else 0
+		if name in bounds:
+			values = ", ".join(f"q{int(q * 100)}={v:.2f}" for q, v in zip(qs, bounds[name]))
+		else:
+			values = f"fest (weniger als {MIN_SAMPLES} Werte)"
+		print(f"{name:<14} n={n:5d}  {values}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from courses import course_key
+from curriculum import counts_as_passed
+from data_store import Course, SemesterGrades, get_general
+
+
+@dataclass
+class KPISnapshot:
+	day: date
+	weighted_average: Optional[float]
+	ects_total: int
+	pass_rate: Optional[float]
+	backlog: int
+
+
+def _contribution(c: Course):
+	# (weighted grade, graded ects, passed ects, graded attempts, graded passes) of a latest attempt
+	if c.grade is None:
+		return 0.0, 0, c.ects if c.passed else 0, 0, 0
+	return c.grade * c.ects, c.ects, c.ects if c.passed else 0, 1, 1 if c.passed else 0
+
+
+def _months_between(start: np.datetime64, days: np.ndarray):
+	return np.maximum(0, days.astype("datetime64[M]").astype(np.int64) - start.astype("datetime64[M]").astype(np.int64))
+
+
+class KPITimeline:
+	def __init__(self, semesters: Iterable[SemesterGrades], start_date: Optional[date] = None, catalog: Any = None):
+		if start_date is None:
+			start_date = date.fromisoformat(get_general()["start_date"])
+		self.start = np.datetime64(start_date, "D")
+		# with a curriculum.Catalog the backlog is catalog.due as of the day: one extra column per
+		# recommended semester counts its passed modules
+		self.catalog = catalog
+		self._due_semesters = sorted(s for s in catalog.by_semester if s > 0) if catalog is not None else []
+		column = {s: 5 + i for i, s in enumerate(self._due_semesters)}
+
+		courses = [c for s in semesters for c in s.courses]
+		# undated records count from the very beginning, ties keep the attempt order
+		courses.sort(key=lambda c: (c.date or date.min, c.attempt))
+
+		n = len(courses)
+		deltas = np.zeros((n, 5 + len(column)), dtype=np.float64)
+		latest: Dict[str, Course] = {}
+		passing: Dict[str, int] = {}  # module -> course keys whose latest attempt passes it
+		for i, c in enumerate(courses):
+			key = course_key(c.name, c.course_id)
+			cur = latest.get(key)
+			# same rule as analytics._latest_course_map, applied in date order
+			if cur is not None and c.attempt < cur.attempt:
+				continue
+			new = _contribution(c)
+			if cur is None:
+				deltas[i, :5] = new
+			else:
+				old = _contribution(cur)
+				deltas[i, :5] = [a - b for a, b in zip(new, old)]
+			latest[key] = c
+			module = catalog.resolve(key) if catalog is not None else None
+			if module is not None and catalog.modules[module].semester in column:
+				before = passing.get(module, 0)
+				# from its own day on every attempt lies in the past for the days it is counted on
+				passing[module] = before + counts_as_passed(c, date.max) - (cur is not None and counts_as_passed(cur, date.max))
+				if (before > 0) != (passing[module] > 0):
+					deltas[i, column[catalog.modules[module].semester]] = 1 if before == 0 else -1
+
+		self.event_days = np.array([c.date or date.min for c in courses], dtype="datetime64[D]")
+		# state after event i = prefix sum of all transitions up to i
+		self._state = np.cumsum(deltas, axis=0)
+
+	def _state_at(self, days: np.ndarray):
+		idx = np.searchsorted(self.event_days, days, side="right") - 1
+		state = np.zeros((days.size, self._state.shape[1]))
+		known = idx >= 0
+		state[known] = self._state[idx[known]]
+		return state
+
+	def series(self, days: Iterable) -> Dict[str, np.ndarray]:
+		days = np.asarray(days, dtype="datetime64[D]").ravel()
+		state = self._state_at(days)
+		weighted, graded_ects, passed_ects, attempts, passes = state[:, :5].T
+		with np.errstate(invalid="ignore", divide="ignore"):
+			average = np.where(graded_ects > 0, np.round(weighted / np.where(graded_ects > 0, graded_ects, 1), 2), np.nan)
+			rate = np.where(attempts > 0, np.round(passes / np.where(attempts > 0, attempts, 1), 2), np.nan)
+		ects_total = np.rint(passed_ects).astype(np.int64)
+		months = _months_between(self.start, days)
+		if self.catalog is None:
+			# same fallback as analytics.backlog_modules: 5 ECTS per month, 1 module ~ 5 ECTS
+			backlog = np.maximum(0, 5 * months - ects_total) // 5
+		else:
+			# Catalog.due: modules of the recommended semesters over by then, minus the passed ones
+			semesters = np.array(self._due_semesters)
+			sizes = np.array([len(self.catalog.by_semester[s]) for s in self._due_semesters])
+			over = semesters[None, :] <= (months // 6)[:, None]
+			backlog = np.rint(((sizes - state[:, 5:]) * over).sum(axis=1)).astype(np.int64)
+		return {
+			"day": days,
+			"weighted_average": average,
+			"ects_total": ects_total,
+			"pass_rate": rate,
+			"backlog": backlog,
+		}
+
+	def as_of(self, day: date):
+		s = self.series([day])
+		avg = float(s["weighted_average"][0])
+		rate = float(s["pass_rate"][0])
+		return KPISnapshot(
+			day=day,
+			weighted_average=None if np.isnan(avg) else avg,
+			ects_total=int(s["ects_total"][0]),
+			pass_rate=None if np.isnan(rate) else rate,
+			backlog=int(s["backlog"][0]),
+		)
+
+	def _range(self, start: Optional[date], end: Optional[date]) -> Tuple[np.datetime64, np.datetime64]:
+		lo = np.datetime64(start, "D") if start else self.start
+		hi = np.datetime64(end or date.today(), "D")
+		return lo, hi
+
+	def daily(self, start: Optional[date] = None, end: Optional[date] = None):
+		lo, hi = self._range(start, end)
+		return self.series(np.arange(lo, hi + 1, dtype="datetime64[D]"))
+
+	def monthly(self, start: Optional[date] = None, end: Optional[date] = None):
+		# value at the end of every month (or at `end` for the running month)
+		lo, hi = self._range(start, end)
+		months = np.arange(lo.astype("datetime64[M]"), hi.astype("datetime64[M]") + 1)
+		ends = (months + 1).astype("datetime64[D]") - 1
+		return self.series(np.minimum(ends, hi))
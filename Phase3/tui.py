@@ -0,0 +1,117 @@
+import os
+import shutil
+import sys
+import time
+from datetime import date
+from typing import List, Optional, Sequence
+
+# Text mode stays free of Tk and numpy: everything below comes from data_store/analytics
+# (through the KPI registry); the grade target card would pull in numpy and is left out
+from analytics import ects_by_semester_from_latest, semester_average_grades_from_latest
+from data_store import DATA_FILE, data_source
+from kpis import Evaluation, registry
+from sessions import SESSIONS_FILE
+
+# the text mode only reads: no attempt log or sketch file is created or updated
+READ_ONLY = {"persist": False}
+
+TEXT_CARDS = ["forecast", "average_grade", "ects", "pass_rate", "repeat_ratio", "weekly_hours", "backlog", "retakes"]
+
+ANSI = {
+	"light_green": "\033[92m",
+	"green": "\033[32m",
+	"orange": "\033[33m",
+	"red": "\033[31m",
+}
+BOLD = "\033[1m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+CLEAR = "\033[H\033[2J"
+
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: Sequence[float], low: Optional[float] = None, high: Optional[float] = None):
+	if not values:
+		return ""
+	low = min(values) if low is None else low
+	high = max(values) if high is None else high
+	span = (high - low) or 1.0
+	top = len(SPARKS) - 1
+	return "".join(SPARKS[max(0, min(top, round((v - low) / span * top)))] for v in values)
+
+
+def _paint(text: str, code: str, color: bool):
+	return f"{code}{text}{RESET}" if color and code else text
+
+
+def render(evaluation: Evaluation, width: int = 80, color: bool = True, cards: Sequence[str] = TEXT_CARDS):
+	lines: List[str] = [_paint("Studien-Dashboard", BOLD, color) + f"  {date.today().strftime('%d.%m.%Y')}", ""]
+	for key in cards:
+		if key not in registry.kpis:
+			continue
+		result = evaluation.kpi(key)
+		marker = _paint("●", ANSI.get(result.status, ""), color) if result.status else " "
+		lines.append(f"{marker} {_paint(result.title, BOLD, color)}: " + " | ".join(result.lines))
+
+	latest = evaluation.get("latest")
+	chart_width = max(10, width - 26)
+	lines.append("")
+
+	ects = ects_by_semester_from_latest(latest)
+	sems = sorted(ects)
+	lines.append(f"{'ECTS/Semester':<20}  {sparkline([ects[s] for s in sems], 0)}  " + " ".join(f"S{s}:{ects[s]}" for s in sems))
+
+	grades = semester_average_grades_from_latest(latest)
+	sems = sorted(grades)
+	# inverted so that a better grade draws a higher bar
+	lines.append(f"{'Noten/Semester':<20}  {sparkline([5.0 - grades[s] for s in sems], 0.0, 4.0)}  " + " ".join(f"S{s}:{grades[s]:.1f}" for s in sems))
+
+	weeks = evaluation.get("weeks")[-chart_width:]
+	hours = [h for _, h in weeks]
+	if hours:
+		lines.append(f"{'Lernzeit/Woche':<20}  {sparkline(hours, 0)}  " + _paint(f"max {max(hours):.0f} h", DIM, color))
+	else:
+		lines.append(f"{'Lernzeit/Woche':<20}  -")
+	return "\n".join(lines)
+
+
+def _watched_files():
+	from curriculum import CURRICULUM_FILE
+	return [data_source(), DATA_FILE, SESSIONS_FILE, CURRICULUM_FILE]
+
+
+def _signature():
+	# redraw trigger: any watched file changed, or the day rolled over (forecast, ECTS month, week)
+	stamps = []
+	for path in _watched_files():
+		try:
+			st = os.stat(path)
+			stamps.append((st.st_mtime_ns, st.st_size))
+		except OSError:
+			stamps.append(None)
+	return tuple(stamps), date.today()
+
+
+def run(watch: Optional[float] = None, color: Optional[bool] = None, cards: Sequence[str] = TEXT_CARDS):
+	if color is None:
+		color = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+	width = shutil.get_terminal_size((80, 24)).columns
+	if watch is None:
+		print(render(Evaluation(registry, READ_ONLY), width, color, cards))
+		return
+
+	last: Optional[tuple] = None
+	try:
+		while True:
+			sig = _signature()
+			if sig != last:
+				last = sig
+				# fresh evaluation: every node is recomputed from the changed files
+				frame = render(Evaluation(registry, READ_ONLY), shutil.get_terminal_size((80, 24)).columns, color, cards)
+				sys.stdout.write((CLEAR if color else "") + frame + "\n")
+				sys.stdout.flush()
+			time.sleep(watch)
+	except KeyboardInterrupt:
+		pass
+
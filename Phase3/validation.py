@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from codec import loads
+from columns import ExamColumns, WeekColumns, exam_columns, week_columns
+from courses import likely_duplicates
+from data_store import data_source
+from snapshot import open_snapshot
+
+CACHE_FILE = Path(__file__).with_name(".validation_cache.json")
+# part of the cache key: bump when checks are added or changed
+RULES_VERSION = 2
+
+_memory_cache: Dict[str, "ValidationReport"] = {}
+
+
+@dataclass
+class ValidationIssue:
+	code: str  # duplicate_attempt, attempt_gap, grade_range, passed_mismatch, similar_course, week_overlap
+	message: str
+	rows: List[int] = field(default_factory=list)  # indices into exams / study_time
+
+
+@dataclass
+class ValidationReport:
+	file_hash: str
+	issues: List[ValidationIssue]
+
+	@property
+	def ok(self):
+		return not self.issues
+
+
+def _duplicate_attempts(cols: ExamColumns):
+	if len(cols) == 0:
+		return []
+	key = cols.name_code.astype(np.int64) * (int(cols.attempt.max()) + 1) + cols.attempt
+	order = np.argsort(key, kind="stable")
+	sorted_key = key[order]
+	# group boundaries in the sorted keys; groups longer than one row are duplicates
+	bounds = np.flatnonzero(np.diff(sorted_key)) + 1
+	starts = np.concatenate(([0], bounds))
+	ends = np.concatenate((bounds, [key.size]))
+	issues = []
+	for lo, hi in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+		rows = np.sort(order[lo:hi])
+		r = rows[0]
+		issues.append(ValidationIssue(
+			"duplicate_attempt",
+			f"{cols.names[cols.name_code[r]]}: Versuch {cols.attempt[r]} ist {hi - lo}x eingetragen",
+			rows.tolist(),
+		))
+	return issues
+
+
+def _attempt_gaps(cols: ExamColumns):
+	if len(cols) == 0:
+		return []
+	n_names = len(cols.names)
+	width = int(cols.attempt.max()) + 1
+	pairs = np.unique(cols.name_code.astype(np.int64) * width + cols.attempt)
+	pair_codes, pair_attempts = pairs // width, pairs % width
+	distinct = np.bincount(pair_codes, minlength=n_names)
+	highest = np.zeros(n_names, dtype=np.int64)
+	np.maximum.at(highest, cols.name_code, cols.attempt)
+	issues = []
+	for code in np.flatnonzero(highest > distinct):
+		present = set(pair_attempts[pair_codes == code].tolist())
+		missing = [a for a in range(1, int(highest[code]) + 1) if a not in present]
+		issues.append(ValidationIssue(
+			"attempt_gap",
+			f"{cols.names[code]}: Versuch {', '.join(map(str, missing))} fehlt",
+			np.flatnonzero(cols.name_code == code).tolist(),
+		))
+	return issues
+
+
+def _grade_range(cols: ExamColumns):
+	bad = np.flatnonzero(~np.isnan(cols.grade) & ((cols.grade < 1.0) | (cols.grade > 5.0)))
+	return [
+		ValidationIssue("grade_range", f"{cols.names[cols.name_code[r]]}: Note {cols.grade[r]} liegt nicht zwischen 1.0 und 5.0", [int(r)])
+		for r in bad
+	]
+
+
+def _passed_mismatch(cols: ExamColumns):
+	# same rule as get_semester_grades: 5.0 => failed, otherwise passed
+	explicit = ~np.isnan(cols.passed_flag) & ~np.isnan(cols.grade)
+	expected = cols.grade < 5.0
+	bad = np.flatnonzero(explicit & ((cols.passed_flag == 1.0) != expected))
+	return [
+		ValidationIssue(
+			"passed_mismatch",
+			f"{cols.names[cols.name_code[r]]}: 'bestanden' widerspricht Note {cols.grade[r]}",
+			[int(r)],
+		)
+		for r in bad
+	]
+
+
+def _similar_courses(cols: ExamColumns):
+	# courses with an explicit modul_id are distinct on purpose
+	names = [name for name, key in zip(cols.names, cols.keys) if not key.startswith("id:")]
+	code_of = {name: code for code, name in enumerate(cols.names)}
+	issues = []
+	for a, b, score in likely_duplicates(names):
+		rows = np.flatnonzero((cols.name_code == code_of[a]) | (cols.name_code == code_of[b]))
+		issues.append(ValidationIssue(
+			"similar_course",
+			f"'{a}' und '{b}' sind vermutlich dasselbe Modul (Ähnlichkeit {score:.2f})",
+			rows.tolist(),
+		))
+	return issues
+
+
+def _week_overlaps(weeks: WeekColumns):
+	if len(weeks) < 2:
+		return []
+	order = np.argsort(weeks.week_start, kind="stable")
+	starts = weeks.week_start[order]
+	gaps = np.diff(starts).astype(np.int64)
+	issues = []
+	for i in np.flatnonzero(gaps < 7):
+		a, b = int(order[i]), int(order[i + 1])
+		issues.append(ValidationIssue(
+			"week_overlap",
+			f"Lernzeit-Wochen {starts[i]} und {starts[i + 1]} überschneiden sich",
+			[a, b],
+		))
+	return issues
+
+
+def validate_data(data: Dict, file_hash: str = ""):
+	return validate_columns(exam_columns(data), week_columns(data), file_hash)
+
+
+def validate_columns(cols: ExamColumns, weeks: WeekColumns, file_hash: str = ""):
+	issues = (
+		_duplicate_attempts(cols)
+		+ _attempt_gaps(cols)
+		+ _grade_range(cols)
+		+ _passed_mismatch(cols)
+		+ _similar_courses(cols)
+		+ _week_overlaps(weeks)
+	)
+	return ValidationReport(file_hash, issues)
+
+
+def _load_disk_cache():
+	try:
+		with open(CACHE_FILE, "r", encoding="utf-8") as f:
+			raw = json.load(f)
+		return ValidationReport(raw["file_hash"], [ValidationIssue(**i) for i in raw["issues"]])
+	except (OSError, ValueError, KeyError, TypeError):
+		return None
+
+
+def _store_disk_cache(report: ValidationReport):
+	try:
+		with open(CACHE_FILE, "w", encoding="utf-8") as f:
+			json.dump(asdict(report), f, ensure_ascii=False)
+	except OSError:
+		pass
+
+
+def validate_file(path: Optional[Path] = None):
+	# with shards the manifest (which carries every shard's hash) stands in for the data file
+	path = Path(path or data_source())
+	# The current data set is validated from data.snap, written at save time or from the
+	# dashboard's own parse; it is keyed by the data file's stamp the snapshot was built for,
+	# so the file is neither parsed nor read. The validator never rebuilds the snapshot: without
+	# a current one the file is parsed once here.
+	snap = open_snapshot() if path == data_source() else None
+	if snap is not None:
+		file_hash = f"snap:{snap.source_mtime_ns}:{snap.source_size}:rules:{RULES_VERSION}"
+	else:
+		raw = path.read_bytes()
+		file_hash = hashlib.sha1(raw + f"rules:{RULES_VERSION}".encode()).hexdigest()
+
+	report = _memory_cache.get(file_hash)
+	if report is None:
+		report = _load_disk_cache()
+		if report is None or report.file_hash != file_hash:
+			if snap is not None:
+				report = validate_columns(snap.exam_columns(), snap.week_columns(), file_hash)
+			else:
+				report = validate_data(loads(raw), file_hash)
+			_store_disk_cache(report)
+		_memory_cache[file_hash] = report
+	if snap is not None:
+		snap.close()
+	return report
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Prüft die StudyDashboard JSON-Datei auf inkonsistente Daten")
+	parser.add_argument("file", nargs="?", type=Path, default=None, help="Datendatei (Standard: data.json bzw. Shards)")
+	parser.add_argument("--format", choices=["text", "json"], default="text", help="Ausgabeformat (Standard: text)")
+	args = parser.parse_args()
+
+	report = validate_file(args.file)
+	if args.format == "json":
+		print(json.dumps(asdict(report), ensure_ascii=False, indent=2))
+	elif report.ok:
+		print("[OK] Keine Probleme gefunden.")
+	else:
+		print(f"[WARNUNG] {len(report.issues)} Problem(e) gefunden:")
+		for issue in report.issues:
+			print(f" - [{issue.code}] {issue.message}")
+	sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+	main()
@@ -1,11 +1,78 @@
+import calendar
+import math
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from data_store import get_study_time_weeks, load_json, save_json
+from data_store import get_study_time_weeks, update_study_time
 
 
 COLOR_BG = "#f8fafc"
+COLOR_ERROR = "#ef4444"
+MAX_RANGE_MONTHS = 3
+MAX_WEEK_HOURS = 7 * 24
+
+_CALENDAR = calendar.Calendar(firstweekday=calendar.MONDAY)
+
+
+@lru_cache(maxsize=64)
+def _month_weeks(year: int, month: int) -> Tuple[Tuple[date, str], ...]:
+    # (monday, button text) for every week whose Monday lies in the given month
+    last_day = calendar.monthrange(year, month)[1]
+    weeks = []
+    for week in _CALENDAR.monthdatescalendar(year, month):
+        monday, sunday = week[0], week[6]
+        if monday.month != month:
+            continue
+        end_day = sunday.day if sunday.month == month else last_day
+        weeks.append((monday, f"{monday.day}-{end_day}"))
+    return tuple(weeks)
+
+
+class WeekDraft:
+    # Edits for many weeks, kept in memory until they are committed in one write
+    def __init__(self, stored: Dict[date, float]):
+        self.stored = stored
+        self.changes: Dict[date, Optional[float]] = {}  # None deletes the week
+        self.errors: Dict[date, str] = {}
+        self._texts: Dict[date, str] = {}
+
+    def text(self, week: date):
+        if week in self._texts:
+            return self._texts[week]
+        hours = self.stored.get(week)
+        return "" if hours is None else str(hours)
+
+    def set(self, week: date, text: str):
+        text = text.strip()
+        self._texts[week] = text
+        self.changes.pop(week, None)
+        self.errors.pop(week, None)
+        try:
+            hours = float(text) if text != "" else 0.0
+        except ValueError:
+            self.errors[week] = "Keine Zahl"
+            return
+        if not math.isfinite(hours):
+            # float() also accepts "nan" and "inf"
+            self.errors[week] = "Keine Zahl"
+        elif hours < 0 or hours > MAX_WEEK_HOURS:
+            self.errors[week] = f"0-{MAX_WEEK_HOURS} h"
+        elif hours == 0:
+            # empty or 0 removes an existing entry
+            if week in self.stored:
+                self.changes[week] = None
+        elif hours != self.stored.get(week):
+            self.changes[week] = hours
+
+    def is_dirty(self):
+        return bool(self.changes or self.errors)
+
+    def summary(self):
+        deleted = sum(1 for hours in self.changes.values() if hours is None)
+        return len(self.changes) - deleted, deleted
 
 
 class WeeklyTimeDialog(tk.Toplevel):
@@ -13,7 +80,7 @@ class WeeklyTimeDialog(tk.Toplevel):
         super().__init__(parent)
         self.parent = parent
         self.title("Wöchentliche Lernzeit hinzufügen/bearbeiten")
-        self.geometry("500x450")
+        self.geometry("520x560")
         self.configure(bg=COLOR_BG)
         self.transient(parent)
         self.grab_set()
@@ -21,100 +88,105 @@ class WeeklyTimeDialog(tk.Toplevel):
         # Center the dialog
         self.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
 
-        # Initialize selected_date first
-        self.selected_date = date.today() - timedelta(days=date.today().weekday())
+        # Manual weeks are loaded once; every edit goes into the draft until "Speichern"
+        self.draft = WeekDraft({week_date: hours for week_date, hours in get_study_time_weeks(include_sessions=False)})
+        self._rows: List[dict] = []
+        self._loading = False
 
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
         self._build()
 
     def _build(self):
-        # Main frame
         main_frame = ttk.Frame(self)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
-        # Week selection section
-        week_section = ttk.LabelFrame(main_frame, text="Woche auswählen")
-        week_section.pack(fill=tk.X, pady=(0, 15))
-
-        # Selected week display
-        self.selected_week_label = ttk.Label(week_section, text="", font=("Arial", 10, "bold"))
-        self.selected_week_label.pack(pady=(10, 5))
-
-        # Calendar widget inside week section
-        self.calendar_frame = ttk.Frame(week_section)
-        self.calendar_frame.pack(fill=tk.X, padx=10, pady=10)
-
-        self._create_week_selection_widget()
-
-        # Hours input section
-        hours_section = ttk.LabelFrame(main_frame, text="Lernzeit eingeben")
-        hours_section.pack(fill=tk.X, pady=(0, 15))
-
-        # Hours input frame
-        hours_frame = ttk.Frame(hours_section)
-        hours_frame.pack(padx=10, pady=10)
-
-        ttk.Label(hours_frame, text="Stunden pro Woche:").pack(side=tk.LEFT)
-
-        self.hours_var = tk.StringVar()
-        self.hours_entry = ttk.Entry(hours_frame, textvariable=self.hours_var, width=8)
-        self.hours_entry.pack(side=tk.LEFT, padx=(10, 0))
-
-        # Validate that only numbers are entered
-        vcmd = (self.register(self._validate_number), '%P')
-        self.hours_entry.config(validate='key', validatecommand=vcmd)
-
-        # Initialize the selected week display
-        week_end = self.selected_date + timedelta(days=6)
-        self.selected_week_label.config(text=f"Ausgewählte Woche: {self.selected_date.strftime('%d.%m.%Y')} - {week_end.strftime('%d.%m.%Y')}")
-
-        # Check if week already exists and preload value
-        self._check_existing_week()
-
-        # Buttons
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=(20, 0))
+        # Range selection
+        nav_frame = ttk.Frame(main_frame)
+        nav_frame.pack(fill=tk.X, pady=(0, 10))
 
-        ttk.Button(button_frame, text="Abbrechen", command=self.destroy).pack(side=tk.RIGHT, padx=(10, 0))
-        ttk.Button(button_frame, text="Speichern", command=self._save_weekly_time).pack(side=tk.RIGHT)
-
-    def _create_week_selection_widget(self):
         today = date.today()
-
-        # Month and year selection
-        nav_frame = ttk.Frame(self.calendar_frame)
-        nav_frame.pack(fill=tk.X, pady=(0, 5))
-
         self.month_var = tk.IntVar(value=today.month)
         self.year_var = tk.IntVar(value=today.year)
+        self.months_var = tk.IntVar(value=1)
 
         ttk.Button(nav_frame, text="<", width=3, command=self._prev_month).pack(side=tk.LEFT)
-
-        month_label = ttk.Label(nav_frame, text="")
-        month_label.pack(side=tk.LEFT, padx=10)
-
+        self.month_label = ttk.Label(nav_frame, text="", font=("Arial", 10, "bold"))
+        self.month_label.pack(side=tk.LEFT, padx=10)
         ttk.Button(nav_frame, text=">", width=3, command=self._next_month).pack(side=tk.LEFT)
 
-        # Update month label when variables change
-        def update_month_label(*args):
-            months = ["", "Januar", "Februar", "März", "April", "Mai", "Juni",
-                     "Juli", "August", "September", "Oktober", "November", "Dezember"]
-            month_label.config(text=f"{months[self.month_var.get()]} {self.year_var.get()}")
-
-        self.month_var.trace('w', update_month_label)
-        self.year_var.trace('w', update_month_label)
-        update_month_label()
+        ttk.Spinbox(
+            nav_frame, from_=1, to=MAX_RANGE_MONTHS, width=3, textvariable=self.months_var,
+            state="readonly", command=self._update_week_rows,
+        ).pack(side=tk.RIGHT)
+        ttk.Label(nav_frame, text="Monate:").pack(side=tk.RIGHT, padx=(0, 5))
 
-        # Calendar grid
-        self.calendar_grid = ttk.Frame(self.calendar_frame)
-        self.calendar_grid.pack(fill=tk.X)
+        # Week grid: one entry per week, rows are reused when the range changes
+        week_section = ttk.LabelFrame(main_frame, text="Stunden pro Woche (leer oder 0 = löschen)")
+        week_section.pack(fill=tk.BOTH, expand=True)
+        self.week_grid = ttk.Frame(week_section)
+        self.week_grid.pack(fill=tk.X, padx=10, pady=10)
+        self.week_grid.columnconfigure(0, weight=1)
 
-        # Day headers
-        headers = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-        for i, header in enumerate(headers):
-            ttk.Label(self.calendar_grid, text=header, width=5).grid(row=0, column=i, padx=1, pady=1)
+        self._update_week_rows()
 
-        # Update calendar with current selection
-        self._update_week_selection()
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(15, 0))
+
+        self.summary_label = ttk.Label(button_frame, text="")
+        self.summary_label.pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Abbrechen", command=self._cancel).pack(side=tk.RIGHT, padx=(10, 0))
+        self.save_button = ttk.Button(button_frame, text="Speichern", command=self._save_weekly_time)
+        self.save_button.pack(side=tk.RIGHT)
+        self._update_summary()
+
+    def _visible_weeks(self):
+        year, month = self.year_var.get(), self.month_var.get()
+        weeks: List[Tuple[date, str]] = []
+        for _ in range(self.months_var.get()):
+            weeks.extend(_month_weeks(year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return weeks
+
+    def _row(self, index: int):
+        while len(self._rows) <= index:
+            r = len(self._rows)
+            var = tk.StringVar()
+            label = ttk.Label(self.week_grid, width=26)
+            entry = ttk.Entry(self.week_grid, textvariable=var, width=8)
+            entry.config(validate="key", validatecommand=(self.register(self._validate_number), "%P"))
+            status = tk.Label(self.week_grid, width=10, anchor="w", bg=COLOR_BG)
+            label.grid(row=r, column=0, sticky="w", pady=1)
+            entry.grid(row=r, column=1, padx=5, pady=1)
+            status.grid(row=r, column=2, sticky="w", pady=1)
+            row = {"label": label, "entry": entry, "status": status, "var": var, "week": None}
+            var.trace_add("write", lambda *_, row=row: self._on_edit(row))
+            self._rows.append(row)
+        return self._rows[index]
+
+    def _update_week_rows(self):
+        months = ["", "Januar", "Februar", "März", "April", "Mai", "Juni",
+                  "Juli", "August", "September", "Oktober", "November", "Dezember"]
+        self.month_label.config(text=f"{months[self.month_var.get()]} {self.year_var.get()}")
+
+        weeks = self._visible_weeks()
+        current_week_start = date.today() - timedelta(days=date.today().weekday())
+        self._loading = True
+        for i, (monday, _) in enumerate(weeks):
+            row = self._row(i)
+            row["week"] = monday
+            sunday = monday + timedelta(days=6)
+            font = ("Arial", 9, "bold") if monday == current_week_start else ("Arial", 9)
+            row["label"].config(text=f"KW {monday.isocalendar()[1]:02d}  {monday.strftime('%d.%m.')} - {sunday.strftime('%d.%m.%Y')}", font=font)
+            row["var"].set(self.draft.text(monday))
+            self._show_row_status(row)
+            for widget in (row["label"], row["entry"], row["status"]):
+                widget.grid()
+        for row in self._rows[len(weeks):]:
+            row["week"] = None
+            for widget in (row["label"], row["entry"], row["status"]):
+                widget.grid_remove()
+        self._loading = False
 
     def _prev_month(self):
         if self.month_var.get() > 1:
@@ -122,7 +194,7 @@ class WeeklyTimeDialog(tk.Toplevel):
         else:
             self.month_var.set(12)
             self.year_var.set(self.year_var.get() - 1)
-        self._update_week_selection()
+        self._update_week_rows()
 
     def _next_month(self):
         if self.month_var.get() < 12:
@@ -130,68 +202,7 @@ class WeeklyTimeDialog(tk.Toplevel):
         else:
             self.month_var.set(1)
             self.year_var.set(self.year_var.get() + 1)
-        self._update_week_selection()
-
-    def _update_week_selection(self):
-        # Clear existing calendar
-        for widget in self.calendar_grid.winfo_children():
-            if isinstance(widget, ttk.Button):
-                widget.destroy()
-
-        # Get first day of month and number of days
-        year = self.year_var.get()
-        month = self.month_var.get()
-        first_day = date(year, month, 1)
-        last_day = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year + 1, 1, 1) - timedelta(days=1)
-
-        # Calculate starting position
-        start_pos = (first_day.weekday()) % 7
-
-        # Create week buttons instead of day buttons
-        day_num = 1
-        for week in range(6):  # Maximum 6 weeks
-            week_start_day = None
-            week_end_day = None
-
-            # Find the Monday of this week
-            for day in range(7):
-                if week == 0 and day < start_pos:
-                    continue
-                elif day_num > last_day.day:
-                    break
-
-                if day == 0:  # Monday
-                    week_start_day = day_num
-                elif day == 6:  # Sunday
-                    week_end_day = day_num
-
-                day_num += 1
-
-            # Only create week button if we have a complete week
-            if week_start_day is not None:
-                week_monday = date(year, month, week_start_day) - timedelta(days=date(year, month, week_start_day).weekday())
-                week_end = week_monday + timedelta(days=6)
-
-                # Create week button spanning the full week
-                btn = ttk.Button(self.calendar_grid, text=f"{week_start_day}-{week_end_day if week_end_day else last_day.day}",
-                               width=15, command=lambda w=week_monday: self._select_week(w))
-                btn.grid(row=week + 1, column=0, columnspan=7, padx=1, pady=1, sticky="ew")
-
-                # Highlight current week
-                today = date.today()
-                current_week_start = today - timedelta(days=today.weekday())
-                if week_monday == current_week_start:
-                    btn.config(style="Accent.TButton")
-
-    def _select_week(self, week_start: date):
-        self.selected_date = week_start
-
-        # Update the selected week display
-        week_end = week_start + timedelta(days=6)
-        self.selected_week_label.config(text=f"Ausgewählte Woche: {week_start.strftime('%d.%m.%Y')} - {week_end.strftime('%d.%m.%Y')}")
-
-        # Update hours field if this week already has data
-        self._check_existing_week()
+        self._update_week_rows()
 
     def _validate_number(self, value: str):
         if value == "":
@@ -202,70 +213,46 @@ class WeeklyTimeDialog(tk.Toplevel):
         except ValueError:
             return False
 
-    def _check_existing_week(self):
-        try:
-            # The selected_date is already the Monday of the week
-            week_start = self.selected_date
-
-            # Load existing data
-            weeks = get_study_time_weeks()
-            for week_date, hours in weeks:
-                if week_date == week_start:
-                    self.hours_var.set(str(hours))
-                    return
-
-            # Clear hours if no existing data found
-            self.hours_var.set("")
-        except (ValueError, AttributeError):
-            # Invalid date or no selected date, ignore
-            pass
+    def _on_edit(self, row: dict):
+        if self._loading or row["week"] is None:
+            return
+        self.draft.set(row["week"], row["var"].get())
+        self._show_row_status(row)
+        self._update_summary()
+
+    def _show_row_status(self, row: dict):
+        week = row["week"]
+        if week in self.draft.errors:
+            row["status"].config(text=self.draft.errors[week], fg=COLOR_ERROR)
+        elif week in self.draft.changes:
+            row["status"].config(text="gelöscht" if self.draft.changes[week] is None else "geändert", fg="#475569")
+        else:
+            row["status"].config(text="")
+
+    def _update_summary(self):
+        saved, deleted = self.draft.summary()
+        text = f"{saved} geändert, {deleted} gelöscht" if self.draft.changes else ""
+        if self.draft.errors:
+            text = f"{len(self.draft.errors)} ungültige Eingabe(n)"
+        self.summary_label.config(text=text)
+        self.save_button.config(state="disabled" if self.draft.errors or not self.draft.changes else "normal")
+
+    def _cancel(self):
+        if self.draft.is_dirty() and not messagebox.askyesno("Verwerfen", "Ungespeicherte Änderungen verwerfen?", parent=self):
+            return
+        self.destroy()
 
     def _save_weekly_time(self):
-        try:
-            hours_text = self.hours_var.get().strip()
-            hours = float(hours_text) if hours_text != "" else 0.0
-            if hours < 0:
-                messagebox.showerror("Fehler", "Die Lernzeit muss eine positive Zahl sein.")
-                return
-
-            week_start = self.selected_date  # already a Monday
-
-            # Load JSON
-            data = load_json()
-            if "study_time" not in data or not isinstance(data["study_time"], list):
-                data["study_time"] = []
-
-            # Find existing entry index (if any)
-            week_iso = week_start.isoformat()
-            existingIndex = next((i for i, w in enumerate(data["study_time"])
-                        if w.get("week_start") == week_iso), None)
-
-            if hours == 0:
-                # DELETE entry for this week, if it exists
-                if existingIndex is not None:
-                    del data["study_time"][existingIndex]
-                    save_json(data)
-                    messagebox.showinfo("Gelöscht", f"Eintrag für Woche {week_iso} wurde entfernt.")
-                else:
-                    messagebox.showerror("Fehler", "Bitte verwenden sie eine gültige Zahl")
-                    return
-            else:
-                #update or insert
-                if existingIndex is not None:
-                    data["study_time"][existingIndex]["hours"] = hours
-                else:
-                    data["study_time"].append({"week_start": week_iso, "hours": hours})
-                    # keep list ordered
-                    data["study_time"].sort(key=lambda x: x["week_start"])
-
-                save_json(data)
-                messagebox.showinfo("Erfolg", f"Lernzeit für Woche {week_iso} gespeichert.")
-
-            # Close dialog and refresh Dashboard
+        if self.draft.errors:
+            messagebox.showerror("Fehler", "Bitte ungültige Eingaben korrigieren.", parent=self)
+            return
+        if not self.draft.changes:
             self.destroy()
-            self.parent.destroy()
-            from app import Dashboard
-            Dashboard().mainloop()
-
-        except ValueError as e:
-            messagebox.showerror("Fehler", f"Ungültige Eingabe: {str(e)}")
+            return
+
+        # all upserts and deletes in one write, then one dashboard update
+        update_study_time(self.draft.changes)
+        saved, deleted = self.draft.summary()
+        messagebox.showinfo("Erfolg", f"Lernzeit gespeichert: {saved} Woche(n) geändert, {deleted} entfernt.", parent=self)
+        self.destroy()
+        self.parent.refresh_study_time()